@@ -0,0 +1,101 @@
+import argparse
+import random
+from typing import Iterator, TextIO
+
+HEADER = "student_name,subject,teacher_name,date,grade\n"
+CHUNK_ROWS = 10000
+
+
+def iter_rows(
+    rows: int,
+    students: int = 10000,
+    subjects: int = 20,
+    teachers: int = 100,
+    seed: int = 0,
+) -> Iterator[str]:
+    """
+    Генерирует строки CSV файла с синтетическими оценками
+
+    Результат полностью определяется параметрами: при одинаковых
+    аргументах строки совпадают.
+
+    Args:
+        rows: Количество строк
+        students: Количество различных студентов
+        subjects: Количество различных предметов
+        teachers: Количество различных преподавателей
+        seed: Зерно генератора случайных чисел
+
+    Yields:
+        Строки CSV без заголовка, с завершающим переводом строки
+    """
+    rng = random.Random(seed)
+    student_names = [f"Студент {i:07d}" for i in range(students)]
+    subject_names = [f"Предмет {i:03d}" for i in range(subjects)]
+    teacher_names = [f"Преподаватель {i:05d}" for i in range(teachers)]
+    dates = [
+        f"2023-{month:02d}-{day:02d}" for month in range(1, 13) for day in range(1, 29)
+    ]
+    grades = ["1", "2", "3", "3.5", "4", "4.5", "5"]
+
+    for _ in range(rows):
+        yield (
+            f"{rng.choice(student_names)},{rng.choice(subject_names)},"
+            f"{rng.choice(teacher_names)},{rng.choice(dates)},{rng.choice(grades)}\n"
+        )
+
+
+def write_dataset(
+    output: TextIO,
+    rows: int,
+    students: int = 10000,
+    subjects: int = 20,
+    teachers: int = 100,
+    seed: int = 0,
+) -> None:
+    """
+    Записывает синтетический набор данных в CSV формате
+
+    Args:
+        output: Открытый текстовый файл
+        rows: Количество строк
+        students: Количество различных студентов
+        subjects: Количество различных предметов
+        teachers: Количество различных преподавателей
+        seed: Зерно генератора случайных чисел
+    """
+    output.write(HEADER)
+    chunk = []
+    for line in iter_rows(rows, students, subjects, teachers, seed):
+        chunk.append(line)
+        if len(chunk) == CHUNK_ROWS:
+            output.write("".join(chunk))
+            chunk.clear()
+    output.write("".join(chunk))
+
+
+def parse_arguments():
+    """Парсинг аргументов командной строки"""
+    parser = argparse.ArgumentParser(
+        description="Генерация синтетических данных об успеваемости"
+    )
+    parser.add_argument("--output", required=True, help="Путь к CSV файлу")
+    parser.add_argument("--rows", type=int, required=True, help="Количество строк")
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--subjects", type=int, default=20)
+    parser.add_argument("--teachers", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    """Основная функция программы"""
+    args = parse_arguments()
+    with open(args.output, "w", encoding="utf-8", newline="") as output:
+        write_dataset(
+            output, args.rows, args.students, args.subjects, args.teachers, args.seed
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.generate_data import write_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+STAGES = ["read_file", "iter_records", "iter_records_batch", "generate_report", "main"]
+
+
+def _read_file(file_path: str) -> Callable[[], None]:
+    from data.csv_reader import CSVReader
+
+    def run():
+        CSVReader().read_file(file_path)
+
+    return run
+
+
+def _iter_records(file_path: str) -> Callable[[], None]:
+    from data.csv_reader import CSVReader
+
+    def run():
+        for _ in CSVReader().iter_records(file_path):
+            pass
+
+    return run
+
+
+def _iter_records_batch(file_path: str) -> Callable[[], None]:
+    from data.csv_reader import CSVReader
+
+    # Пакетная проверка блоками должна быть быстрее построчной (iter_records)
+    def run():
+        for _ in CSVReader(skip_invalid=True).iter_records(file_path):
+            pass
+
+    return run
+
+
+def _generate_report(file_path: str) -> Callable[[], None]:
+    from data.csv_reader import CSVReader
+    from reports.student_performance_report import StudentPerformanceReport
+
+    # Чтение файла не входит в замер этапа
+    records = CSVReader().read_file(file_path)
+
+    def run():
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                StudentPerformanceReport().generate_report(records)
+
+    return run
+
+
+def _main(file_path: str) -> Callable[[], None]:
+    import main
+
+    def run():
+        argv = ["main.py", "--files", file_path]
+        argv += ["--report", "student-performance", "--no-cache"]
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                sys.argv = argv
+                main.main()
+
+    return run
+
+
+STAGE_SETUP: Dict[str, Callable[[str], Callable[[], None]]] = {
+    "read_file": _read_file,
+    "iter_records": _iter_records,
+    "iter_records_batch": _iter_records_batch,
+    "generate_report": _generate_report,
+    "main": _main,
+}
+
+
+def run_stage(stage: str, file_path: str) -> Dict[str, Any]:
+    """
+    Замеряет один этап в текущем процессе
+
+    Пиковая память - максимальный RSS процесса, поэтому каждый этап
+    запускается в отдельном процессе (см. measure).
+
+    Args:
+        stage: Название этапа
+        file_path: Путь к CSV файлу
+
+    Returns:
+        Время выполнения в секундах и пиковый RSS в килобайтах
+    """
+    sys.path.insert(0, ROOT)
+    run = STAGE_SETUP[stage](file_path)
+
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss_kb //= 1024
+    return {"seconds": seconds, "peak_rss_kb": peak_rss_kb}
+
+
+def measure(stage: str, file_path: str, rows: int) -> Dict[str, Any]:
+    """
+    Запускает этап в отдельном процессе и возвращает результат замера
+
+    Args:
+        stage: Название этапа
+        file_path: Путь к CSV файлу
+        rows: Количество строк в файле
+    """
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.run_benchmarks",
+            "--run-stage",
+            stage,
+            "--input",
+            file_path,
+        ],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    result = json.loads(completed.stdout)
+    result.update(
+        stage=stage,
+        rows=rows,
+        rows_per_sec=rows / result["seconds"] if result["seconds"] else None,
+    )
+    return result
+
+
+def dataset_path(data_dir: str, rows: int, args: argparse.Namespace) -> str:
+    """
+    Возвращает путь к набору данных, создавая его при отсутствии
+
+    Имя файла определяется параметрами генератора, поэтому наборы
+    переиспользуются между запусками.
+    """
+    name = (
+        f"students_{rows}_s{args.students}_sub{args.subjects}"
+        f"_t{args.teachers}_seed{args.seed}.csv"
+    )
+    path = os.path.join(data_dir, name)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8", newline="") as output:
+            write_dataset(
+                output, rows, args.students, args.subjects, args.teachers, args.seed
+            )
+        os.replace(temp_path, path)
+    return path
+
+
+def git_commit() -> Optional[str]:
+    """Текущий коммит репозитория, если он доступен"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """
+    Сравнивает пропускную способность с сохраненными результатами
+
+    Args:
+        results: Текущие замеры
+        baseline: Содержимое ранее сохраненного JSON файла
+        tolerance: Допустимое относительное снижение пропускной способности
+
+    Returns:
+        Описания регрессий
+    """
+    previous = {(r["stage"], r["rows"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        old = previous.get((result["stage"], result["rows"]))
+        if not old or not old.get("rows_per_sec") or not result["rows_per_sec"]:
+            continue
+        ratio = result["rows_per_sec"] / old["rows_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{result['stage']} ({result['rows']} строк): "
+                f"{old['rows_per_sec']:.0f} -> {result['rows_per_sec']:.0f} строк/с"
+            )
+    return regressions
+
+
+def parse_arguments():
+    """Парсинг аргументов командной строки"""
+    parser = argparse.ArgumentParser(description="Замеры производительности отчетов")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Размеры наборов данных в строках",
+    )
+    parser.add_argument(
+        "--stages", nargs="+", choices=STAGES, default=STAGES, help="Этапы для замера"
+    )
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--subjects", type=int, default=20)
+    parser.add_argument("--teachers", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--data-dir",
+        default=os.path.join(ROOT, "benchmarks", "data"),
+        help="Каталог для сгенерированных наборов данных",
+    )
+    parser.add_argument("--output", help="Путь к JSON файлу с результатами")
+    parser.add_argument("--compare", help="JSON файл с результатами для сравнения")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Допустимое относительное снижение пропускной способности",
+    )
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    """Основная функция программы"""
+    args = parse_arguments()
+
+    if args.run_stage:
+        print(json.dumps(run_stage(args.run_stage, args.input)))
+        return
+
+    results = []
+    for rows in args.sizes:
+        file_path = dataset_path(args.data_dir, rows, args)
+        for stage in args.stages:
+            result = measure(stage, file_path, rows)
+            results.append(result)
+            print(
+                f"{stage:18} {rows:>11} строк  {result['seconds']:9.3f} с  "
+                f"{result['rows_per_sec']:12.0f} строк/с  "
+                f"{result['peak_rss_kb'] / 1024:9.1f} МБ",
+                file=sys.stderr,
+            )
+
+    document = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "parameters": {
+            "students": args.students,
+            "subjects": args.subjects,
+            "teachers": args.teachers,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(document, ensure_ascii=False, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Регрессия: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
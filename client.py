@@ -0,0 +1,93 @@
+import argparse
+import sys
+from typing import Any, Dict
+from processing.protocol import DEFAULT_SOCKET, request
+
+# Клиент не импортирует отчеты: названия отчетов и форматы проверяет сервер
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Парсинг аргументов командной строки"""
+    parser = argparse.ArgumentParser(
+        description="Запрос отчета у сервера отчетов (main.py --serve)"
+    )
+    parser.add_argument(
+        "--report",
+        required=True,
+        nargs="+",
+        help="Типы отчетов для формирования",
+    )
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_SOCKET,
+        help="Unix сокет сервера отчетов",
+    )
+    parser.add_argument("--output-format", default="csv", help="Формат вывода")
+    parser.add_argument(
+        "--date-from", default=None, help="Учитывать оценки с этой даты"
+    )
+    parser.add_argument("--date-to", default=None, help="Учитывать оценки по эту дату")
+    parser.add_argument(
+        "--subject", nargs="+", default=[], help="Учитывать только эти предметы"
+    )
+    parser.add_argument(
+        "--teacher",
+        nargs="+",
+        default=[],
+        help="Учитывать только оценки этих преподавателей",
+    )
+    ranking = parser.add_mutually_exclusive_group()
+    ranking.add_argument("--top", type=int, default=None, help="N первых строк")
+    ranking.add_argument("--bottom", type=int, default=None, help="N последних строк")
+    parser.add_argument(
+        "--sketch-size", type=int, default=None, help="Размер квантильных скетчей"
+    )
+    parser.add_argument(
+        "--distinct-precision",
+        type=int,
+        default=None,
+        help="Точность счетчиков различных значений",
+    )
+    return parser.parse_args()
+
+
+def build_query(args: argparse.Namespace) -> Dict[str, Any]:
+    """Параметры запроса к серверу без значений по умолчанию"""
+    query: Dict[str, Any] = {
+        "report": args.report,
+        "output_format": args.output_format,
+    }
+    for name in (
+        "date_from",
+        "date_to",
+        "top",
+        "bottom",
+        "sketch_size",
+        "distinct_precision",
+    ):
+        if getattr(args, name) is not None:
+            query[name] = getattr(args, name)
+    if args.subject:
+        query["subject"] = args.subject
+    if args.teacher:
+        query["teacher"] = args.teacher
+    return query
+
+
+def main() -> None:
+    """Основная функция клиента"""
+    args = parse_arguments()
+    try:
+        response = request(build_query(args), args.socket)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: сервер отчетов недоступен ({e})", file=sys.stderr)
+        sys.exit(1)
+
+    if not response.get("ok"):
+        print(f"Ошибка: {response.get('error')}", file=sys.stderr)
+        sys.exit(1)
+    sys.stdout.write(response["output"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+from array import array
+from itertools import compress
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence
+
+
+class StringColumn:
+    """Столбец строк, закодированный словарем: значения хранятся один раз"""
+
+    def __init__(self) -> None:
+        self.codes = array("I")
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    @classmethod
+    def from_buffer(cls, codes: Sequence[int], values: List[str]) -> "StringColumn":
+        """
+        Создает столбец поверх готового буфера кодов (например, memoryview)
+
+        Args:
+            codes: Коды значений по строкам
+            values: Словарь значений, индекс - код
+        """
+        column = cls()
+        column.codes = codes  # type: ignore[assignment]
+        column.values = values
+        column._index = {value: code for code, value in enumerate(values)}
+        return column
+
+    def encode(self, value: str) -> int:
+        """
+        Возвращает код строки, добавляя ее в словарь при первом появлении
+
+        Коды выдаются в порядке первого появления значений.
+        """
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self._index[value] = code
+            self.values.append(value)
+        return code
+
+    def append(self, value: str) -> None:
+        """Добавляет значение в конец столбца"""
+        self.codes.append(self.encode(value))
+
+    def select(self, mask: Iterable[bool]) -> "StringColumn":
+        """
+        Возвращает столбец из строк, отмеченных в маске
+
+        Словарь кодируется заново в порядке первого появления среди
+        отобранных строк, как если бы они были прочитаны без остальных.
+        """
+        column = StringColumn()
+        remap: Dict[int, int] = {}
+        codes = column.codes
+        for code in compress(self.codes, mask):
+            new_code = remap.get(code)
+            if new_code is None:
+                new_code = remap[code] = column.encode(self.values[code])
+            codes.append(new_code)
+        return column
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+
+class ColumnarRecords:
+    """
+    Колоночное хранилище записей о студентах
+
+    Строковые поля хранятся как целочисленные коды и словари значений,
+    оценки - в массиве array("d"). Итерация отдает записи в виде словарей,
+    поэтому хранилище можно передавать в любой отчет вместо списка записей.
+    """
+
+    STRING_COLUMNS = ("student_name", "subject", "teacher_name", "date")
+
+    def __init__(self) -> None:
+        self.student_name = StringColumn()
+        self.subject = StringColumn()
+        self.teacher_name = StringColumn()
+        self.date = StringColumn()
+        self.grade = array("d")
+        # Отображение файла в память, если столбцы ссылаются на него
+        self.buffer: Optional[Any] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ColumnarRecords":
+        """Создает хранилище из итерируемого набора записей"""
+        columns = cls()
+        columns.extend(records)
+        return columns
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Добавляет запись"""
+        self.student_name.append(record["student_name"])
+        self.subject.append(record["subject"])
+        self.teacher_name.append(record["teacher_name"])
+        self.date.append(record["date"])
+        self.grade.append(record["grade"])
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Добавляет записи"""
+        for record in records:
+            self.append(record)
+
+    def column(self, name: str) -> StringColumn:
+        """Возвращает строковый столбец по имени поля"""
+        if name not in self.STRING_COLUMNS:
+            raise KeyError(f"Неизвестный строковый столбец: {name}")
+        return getattr(self, name)
+
+    def select(self, mask: Sequence[bool]) -> "ColumnarRecords":
+        """
+        Возвращает хранилище из строк, отмеченных в маске
+
+        Args:
+            mask: Признак отбора для каждой строки
+        """
+        columns = ColumnarRecords()
+        for name in self.STRING_COLUMNS:
+            setattr(columns, name, self.column(name).select(mask))
+        columns.grade = array("d", compress(self.grade, mask))
+        return columns
+
+    def nbytes(self) -> int:
+        """Размер буферов столбцов в байтах (без словарей значений)"""
+        return (
+            sum(
+                len(column.codes) * column.codes.itemsize
+                for column in map(self.column, self.STRING_COLUMNS)
+            )
+            + len(self.grade) * self.grade.itemsize
+        )
+
+    def __len__(self) -> int:
+        return len(self.grade)
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        return {
+            "student_name": self.student_name[row],
+            "subject": self.subject[row],
+            "teacher_name": self.teacher_name[row],
+            "date": self.date[row],
+            "grade": self.grade[row],
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self)):
+            yield self[row]
@@ -1,5 +1,37 @@
 import csv
-from typing import List, Dict, Any
+import io
+import os
+from itertools import islice
+from operator import itemgetter
+from typing import (
+    TYPE_CHECKING,
+    List,
+    Dict,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from processing.profiler import get_profiler
+from .columnar import ColumnarRecords
+from .filters import DateRange, RecordFilter
+from .mmap_reader import MmapRowReader
+from .sidecar import load_sidecar, write_sidecar
+from .validation import ValidationReport
+
+if TYPE_CHECKING:
+    from .sampling import NumberedRow, RowSampler
+
+
+class ByteRange(NamedTuple):
+    """Диапазон байтов CSV файла, границы которого совпадают с началами строк"""
+
+    start: int
+    end: int
 
 
 class CSVReader:
@@ -7,6 +39,75 @@ class CSVReader:
 
     REQUIRED_COLUMNS = {"student_name", "subject", "teacher_name", "date", "grade"}
 
+    STRING_FIELDS = ("student_name", "subject", "teacher_name", "date")
+    BATCH_SIZE = 4096
+    # Способы разбора файла: модуль csv или деление байтов mmap на поля
+    ENGINES = ("csv", "mmap")
+
+    def __init__(
+        self,
+        use_sidecar: bool = False,
+        max_errors: Optional[int] = None,
+        skip_invalid: bool = False,
+        record_filter: Optional[RecordFilter] = None,
+        chunk_bytes: Optional[int] = None,
+        engine: str = "csv",
+        fields: Optional[Iterable[str]] = None,
+        sampler: Optional["RowSampler"] = None,
+    ) -> None:
+        """
+        Args:
+            use_sidecar: Сохранять разобранные файлы в бинарные файлы-спутники
+                и читать их через mmap при повторном чтении
+            max_errors: Включает пакетную проверку, собирающую ошибки всех
+                строк; чтение прерывается при достижении этого числа ошибок
+            skip_invalid: Включает пакетную проверку и пропускает
+                некорректные строки вместо ошибки чтения файла
+            record_filter: Условия отбора строк, проверяемые на сырых полях
+                до преобразования строки
+            chunk_bytes: Размер диапазона байтов, на которые делятся файлы
+                больше этого размера для разбора в нескольких процессах;
+                None - файлы не делятся
+            engine: Способ разбора: "csv" - модуль csv, "mmap" - файл
+                отображается в память, и в str декодируются только поля
+                записей, условий отбора и оценка (см. data.mmap_reader)
+            fields: Поля записей, которые нужны отчетам; при разборе mmap
+                записи содержат и проверяются только по этим полям и
+                оценке. None - все поля
+            sampler: Случайная выборка строк: невыбранные строки не
+                проверяются и не преобразуются (см. data.sampling)
+
+        Raises:
+            ValueError: Если способ разбора неизвестен
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Неизвестный способ разбора CSV: {engine}")
+        self.use_sidecar = use_sidecar
+        self.max_errors = max_errors
+        self.skip_invalid = skip_invalid
+        self.record_filter = record_filter if record_filter else None
+        self.chunk_bytes = chunk_bytes
+        self.engine = engine
+        self.fields = None if fields is None else tuple(fields)
+        self.sampler = sampler
+        # Строковые поля, которые попадают в записи и проверяются
+        self._string_fields = self.STRING_FIELDS
+        if engine == "mmap" and self.fields is not None:
+            self._string_fields = tuple(
+                field for field in self.STRING_FIELDS if field in self.fields
+            )
+
+    def create_validation(self) -> Optional[ValidationReport]:
+        """
+        Создает сводку проверки для одного файла
+
+        Returns:
+            Сводка или None, если пакетная проверка не включена
+        """
+        if self.max_errors is None and not self.skip_invalid:
+            return None
+        return ValidationReport(self.max_errors, self.skip_invalid)
+
     def read_file(self, file_path: str) -> List[Dict[str, Any]]:
         """
         Читает CSV файл и возвращает список записей
@@ -21,30 +122,564 @@ class CSVReader:
             FileNotFoundError: Если файл не найден
             ValueError: Если формат файла некорректен
         """
-        records = []
+        return list(self.iter_records(file_path))
+
+    def read_columns(
+        self,
+        file_path: str,
+        validation: Optional[ValidationReport] = None,
+        dates: Optional[DateRange] = None,
+    ) -> ColumnarRecords:
+        """
+        Читает CSV файл в колоночное хранилище с кодированием строк словарем
+
+        Если включены файлы-спутники, актуальный спутник отображается в память
+        вместо разбора CSV; иначе файл разбирается и спутник записывается.
+        Спутник хранит все строки файла, а условия отбора применяются к
+        словарям его столбцов: файл, ни одна дата которого не подходит,
+        отбрасывается без просмотра строк.
+
+        Args:
+            file_path: Путь к CSV файлу
+            validation: Сводка пакетной проверки (см. iter_records)
+            dates: Диапазон, в который записываются даты строк файла
+
+        Returns:
+            Колоночное хранилище записей
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если формат файла некорректен
+        """
+        if self._string_fields != self.STRING_FIELDS:
+            # Колоночное хранилище и спутник содержат все поля
+            full_reader = CSVReader(
+                self.use_sidecar,
+                self.max_errors,
+                self.skip_invalid,
+                self.record_filter,
+                self.chunk_bytes,
+                self.engine,
+                sampler=self.sampler,
+            )
+            return full_reader.read_columns(file_path, validation, dates)
+
+        if not self.use_sidecar:
+            return ColumnarRecords.from_records(
+                self.iter_records(file_path, validation, dates)
+            )
+
+        columns = load_sidecar(file_path)
+        if columns is None:
+            # Размер и время изменения снимаются до чтения: файл, дописанный
+            # во время разбора, не совпадет со спутником
+            try:
+                stat: Optional[os.stat_result] = os.stat(file_path)
+            except OSError:
+                stat = None
+            columns = ColumnarRecords.from_records(
+                self._read_records(file_path, validation, None)
+            )
+            # Спутник с пропущенными строками не должен подменять файл при
+            # строгом чтении
+            if stat is not None and not (validation and validation.errors):
+                write_sidecar(file_path, columns, stat)
+
+        # Словарь дат спутника дает диапазон дат файла без просмотра строк
+        file_dates = DateRange()
+        file_dates.update(columns.date.values)
+        if dates is not None and file_dates:
+            dates.add(file_dates.first)
+            dates.add(file_dates.last)
+
+        if self.record_filter is None:
+            return columns
+        if self.record_filter.has_dates and not self.record_filter.overlaps(file_dates):
+            return ColumnarRecords()
+        return self.record_filter.filter_columns(columns)
+
+    def iter_records(
+        self,
+        file_path: str,
+        validation: Optional[ValidationReport] = None,
+        dates: Optional[DateRange] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Построчно читает CSV файл, не загружая его целиком в память
+
+        При пакетной проверке строки проверяются блоками по BATCH_SIZE, а
+        ошибки всех строк собираются в сводку вместо остановки на первой.
+        Строки, не подходящие под условия отбора, отбрасываются до
+        преобразования и проверки.
+
+        Args:
+            file_path: Путь к CSV файлу
+            validation: Сводка пакетной проверки; если не передана, она
+                создается по настройкам объекта (см. create_validation)
+            dates: Диапазон, в который записываются даты всех строк файла
+                (заполняется только при условиях отбора по дате)
+
+        Yields:
+            Словари с данными студентов по мере разбора строк
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если формат файла некорректен
+            ValidationError: Если пакетная проверка нашла ошибки
+        """
+        match = None
+        if self.record_filter is not None:
+            match = self.record_filter.matcher(dates)
+        return self._read_records(file_path, validation, match)
+
+    def _read_records(
+        self,
+        file_path: str,
+        validation: Optional[ValidationReport],
+        match: Optional[Callable[[Dict[str, str]], bool]],
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Построчно читает CSV файл (см. iter_records)
+
+        Args:
+            file_path: Путь к CSV файлу
+            validation: Сводка пакетной проверки
+            match: Проверка сырой строки; None - подходят все строки
+        """
+        profiler = get_profiler()
+
+        if self.engine == "mmap":
+            try:
+                with MmapRowReader(file_path, self._decoded_fields()) as rows:
+                    self.check_columns(rows.fieldnames)
+                    reader: Iterable[Dict[str, str]] = iter(rows)
+                    if profiler.enabled:
+                        profiler.stats("file_io").bytes_read += rows.size
+                        reader = profiler.timed_iter("csv_tokenize", reader)
+                    yield from self._parse_rows(reader, 2, validation, match, file_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Файл {file_path} не найден")
+            except UnicodeDecodeError:
+                raise ValueError(f"Ошибка кодировки файла {file_path}")
+            return
 
         try:
             with open(file_path, "r", encoding="utf-8") as csvfile:
-                reader = csv.DictReader(csvfile)
+                source: Iterable[str] = csvfile
+                if profiler.enabled:
+                    profiler.stats("file_io").bytes_read += os.fstat(
+                        csvfile.fileno()
+                    ).st_size
+                    source = profiler.timed_iter("file_io", csvfile)
+
+                dict_reader = csv.DictReader(source)
+                self.check_columns(dict_reader.fieldnames)
+
+                reader = dict_reader
+                if profiler.enabled:
+                    reader = profiler.timed_iter(
+                        "csv_tokenize", dict_reader, exclude="file_io"
+                    )
+
+                # Номера строк начинаются с 2: первая строка - заголовок
+                yield from self._parse_rows(reader, 2, validation, match, file_path)
+
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Файл {file_path} не найден")
+        except UnicodeDecodeError:
+            raise ValueError(f"Ошибка кодировки файла {file_path}")
+
+    def split_ranges(
+        self, file_path: str, chunk_bytes: int, start: Optional[int] = None
+    ) -> List[ByteRange]:
+        """
+        Делит строки CSV файла после заголовка на диапазоны байтов
+
+        Граница диапазона сдвигается к началу следующей строки файла.
+        Перевод строки внутри значения в кавычках тоже может оказаться
+        границей; такие диапазоны распознаются при объединении по
+        четности числа кавычек перед границей (см. RangeRecords.quotes).
 
-                if not self.REQUIRED_COLUMNS.issubset(set(reader.fieldnames or [])):
-                    missing_cols = self.REQUIRED_COLUMNS - set(reader.fieldnames or [])
-                    raise ValueError(f"Отсутствуют необходимые колонки: {missing_cols}")
+        Args:
+            file_path: Путь к CSV файлу
+            chunk_bytes: Примерный размер диапазона в байтах
+            start: Начало первого диапазона (начало строки); по умолчанию -
+                после заголовка
+
+        Returns:
+            Диапазоны в порядке файла; пустой список для файла без строк
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+        """
+        try:
+            with open(file_path, "rb") as f:
+                f.readline()
+                position = f.tell() if start is None else start
+                size = os.fstat(f.fileno()).st_size
+                ranges = []
+                while position < size:
+                    f.seek(max(position + chunk_bytes - 1, position))
+                    f.readline()
+                    end = min(f.tell(), size)
+                    ranges.append(ByteRange(position, end))
+                    position = end
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Файл {file_path} не найден")
+        return ranges
+
+    def read_range(
+        self,
+        file_path: str,
+        byte_range: ByteRange,
+        validation: Optional[ValidationReport] = None,
+        dates: Optional[DateRange] = None,
+    ) -> "RangeRecords":
+        """
+        Читает диапазон байтов CSV файла (см. split_ranges)
+
+        Строки разбираются выбранным способом (engine), проверяются и
+        отбираются так же, как в iter_records, но номера строк в ошибках
+        считаются от начала диапазона: первая строка диапазона имеет
+        номер 1. Номер строки в файле получается прибавлением числа строк
+        предыдущих диапазонов и заголовка.
+
+        Args:
+            file_path: Путь к CSV файлу
+            byte_range: Диапазон байтов
+            validation: Сводка пакетной проверки
+            dates: Диапазон, в который записываются даты строк
+
+        Returns:
+            Итерируемый набор записей диапазона
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если формат файла некорректен
+        """
+        match = None
+        if self.record_filter is not None:
+            match = self.record_filter.matcher(dates)
 
-                for row_num, row in enumerate(
-                    reader, start=2
-                ):  # start=2 учитывает заголовок
-                    try:
-                        processed_row = self._process_row(row, row_num)
-                        records.append(processed_row)
-                    except ValueError as e:
-                        raise ValueError(f"Ошибка в строке {row_num}: {e}")
+        if self.engine == "mmap":
+            try:
+                rows = MmapRowReader(
+                    file_path, self._decoded_fields(), byte_range.start, byte_range.end
+                )
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Файл {file_path} не найден")
+            except UnicodeDecodeError:
+                raise ValueError(f"Ошибка кодировки файла {file_path}")
+            try:
+                self.check_columns(rows.fieldnames)
+            except ValueError:
+                rows.close()
+                raise
+            return RangeRecords(
+                self, file_path, rows, validation, match, rows.count_quotes()
+            )
 
+        try:
+            with open(file_path, "rb") as f:
+                header = f.readline()
+                f.seek(byte_range.start)
+                data = f.read(byte_range.end - byte_range.start)
         except FileNotFoundError:
             raise FileNotFoundError(f"Файл {file_path} не найден")
+
+        try:
+            fieldnames = next(csv.reader([header.decode("utf-8")]), [])
+            text = data.decode("utf-8")
         except UnicodeDecodeError:
             raise ValueError(f"Ошибка кодировки файла {file_path}")
+        self.check_columns(fieldnames)
+
+        reader = csv.DictReader(io.StringIO(text), fieldnames=fieldnames)
+        return RangeRecords(
+            self, file_path, reader, validation, match, data.count(b'"')
+        )
+
+    def count_quotes(self, file_path: str, byte_range: ByteRange) -> int:
+        """
+        Количество кавычек в диапазоне байтов файла
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+        """
+        quotes = 0
+        try:
+            with open(file_path, "rb") as f:
+                f.seek(byte_range.start)
+                remaining = byte_range.end - byte_range.start
+                while remaining > 0:
+                    block = f.read(min(remaining, 1024 * 1024))
+                    if not block:
+                        break
+                    quotes += block.count(b'"')
+                    remaining -= len(block)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Файл {file_path} не найден")
+        return quotes
+
+    def _decoded_fields(self) -> List[str]:
+        """Поля, которые декодируются при разборе mmap"""
+        fields = [*self._string_fields, "grade"]
+        if self.record_filter is not None:
+            fields.extend(self.record_filter.fields)
+        return fields
+
+    def check_columns(self, fieldnames: Optional[Sequence[str]]) -> None:
+        """
+        Проверяет, что в заголовке CSV есть все необходимые колонки
+
+        Raises:
+            ValueError: Если колонок не хватает
+        """
+        missing_cols = self.REQUIRED_COLUMNS - set(fieldnames or [])
+        if missing_cols:
+            raise ValueError(f"Отсутствуют необходимые колонки: {missing_cols}")
 
+    def parse_rows(
+        self,
+        rows: Iterable[Dict[str, str]],
+        first_row_num: int = 2,
+        validation: Optional[ValidationReport] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Отбирает, проверяет и преобразует уже разобранные строки CSV
+
+        Используется для строк, дописанных в конец файла после прошлого
+        чтения: условия отбора и проверка те же, что в iter_records.
+
+        Args:
+            rows: Строки CSV в виде словарей {колонка: значение}
+            first_row_num: Номер первой строки в файле (для сообщений)
+            validation: Сводка пакетной проверки; если не передана, она
+                создается по настройкам объекта
+
+        Yields:
+            Словари с данными студентов
+
+        Raises:
+            ValueError: Если строка некорректна
+            ValidationError: Если пакетная проверка нашла ошибки
+        """
+        match = None
+        if self.record_filter is not None:
+            match = self.record_filter.matcher()
+        return self._parse_rows(rows, first_row_num, validation, match)
+
+    def parse_sampled(
+        self,
+        rows: Iterable["NumberedRow"],
+        validation: Optional[ValidationReport] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Проверяет и преобразует строки выборки фиксированного размера
+
+        Строки уже прошли условия отбора при чтении файла
+        (см. data.sampling.RowSampler.drain).
+
+        Args:
+            rows: Пары (номер строки в файле, строка CSV)
+            validation: Сводка пакетной проверки; если не передана, она
+                создается по настройкам объекта
+
+        Yields:
+            Словари с данными студентов
+
+        Raises:
+            ValueError: Если строка некорректна
+            ValidationError: Если пакетная проверка нашла ошибки
+        """
+        return self._convert_rows(iter(rows), validation)
+
+    def _parse_rows(
+        self,
+        reader: Iterable[Dict[str, str]],
+        first_row_num: int,
+        validation: Optional[ValidationReport],
+        match: Optional[Callable[[Dict[str, str]], bool]],
+        source: str = "",
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Отбирает, проверяет и преобразует строки CSV (см. iter_records)
+
+        Args:
+            reader: Строки CSV в виде словарей
+            first_row_num: Номер первой строки в файле
+            validation: Сводка пакетной проверки
+            match: Проверка сырой строки; None - подходят все строки
+            source: Путь к файлу строк (для выборки)
+        """
+        if match is None and self.sampler is None:
+            # Номера строк идут подряд: блоки берутся прямо из reader, без
+            # нумерации каждой строки
+            rows = iter(reader)
+            return self._convert_rows(
+                enumerate(rows, start=first_row_num),
+                validation,
+                self._iter_row_blocks(rows, first_row_num),
+            )
+        numbered: Iterator["NumberedRow"] = enumerate(reader, start=first_row_num)
+        if match is not None:
+            numbered = (item for item in numbered if match(item[1]))
+        if self.sampler is not None:
+            numbered = self.sampler.sample(numbered, source)
+        return self._convert_rows(numbered, validation)
+
+    def _convert_rows(
+        self,
+        numbered: Iterator["NumberedRow"],
+        validation: Optional[ValidationReport],
+        blocks: Optional[Iterator[Tuple[Sequence[int], List[Dict[str, str]]]]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Проверяет и преобразует отобранные строки
+
+        Args:
+            numbered: Пары (номер строки, строка CSV)
+            validation: Сводка пакетной проверки
+            blocks: Те же строки, уже разбитые на блоки для пакетной
+                проверки (см. _iter_row_blocks); None - блоки собираются
+                из numbered
+        """
+        if validation is None:
+            validation = self.create_validation()
+
+        profiler = get_profiler()
+        process_row = self._process_row
+        process_batch = self._process_batch
+        if profiler.enabled:
+            process_row = profiler.timed("process_row", process_row)
+            process_batch = profiler.timed(
+                "process_row", process_batch, lambda rows, *_: len(rows)
+            )
+
+        if validation is not None:
+            if blocks is None:
+                blocks = self._iter_blocks(numbered)
+            for row_nums, rows in blocks:
+                yield from process_batch(rows, row_nums, validation)
+            validation.finish()
+            return
+
+        for row_num, row in numbered:
+            try:
+                processed_row = process_row(row, row_num)
+            except ValueError as e:
+                raise ValueError(f"Ошибка в строке {row_num}: {e}")
+            yield processed_row
+
+    def _iter_blocks(
+        self, numbered: Iterator["NumberedRow"]
+    ) -> Iterator[Tuple[Sequence[int], List[Dict[str, str]]]]:
+        """
+        Делит строки на блоки по BATCH_SIZE строк
+
+        Args:
+            numbered: Пары (номер строки, строка CSV)
+
+        Yields:
+            Номера строк блока и сами строки
+        """
+        while True:
+            block = list(islice(numbered, self.BATCH_SIZE))
+            if not block:
+                return
+            row_nums, rows = zip(*block)
+            yield row_nums, list(rows)
+
+    def _iter_row_blocks(
+        self, rows: Iterator[Dict[str, str]], first_row_num: int
+    ) -> Iterator[Tuple[Sequence[int], List[Dict[str, str]]]]:
+        """
+        Делит идущие подряд строки на блоки по BATCH_SIZE строк
+
+        Args:
+            rows: Строки CSV
+            first_row_num: Номер первой строки в файле
+
+        Yields:
+            Номера строк блока и сами строки
+        """
+        row_num = first_row_num
+        while True:
+            block = list(islice(rows, self.BATCH_SIZE))
+            if not block:
+                return
+            yield range(row_num, row_num + len(block)), block
+            row_num += len(block)
+
+    def _process_batch(
+        self,
+        rows: List[Dict[str, str]],
+        row_nums: Sequence[int],
+        validation: ValidationReport,
+    ) -> List[Dict[str, Any]]:
+        """
+        Проверяет и преобразует блок строк целиком
+
+        Поля проверяются по столбцам для всего блока сразу: один проход
+        float() и min/max по оценкам и одна проверка пустых значений на
+        столбец, без обращений к строкам в Python-цикле. Построчный
+        разбор с регистрацией ошибок выполняется только для блоков,
+        в которых есть некорректные строки.
+
+        Args:
+            rows: Блок строк CSV файла
+            row_nums: Номера строк блока
+            validation: Сводка, в которую записываются ошибки
+
+        Returns:
+            Обработанные корректные строки блока
+        """
+        validation.rows_checked += len(rows)
+
+        string_fields = self._string_fields
+        try:
+            # float() сам отбрасывает пробелы по краям, как str.strip()
+            grades = list(map(float, map(itemgetter("grade"), rows)))
+            columns = [
+                list(map(str.strip, map(itemgetter(field), rows)))
+                for field in string_fields
+            ]
+        except (ValueError, TypeError, AttributeError):
+            pass
+        else:
+            # min и max пропускают nan, а сумма с nan - nan
+            total = sum(grades)
+            if (
+                1 <= min(grades)
+                and max(grades) <= 5
+                and total == total
+                and all(map(all, columns))
+            ):
+                if string_fields == self.STRING_FIELDS:
+                    return [
+                        {
+                            "student_name": student_name,
+                            "subject": subject,
+                            "teacher_name": teacher_name,
+                            "date": date,
+                            "grade": grade,
+                        }
+                        for student_name, subject, teacher_name, date, grade in zip(
+                            *columns, grades
+                        )
+                    ]
+                names = (*string_fields, "grade")
+                return [dict(zip(names, values)) for values in zip(*columns, grades)]
+
+        records = []
+        for row_num, row in zip(row_nums, rows):
+            if None in row.values():
+                validation.add(row_num, "Недостаточно значений в строке")
+                continue
+            try:
+                records.append(self._process_row(row, row_num))
+            except ValueError as e:
+                validation.add(row_num, str(e))
         return records
 
     def _process_row(self, row: Dict[str, str], row_num: int) -> Dict[str, Any]:
@@ -65,11 +700,18 @@ class CSVReader:
         except (ValueError, TypeError):
             raise ValueError(f"Некорректная оценка: {row['grade']}")
 
-        required_fields = ["student_name", "subject", "teacher_name", "date"]
-        for field in required_fields:
+        string_fields = self._string_fields
+        for field in string_fields:
             if not row[field].strip():
                 raise ValueError(f"Поле {field} не может быть пустым")
 
+        if string_fields != self.STRING_FIELDS:
+            record: Dict[str, Any] = {
+                field: row[field].strip() for field in string_fields
+            }
+            record["grade"] = grade
+            return record
+
         return {
             "student_name": row["student_name"].strip(),
             "subject": row["subject"].strip(),
@@ -77,3 +719,49 @@ class CSVReader:
             "date": row["date"].strip(),
             "grade": grade,
         }
+
+
+class RangeRecords:
+    """
+    Записи диапазона байтов CSV файла
+
+    Attributes:
+        rows: Количество прочитанных строк диапазона (после перебора -
+            всех строк)
+        quotes: Количество кавычек в диапазоне; нечетное число кавычек
+            перед границей означает, что граница попала внутрь значения
+    """
+
+    def __init__(
+        self,
+        csv_reader: CSVReader,
+        file_path: str,
+        reader: Iterable[Dict[str, str]],
+        validation: Optional[ValidationReport],
+        match: Optional[Callable[[Dict[str, str]], bool]],
+        quotes: int,
+    ) -> None:
+        self._csv_reader = csv_reader
+        self._file_path = file_path
+        self._reader = reader
+        self._validation = validation
+        self._match = match
+        self.rows = 0
+        self.quotes = quotes
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self._csv_reader._parse_rows(
+            self._count(), 1, self._validation, self._match
+        )
+
+    def _count(self) -> Iterator[Dict[str, str]]:
+        """Считает строки по мере чтения"""
+        try:
+            for row in self._reader:
+                self.rows += 1
+                yield row
+        except UnicodeDecodeError:
+            raise ValueError(f"Ошибка кодировки файла {self._file_path}")
+        finally:
+            if isinstance(self._reader, MmapRowReader):
+                self._reader.close()
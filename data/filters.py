@@ -0,0 +1,203 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from .columnar import ColumnarRecords
+
+
+class DateRange:
+    """
+    Диапазон дат строк файла
+
+    Даты хранятся строками в формате ГГГГ-ММ-ДД, поэтому сравниваются как
+    строки без преобразования.
+    """
+
+    def __init__(self, first: Optional[str] = None, last: Optional[str] = None) -> None:
+        self.first = first
+        self.last = last
+
+    def add(self, date: str) -> None:
+        """Учитывает дату строки"""
+        if self.first is None or date < self.first:
+            self.first = date
+        if self.last is None or date > self.last:
+            self.last = date
+
+    def update(self, dates: Iterable[str]) -> None:
+        """Учитывает набор дат"""
+        dates = list(dates)
+        if dates:
+            self.add(min(dates))
+            self.add(max(dates))
+
+    def __bool__(self) -> bool:
+        return self.first is not None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DateRange):
+            return NotImplemented
+        return (self.first, self.last) == (other.first, other.last)
+
+    def __repr__(self) -> str:
+        return f"DateRange({self.first!r}, {self.last!r})"
+
+
+class RecordFilter:
+    """
+    Условия отбора строк по дате, предмету и преподавателю
+
+    Условия проверяются на сырых полях строки CSV до преобразования оценки
+    и создания словаря записи, поэтому отброшенные строки почти ничего не
+    стоят и не проверяются. Строки, в которых не хватает полей, не
+    отбрасываются, чтобы ошибку по ним увидела проверка формата.
+    """
+
+    def __init__(
+        self,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        subjects: Sequence[str] = (),
+        teachers: Sequence[str] = (),
+    ) -> None:
+        """
+        Args:
+            date_from: Первая подходящая дата (ГГГГ-ММ-ДД, включительно)
+            date_to: Последняя подходящая дата (ГГГГ-ММ-ДД, включительно)
+            subjects: Подходящие предметы; пустой набор - любые
+            teachers: Подходящие преподаватели; пустой набор - любые
+        """
+        self.date_from = date_from
+        self.date_to = date_to
+        self.subjects: Set[str] = set(subjects)
+        self.teachers: Set[str] = set(teachers)
+
+    @property
+    def has_dates(self) -> bool:
+        """Заданы ли условия по дате"""
+        return self.date_from is not None or self.date_to is not None
+
+    def __bool__(self) -> bool:
+        return self.has_dates or bool(self.subjects) or bool(self.teachers)
+
+    @property
+    def key(self) -> str:
+        """Строковое описание условий (например, для пространства имен кэша)"""
+        parts = []
+        if self.date_from is not None:
+            parts.append(f"from={self.date_from}")
+        if self.date_to is not None:
+            parts.append(f"to={self.date_to}")
+        if self.subjects:
+            parts.append("subject=" + ",".join(sorted(self.subjects)))
+        if self.teachers:
+            parts.append("teacher=" + ",".join(sorted(self.teachers)))
+        return ";".join(parts)
+
+    @property
+    def fields(self) -> List[str]:
+        """Поля строки, которые проверяют условия"""
+        fields = []
+        if self.has_dates:
+            fields.append("date")
+        if self.subjects:
+            fields.append("subject")
+        if self.teachers:
+            fields.append("teacher_name")
+        return fields
+
+    def match_date(self, date: str) -> bool:
+        """Подходит ли дата"""
+        return (self.date_from is None or date >= self.date_from) and (
+            self.date_to is None or date <= self.date_to
+        )
+
+    def overlaps(self, dates: DateRange) -> bool:
+        """
+        Могут ли подойти строки файла с таким диапазоном дат
+
+        Args:
+            dates: Диапазон дат всех строк файла
+
+        Returns:
+            False, если ни одна дата диапазона не подходит; пустой
+            диапазон не подходит
+        """
+        if not dates:
+            return False
+        return (self.date_from is None or dates.last >= self.date_from) and (
+            self.date_to is None or dates.first <= self.date_to
+        )
+
+    def matcher(
+        self, dates: Optional[DateRange] = None
+    ) -> Callable[[Dict[str, str]], bool]:
+        """
+        Создает проверку сырой строки CSV
+
+        Args:
+            dates: Диапазон, в который записываются даты всех просмотренных
+                строк (только при условиях по дате)
+
+        Returns:
+            Функция, возвращающая True для подходящих строк
+        """
+        has_dates = self.has_dates
+        match_date = self.match_date
+        subjects = self.subjects
+        teachers = self.teachers
+
+        def match(row: Dict[str, str]) -> bool:
+            try:
+                if has_dates:
+                    date = row["date"].strip()
+                    if dates is not None:
+                        dates.add(date)
+                    if not match_date(date):
+                        return False
+                if subjects and row["subject"].strip() not in subjects:
+                    return False
+                if teachers and row["teacher_name"].strip() not in teachers:
+                    return False
+            except AttributeError:
+                # Недостающее поле (None): строку отклонит проверка формата
+                return True
+            return True
+
+        return match
+
+    def filter_columns(self, columns: ColumnarRecords) -> ColumnarRecords:
+        """
+        Отбирает строки колоночного хранилища по кодам словарей
+
+        Условия проверяются один раз на значение словаря, а строки
+        отбираются по множествам подходящих кодов.
+
+        Args:
+            columns: Колоночное хранилище
+
+        Returns:
+            Хранилище с подходящими строками (исходное, если подходят все)
+        """
+        conditions: List[Tuple[Any, Callable[[str], bool]]] = []
+        if self.has_dates:
+            conditions.append((columns.date, self.match_date))
+        if self.subjects:
+            conditions.append((columns.subject, self.subjects.__contains__))
+        if self.teachers:
+            conditions.append((columns.teacher_name, self.teachers.__contains__))
+
+        mask: Optional[List[bool]] = None
+        for column, predicate in conditions:
+            allowed = {
+                code for code, value in enumerate(column.values) if predicate(value)
+            }
+            if not allowed:
+                return ColumnarRecords()
+            if len(allowed) == len(column.values):
+                continue
+            selected = [code in allowed for code in column.codes]
+            mask = (
+                selected if mask is None else [a and b for a, b in zip(mask, selected)]
+            )
+
+        if mask is None:
+            return columns
+        return columns.select(mask)
@@ -0,0 +1,197 @@
+import csv
+import mmap
+import os
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Размер блока, который делится на строки за один вызов bytes.split
+BLOCK_SIZE = 1024 * 1024
+
+Row = Dict[Optional[str], Optional[str]]
+
+
+class MmapRowReader:
+    """
+    Чтение строк CSV файла через mmap с декодированием только нужных полей
+
+    Файл отображается в память и делится на строки и поля по байтам;
+    в str декодируются только поля из fields. Строки с кавычками или с
+    числом полей, отличным от заголовка, разбираются модулем csv и
+    возвращаются целиком, как их вернул бы csv.DictReader. Пустые строки
+    пропускаются, как в csv.DictReader.
+
+    Поддерживаются переводы строк \\n и \\r\\n. Ошибки кодировки в
+    полях, которые не декодируются, не обнаруживаются.
+
+    Можно читать только диапазон байтов файла от начала строки до начала
+    строки (см. CSVReader.split_ranges).
+
+    Attributes:
+        fieldnames: Заголовок CSV файла
+        size: Размер файла в байтах
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        fields: Sequence[str],
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            file_path: Путь к CSV файлу
+            fields: Поля, которые нужно декодировать
+            start: Начало читаемых строк; по умолчанию - после заголовка
+            end: Конец читаемых строк (начало следующей строки или конец
+                файла); по умолчанию - конец файла
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            UnicodeDecodeError: Если заголовок не в UTF-8
+        """
+        self._file = open(file_path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._buffer: Optional[mmap.mmap] = None
+        if self.size:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_end = self._find(b"\n", 0)
+        header = self._slice(0, header_end).rstrip(b"\r").decode("utf-8")
+        self.fieldnames: List[str] = next(csv.reader([header]), [])
+        self._start = header_end + 1 if start is None else start
+        # Конец последней строки без ее перевода строки
+        self._stop = self.size if end is None or end >= self.size else end - 1
+        self._wanted = [
+            (name, index)
+            for index, name in enumerate(self.fieldnames)
+            if name in set(fields)
+        ]
+
+    def __enter__(self) -> "MmapRowReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Закрывает отображение и файл"""
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        self._file.close()
+
+    def __iter__(self) -> Iterator[Row]:
+        columns = len(self.fieldnames)
+        wanted = self._wanted
+        pending: Optional[bytes] = None
+
+        for block in self._blocks():
+            if pending is None and b'"' not in block and b"\r" not in block:
+                # Блок без кавычек и \r: каждая строка - запись
+                for line in block.split(b"\n"):
+                    parts = line.split(b",")
+                    if len(parts) == columns:
+                        yield {name: parts[i].decode("utf-8") for name, i in wanted}
+                    elif line:
+                        yield self._parse_line(line)
+                continue
+
+            for line in block.split(b"\n"):
+                if line.endswith(b"\r"):
+                    line = line[:-1]
+                if pending is not None:
+                    # Продолжение значения в кавычках с переводом строки
+                    pending += b"\n" + line
+                    if _ends_quoted(line, True):
+                        continue
+                    line, pending = pending, None
+                elif b'"' in line and _ends_quoted(line):
+                    pending = line
+                    continue
+
+                if not line:
+                    continue
+                parts = line.split(b",")
+                if len(parts) == columns and b'"' not in line:
+                    yield {name: parts[i].decode("utf-8") for name, i in wanted}
+                else:
+                    yield self._parse_line(line)
+
+        if pending is not None:
+            yield self._parse_line(pending)
+
+    def count_quotes(self) -> int:
+        """Количество кавычек в читаемых строках"""
+        return sum(
+            self._slice(position, min(position + BLOCK_SIZE, self._stop)).count(b'"')
+            for position in range(self._start, self._stop, BLOCK_SIZE)
+        )
+
+    def _blocks(self) -> Iterator[bytes]:
+        """Блоки строк примерно по BLOCK_SIZE байт, без последнего \\n"""
+        position = self._start
+        while position < self._stop:
+            end = min(self._find(b"\n", position + BLOCK_SIZE), self._stop)
+            yield self._slice(position, end)
+            position = end + 1
+
+    def _parse_line(self, line: bytes) -> Row:
+        """Разбирает строку модулем csv, как csv.DictReader"""
+        values = next(csv.reader([line.decode("utf-8")]), [])
+        row: Row = dict(zip(self.fieldnames, values))
+        columns = len(self.fieldnames)
+        if len(values) > columns:
+            row[None] = values[columns:]  # type: ignore[assignment]
+        for name in self.fieldnames[len(values) :]:
+            row[name] = None
+        return row
+
+    def _find(self, sub: bytes, start: int) -> int:
+        """Позиция подстроки или размер файла, если ее нет"""
+        if self._buffer is None:
+            return self.size
+        position = self._buffer.find(sub, start)
+        return self.size if position == -1 else position
+
+    def _slice(self, start: int, end: int) -> bytes:
+        if self._buffer is None:
+            return b""
+        return self._buffer[start:end]
+
+
+def _ends_quoted(line: bytes, quoted: bool = False) -> bool:
+    """
+    Остается ли после строки незакрытым значение в кавычках
+
+    Кавычки разбираются по правилам csv.reader: значение в кавычках
+    начинается только с кавычки в начале поля, удвоенная кавычка внутри
+    него - сама кавычка, а кавычка внутри поля без кавычек - обычный
+    символ.
+
+    Args:
+        line: Строка файла без перевода строки
+        quoted: Начинается ли строка внутри значения в кавычках
+    """
+    position = 0
+    while True:
+        if quoted:
+            end = line.find(b'"', position)
+            if end == -1:
+                return True
+            if line[end + 1 : end + 2] == b'"':
+                position = end + 2
+                continue
+            quoted = False
+            # Остаток поля после закрывающей кавычки - обычные символы
+            position = line.find(b",", end + 1)
+            if position == -1:
+                return False
+            position += 1
+        if line[position : position + 1] == b'"':
+            quoted = True
+            position += 1
+            continue
+        position = line.find(b",", position)
+        if position == -1:
+            return False
+        position += 1
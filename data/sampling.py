@@ -0,0 +1,160 @@
+import math
+import random
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Строка CSV с номером строки в файле
+NumberedRow = Tuple[int, Dict[str, str]]
+
+
+class RowSampler:
+    """
+    Случайная выборка строк CSV до их преобразования
+
+    Выборка делается по сырым строкам, прошедшим условия отбора, поэтому
+    невыбранные строки не проверяются и не преобразуются. Два способа:
+
+    - rate: каждая строка попадает в выборку с вероятностью rate
+      (схема Бернулли); между выбранными строками пропускается
+      геометрически распределенное число строк, так что случайное число
+      нужно только на выбранную строку;
+    - size: равновероятная выборка ровно size строк из всех файлов
+      (резервуар, алгоритм L); строки становятся известны только после
+      чтения всех файлов и отдаются drain.
+
+    Состояние генератора переходит из файла в файл, поэтому при одном и
+    том же seed и порядке файлов выборка одинакова.
+
+    Attributes:
+        rows_seen: Количество просмотренных строк
+        rows_sampled: Количество строк в выборке
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        size: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            rate: Вероятность попадания строки в выборку (0 < rate <= 1)
+            size: Размер выборки в строках
+            seed: Начальное значение генератора случайных чисел
+
+        Raises:
+            ValueError: Если не задан ровно один из rate и size или
+                значение вне допустимых границ
+        """
+        if (rate is None) == (size is None):
+            raise ValueError("Нужно задать долю строк или размер выборки")
+        if rate is not None and not 0 < rate <= 1:
+            raise ValueError("Доля строк выборки должна быть от 0 до 1")
+        if size is not None and size < 1:
+            raise ValueError("Размер выборки должен быть не меньше 1")
+
+        self.rate = rate
+        self.size = size
+        self.seed = seed
+        self.rows_seen = 0
+        self.rows_sampled = 0
+        self._random = random.Random(seed)
+        # Бернулли: сколько строк пропустить до следующей выбранной
+        self._skip = self._next_skip() if rate is not None else 0
+        # Резервуар: (номер источника, номер строки, строка), источники
+        # в порядке чтения
+        self._reservoir: List[Tuple[int, int, Dict[str, str]]] = []
+        self._sources: List[str] = []
+        # Алгоритм L: множитель порога и номер следующей замены
+        self._weight = 1.0
+        self._next_index = 0
+
+    def sample(self, rows: Iterator[NumberedRow], source: str) -> Iterator[NumberedRow]:
+        """
+        Отбирает строки одного источника (файла)
+
+        Args:
+            rows: Пары (номер строки, строка) после условий отбора
+            source: Путь к файлу строк (для drain)
+
+        Yields:
+            Выбранные строки; для выборки фиксированного размера - ничего,
+            строки накапливаются до drain
+        """
+        if self.size is not None:
+            self._fill(rows, source)
+            return
+
+        skip = self._skip
+        for item in rows:
+            self.rows_seen += 1
+            if skip:
+                skip -= 1
+                continue
+            self.rows_sampled += 1
+            yield item
+            skip = self._next_skip()
+        self._skip = skip
+
+    def drain(self) -> List[Tuple[str, List[NumberedRow]]]:
+        """
+        Забирает накопленную выборку фиксированного размера
+
+        Returns:
+            Пары (путь к файлу, строки выборки по порядку) в порядке чтения
+            файлов; для схемы Бернулли - пустой список
+        """
+        reservoir, self._reservoir = self._reservoir, []
+        reservoir.sort(key=lambda item: (item[0], item[1]))
+        files: List[Tuple[str, List[NumberedRow]]] = []
+        for source, row_num, row in reservoir:
+            if not files or files[-1][0] != self._sources[source]:
+                files.append((self._sources[source], []))
+            files[-1][1].append((row_num, row))
+        return files
+
+    def _fill(self, rows: Iterator[NumberedRow], source: str) -> None:
+        """Пропускает строки источника через резервуар (алгоритм L)"""
+        self._sources.append(source)
+        source_index = len(self._sources) - 1
+        reservoir = self._reservoir
+        size = self.size or 0
+        rng = self._random
+
+        index = self.rows_seen
+        next_index = self._next_index
+        for row_num, row in rows:
+            if index < size:
+                reservoir.append((source_index, row_num, row))
+                index += 1
+                if index == size:
+                    self._weight = math.exp(math.log(self._uniform()) / size)
+                    next_index = self._jump(index)
+                continue
+            if index == next_index:
+                reservoir[rng.randrange(size)] = (source_index, row_num, row)
+                self._weight *= math.exp(math.log(self._uniform()) / size)
+                next_index = self._jump(index + 1)
+            index += 1
+
+        self.rows_seen = index
+        self._next_index = next_index
+        self.rows_sampled = len(reservoir)
+
+    def _jump(self, index: int) -> int:
+        """Номер следующей строки, заменяющей строку резервуара"""
+        gap = math.log(self._uniform()) / math.log1p(-self._weight)
+        return index + int(gap)
+
+    def _next_skip(self) -> int:
+        """Число строк до следующей выбранной при схеме Бернулли"""
+        rate = self.rate or 1.0
+        if rate == 1:
+            return 0
+        return int(math.log(self._uniform()) / math.log1p(-rate))
+
+    def _uniform(self) -> float:
+        """Случайное число из интервала (0, 1)"""
+        value = self._random.random()
+        while value == 0.0:
+            value = self._random.random()
+        return value
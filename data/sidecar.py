@@ -0,0 +1,141 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Optional
+from .columnar import ColumnarRecords, StringColumn
+
+MAGIC = b"SPRC"
+VERSION = 1
+SUFFIX = ".sidecar"
+
+# magic, версия, размер исходного CSV, mtime_ns исходного CSV,
+# число строк, длина блока словарей
+HEADER = struct.Struct("<4sIqqQQ")
+
+
+def sidecar_path(file_path: str) -> str:
+    """Путь к бинарному файлу-спутнику для CSV файла"""
+    return file_path + SUFFIX
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_sidecar(
+    file_path: str, columns: ColumnarRecords, stat: os.stat_result
+) -> bool:
+    """
+    Сохраняет колоночное представление CSV файла в бинарный файл-спутник
+
+    Формат: заголовок, словари строковых столбцов (JSON), затем столбцы
+    фиксированной ширины - коды uint32 для каждого строкового поля и
+    оценки float64. Блоки выровнены по 8 байт.
+
+    Args:
+        file_path: Путь к исходному CSV файлу
+        columns: Разобранные записи файла
+        stat: Результат os.stat исходного файла до его чтения; если файл
+            изменился во время чтения, спутник не совпадет с ним
+
+    Returns:
+        True, если файл записан; False, если запись невозможна
+    """
+    if sys.byteorder != "little":
+        return False
+    import tempfile
+
+    try:
+        dictionaries = json.dumps(
+            [columns.column(name).values for name in columns.STRING_COLUMNS],
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        target = sidecar_path(file_path)
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(target)), suffix=".tmp"
+        )
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    len(columns),
+                    len(dictionaries),
+                )
+            )
+            f.write(dictionaries)
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            for name in columns.STRING_COLUMNS:
+                f.write(array("I", columns.column(name).codes).tobytes())
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            f.write(array("d", columns.grade).tobytes())
+        os.replace(temp_path, target)
+    except OSError:
+        return False
+
+    return True
+
+
+def load_sidecar(file_path: str) -> Optional[ColumnarRecords]:
+    """
+    Отображает файл-спутник в память, если он соответствует CSV файлу
+
+    Столбцы возвращаются как memoryview поверх mmap без копирования.
+
+    Args:
+        file_path: Путь к исходному CSV файлу
+
+    Returns:
+        Колоночное хранилище или None, если файла-спутника нет, он поврежден
+        или CSV файл изменился после его записи
+    """
+    if sys.byteorder != "little":
+        return None
+
+    try:
+        stat = os.stat(file_path)
+        with open(sidecar_path(file_path), "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, size, mtime_ns, rows, dict_len = HEADER.unpack_from(buffer)
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or size != stat.st_size
+            or mtime_ns != stat.st_mtime_ns
+        ):
+            raise ValueError("Файл-спутник не соответствует CSV файлу")
+
+        offset = HEADER.size
+        dictionaries = json.loads(bytes(buffer[offset : offset + dict_len]))
+        offset = _align(offset + dict_len)
+
+        codes_offset = offset
+        grades_offset = _align(codes_offset + 4 * rows * len(dictionaries))
+        if len(dictionaries) != len(ColumnarRecords.STRING_COLUMNS):
+            raise ValueError("Некорректный набор словарей файла-спутника")
+        if grades_offset + 8 * rows != len(buffer):
+            raise ValueError("Некорректный размер файла-спутника")
+
+        view = memoryview(buffer)
+        columns = ColumnarRecords()
+        for name, values in zip(columns.STRING_COLUMNS, dictionaries):
+            codes = view[codes_offset : codes_offset + 4 * rows].cast("I")
+            setattr(columns, name, StringColumn.from_buffer(codes, values))
+            codes_offset += 4 * rows
+        columns.grade = view[grades_offset : grades_offset + 8 * rows].cast("d")
+    except (struct.error, ValueError, TypeError):
+        buffer.close()
+        return None
+
+    columns.buffer = buffer
+    return columns
@@ -0,0 +1,155 @@
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence
+
+MAGIC = b"SIDX"
+VERSION = 1
+SUFFIX = ".students.idx"
+
+# magic, версия, размер исходного CSV, mtime_ns исходного CSV,
+# число студентов, длина блока имен
+HEADER = struct.Struct("<4sIqqQQ")
+# смещение имени в блоке имен, длина имени, количество оценок, сумма оценок
+ENTRY = struct.Struct("<QQQd")
+
+StudentStats = Dict[str, List[float]]
+
+
+def index_path(file_path: str) -> str:
+    """Путь к индексу студентов для CSV файла"""
+    return file_path + SUFFIX
+
+
+def build_stats(records: Iterable[Dict]) -> StudentStats:
+    """
+    Сводит записи файла в пары [количество оценок, сумма оценок] по студентам
+
+    Оценки суммируются в порядке строк, как при формировании отчета,
+    поэтому средние по индексу совпадают со средними отчета.
+    """
+    stats: StudentStats = {}
+    for record in records:
+        student = stats.get(record["student_name"])
+        if student is None:
+            stats[record["student_name"]] = [1, record["grade"]]
+        else:
+            student[0] += 1
+            student[1] += record["grade"]
+    return stats
+
+
+def write_index(file_path: str, stats: StudentStats, stat: os.stat_result) -> bool:
+    """
+    Сохраняет индекс студентов CSV файла
+
+    Формат: заголовок, таблица записей фиксированной ширины, отсортированная
+    по имени в UTF-8, затем блок имен. Поиск выполняется двоичным поиском
+    по таблице без чтения файла целиком.
+
+    Args:
+        file_path: Путь к исходному CSV файлу
+        stats: Количество и сумма оценок по студентам
+        stat: Результат os.stat исходного файла до его чтения; если файл
+            изменился во время чтения, индекс не совпадет с ним
+
+    Returns:
+        True, если индекс записан; False, если запись невозможна
+    """
+    entries = sorted((name.encode("utf-8"), values) for name, values in stats.items())
+    names = b"".join(name for name, _ in entries)
+
+    try:
+        target = index_path(file_path)
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(target)), suffix=".tmp"
+        )
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    len(entries),
+                    len(names),
+                )
+            )
+            offset = 0
+            for name, (count, total) in entries:
+                f.write(ENTRY.pack(offset, len(name), count, total))
+                offset += len(name)
+            f.write(names)
+        os.replace(temp_path, target)
+    except OSError:
+        return False
+
+    return True
+
+
+def lookup_index(
+    file_path: str, students: Sequence[str]
+) -> Optional[Dict[str, Optional[List[float]]]]:
+    """
+    Ищет студентов в индексе CSV файла
+
+    Индекс отображается в память, и каждое имя ищется двоичным поиском,
+    поэтому время поиска не зависит от размера CSV файла.
+
+    Args:
+        file_path: Путь к исходному CSV файлу
+        students: Имена студентов
+
+    Returns:
+        Словарь {имя: [количество оценок, сумма оценок] или None, если
+        студента нет в файле}; None, если индекса нет, он поврежден или
+        CSV файл изменился после его записи
+    """
+    try:
+        stat = os.stat(file_path)
+        with open(index_path(file_path), "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, size, mtime_ns, count, names_len = HEADER.unpack_from(buffer)
+        names_offset = HEADER.size + count * ENTRY.size
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or size != stat.st_size
+            or mtime_ns != stat.st_mtime_ns
+            or names_offset + names_len != len(buffer)
+        ):
+            return None
+
+        def entry(position: int):
+            return ENTRY.unpack_from(buffer, HEADER.size + position * ENTRY.size)
+
+        def name(position: int) -> bytes:
+            offset, length, _, _ = entry(position)
+            start = names_offset + offset
+            return buffer[start : start + length]
+
+        result: Dict[str, Optional[List[float]]] = {}
+        for student in students:
+            key = student.encode("utf-8")
+            low, high = 0, count
+            while low < high:
+                middle = (low + high) // 2
+                if name(middle) < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < count and name(low) == key:
+                _, _, grades, total = entry(low)
+                result[student] = [grades, total]
+            else:
+                result[student] = None
+        return result
+    except struct.error:
+        return None
+    finally:
+        buffer.close()
@@ -0,0 +1,69 @@
+from typing import List, NamedTuple, Optional
+
+
+class RowError(NamedTuple):
+    """Ошибка в строке CSV файла"""
+
+    row_num: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"Ошибка в строке {self.row_num}: {self.message}"
+
+
+class ValidationError(ValueError):
+    """Ошибка пакетной проверки: содержит все найденные ошибки строк"""
+
+    def __init__(self, report: "ValidationReport") -> None:
+        super().__init__(report.summary())
+        self.report = report
+
+    def __reduce__(self):
+        return (self.__class__, (self.report,))
+
+
+class ValidationReport:
+    """
+    Сводка пакетной проверки файла
+
+    Собирает ошибки всех некорректных строк вместо остановки на первой.
+    Если задан max_errors, проверка прерывается при достижении этого
+    числа ошибок. Если skip_invalid=False, файл с ошибками считается
+    некорректным после завершения проверки.
+    """
+
+    def __init__(self, max_errors: Optional[int] = None, skip_invalid: bool = False):
+        self.max_errors = max_errors
+        self.skip_invalid = skip_invalid
+        self.errors: List[RowError] = []
+        self.rows_checked = 0
+
+    def add(self, row_num: int, message: str) -> None:
+        """
+        Регистрирует ошибку строки
+
+        Raises:
+            ValidationError: Если достигнуто максимальное число ошибок
+        """
+        self.errors.append(RowError(row_num, message))
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            raise ValidationError(self)
+
+    def finish(self) -> None:
+        """
+        Завершает проверку файла
+
+        Raises:
+            ValidationError: Если найдены ошибки и пропуск строк не разрешен
+        """
+        if self.errors and not self.skip_invalid:
+            raise ValidationError(self)
+
+    def summary(self) -> str:
+        """Текстовая сводка: количество ошибок и список строк"""
+        lines = [
+            f"Найдено некорректных строк: {len(self.errors)} "
+            f"(проверено строк: {self.rows_checked})"
+        ]
+        lines.extend(str(error) for error in self.errors)
+        return "\n".join(lines)
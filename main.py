@@ -1,8 +1,53 @@
 import argparse
+import contextlib
+import datetime
+import os
 import sys
-from typing import List
-from reports.student_performance_report import StudentPerformanceReport
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+from reports.base_report import BaseReport
+from reports.engine import ReportStates, ScanEngine
+from reports.registry import REPORT_CLASSES, ReportRegistry
 from data.csv_reader import CSVReader
+from data.filters import DateRange, RecordFilter
+from data.validation import ValidationReport
+from processing.parallel import FileStats, read_stats, submit_files
+from processing.profiler import Profiler, get_profiler, use_profiler
+from reports.groupby import DEFAULT_DISTINCT_PRECISION, DEFAULT_SKETCH_SIZE
+from reports.writers import WRITERS, create_writer
+
+if TYPE_CHECKING:
+    # Модули отдельных режимов импортируются при их запуске
+    from data.sampling import RowSampler
+    from processing.cache import AggregateCache
+    from processing.checkpoint import CheckpointedScan
+    from processing.dedupe import RowDeduplicator
+    from processing.watch import TailedFile
+    from reports.spill import SpillingScan
+
+REPORTS = ReportRegistry(REPORT_CLASSES)
+
+
+def iso_date(value: str) -> str:
+    """Проверяет дату в формате ГГГГ-ММ-ДД для аргументов командной строки"""
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"дата должна быть в формате ГГГГ-ММ-ДД: {value}"
+        )
 
 
 def parse_arguments():
@@ -10,49 +55,1429 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description="Анализ успеваемости студентов")
     parser.add_argument(
         "--files",
-        required=True,
         nargs="+",
+        default=None,
         help="Пути к CSV файлам с данными о студентах",
     )
     parser.add_argument(
         "--report",
-        required=True,
-        choices=["student-performance"],
-        help="Тип отчета для формирования",
+        nargs="+",
+        choices=list(REPORTS),
+        help="Типы отчетов для формирования; все отчеты строятся за один проход",
+    )
+    parser.add_argument(
+        "--student",
+        nargs="+",
+        default=None,
+        help="Вывести среднюю оценку студентов по индексам файлов вместо "
+        "отчета; индекс файла строится при первом запросе",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=list(WRITERS),
+        default="csv",
+        help="Формат вывода: строки выводятся по мере формирования, "
+        "таблица grid строится целиком",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Файл для вывода отчета (по умолчанию stdout); при нескольких "
+        "отчетах к имени файла добавляется название отчета",
+    )
+    parser.add_argument(
+        "--date-from",
+        type=iso_date,
+        default=None,
+        help="Учитывать только оценки с этой даты (ГГГГ-ММ-ДД, включительно)",
+    )
+    parser.add_argument(
+        "--date-to",
+        type=iso_date,
+        default=None,
+        help="Учитывать только оценки по эту дату (ГГГГ-ММ-ДД, включительно)",
+    )
+    parser.add_argument(
+        "--subject",
+        nargs="+",
+        default=[],
+        help="Учитывать только оценки по этим предметам",
+    )
+    parser.add_argument(
+        "--teacher",
+        nargs="+",
+        default=[],
+        help="Учитывать только оценки этих преподавателей",
+    )
+    ranking = parser.add_mutually_exclusive_group()
+    ranking.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        help="Вывести только N первых строк каждого отчета",
+    )
+    ranking.add_argument(
+        "--bottom",
+        type=int,
+        default=None,
+        help="Вывести только N последних строк каждого отчета",
+    )
+    parser.add_argument(
+        "--sketch-size",
+        type=int,
+        default=None,
+        help="Размер квантильных скетчей для медианы и процентилей "
+        f"(по умолчанию {DEFAULT_SKETCH_SIZE}, ошибка ранга около 1.7%%); "
+        "память и ошибка пропорциональны N и 1/N",
+    )
+    parser.add_argument(
+        "--distinct-precision",
+        type=int,
+        default=None,
+        help="Точность P счетчиков различных значений: 2**P байт на группу, "
+        f"ошибка 1.04/sqrt(2**P) (по умолчанию {DEFAULT_DISTINCT_PRECISION})",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Следить за дописыванием строк в файлы и выводить обновленные "
+        "отчеты; читаются только новые строки",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.1,
+        help="Интервал проверки файлов в режиме --watch, секунд",
+    )
+    parser.add_argument(
+        "--changes-only",
+        action="store_true",
+        help="В режиме --watch выводить только новые и изменившиеся строки",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Запустить сервер отчетов: файлы разбираются один раз, а отчеты "
+        "запрашиваются через client.py или HTTP",
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="Unix сокет сервера отчетов (по умолчанию student-reports.sock во "
+        "временном каталоге, если не задан --http-port)",
+    )
+    parser.add_argument(
+        "--http-port",
+        type=int,
+        default=None,
+        help="Порт HTTP сервера отчетов на 127.0.0.1 (GET /report?report=...)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Количество процессов для параллельного чтения файлов",
+    )
+    parser.add_argument(
+        "--chunk-mb",
+        type=float,
+        default=64,
+        help="Файлы больше этого размера (МБ) сводятся по частям, которые при "
+        "--workers больше 1 разбираются в разных процессах; при --checkpoint "
+        "- размер части, после которой может сохраняться контрольная точка",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Не учитывать повторяющиеся строки (совпадают все поля), в том "
+        "числе повторы из разных файлов",
+    )
+    parser.add_argument(
+        "--dedupe-memory-mb",
+        type=float,
+        default=256,
+        help="Память для отпечатков строк и фильтров Блума выгрузок при "
+        "--dedupe (МБ); при превышении отпечатки выгружаются во временные файлы",
+    )
+    sample = parser.add_mutually_exclusive_group()
+    sample.add_argument(
+        "--sample",
+        type=float,
+        default=None,
+        metavar="RATE",
+        help="Приближенные отчеты по случайной выборке: каждая строка "
+        "учитывается с вероятностью RATE; к средним добавляются "
+        "доверительные интервалы и размер выборки",
+    )
+    sample.add_argument(
+        "--sample-rows",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Приближенные отчеты по случайной выборке ровно N строк из всех файлов",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Начальное значение генератора выборки (по умолчанию случайное, "
+        "выводится в stderr)",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Уровень доверия интервалов при выборке",
+    )
+    parser.add_argument(
+        "--partial",
+        default=None,
+        help="Сохранить частичные состояния отчетов по файлам в бинарный файл "
+        "вместо вывода отчетов (для объединения с помощью --merge)",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        default=None,
+        help="Объединить файлы состояний, сохраненные с --partial, и вывести "
+        "отчеты; файлы складываются в указанном порядке",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=None,
+        help="Наибольшее количество групп отчетов в памяти; при превышении "
+        "группы выгружаются во временные файлы по разделам",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        metavar="PATH",
+        help="Периодически сохранять состояние расчета (учтенные файлы и "
+        "смещение в текущем файле) в файл контрольной точки; файл удаляется "
+        "после вывода отчетов",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Наименьшее время между сохранениями контрольной точки (секунды)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Продолжить расчет с контрольной точки --checkpoint",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Не использовать кэш агрегатов по файлам",
+    )
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Очистить кэш и заново разобрать все файлы",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Каталог кэша агрегатов (по умолчанию student-reports в "
+        "XDG_CACHE_HOME или ~/.cache)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=100,
+        help="Максимальный размер кэша в мегабайтах",
+    )
+    parser.add_argument(
+        "--cache-hash",
+        action="store_true",
+        help="Сверять с кэшем также SHA-256 содержимого файлов",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--csv-engine",
+        choices=CSVReader.ENGINES,
+        default="csv",
+        help="Способ разбора CSV: csv - модуль csv; mmap - файл отображается "
+        "в память, и декодируются только поля, нужные отчетам",
+    )
+    parser.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="Сохранять разобранные файлы в бинарные файлы-спутники и читать их через mmap",
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=None,
+        help="Проверять строки блоками, собирая до N ошибок по каждому файлу",
+    )
+    parser.add_argument(
+        "--skip-invalid",
+        action="store_true",
+        help="Пропускать некорректные строки, выводя их список в stderr",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Вывести в stderr время и счетчики по этапам обработки",
+    )
+    parser.add_argument(
+        "--profile-json",
+        default=None,
+        help="Сохранить показатели этапов в JSON файл",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Учитывать пиковое выделение памяти по этапам (замедляет работу)",
+    )
+    args = parser.parse_args()
 
+    if args.serve:
+        if (
+            args.report is not None
+            or args.student is not None
+            or args.watch
+            or args.dedupe
+            or args.memory_limit is not None
+            or sampling(args)
+            or args.checkpoint is not None
+            or args.partial is not None
+            or args.merge is not None
+            or args.output is not None
+            or create_filter(args)
+        ):
+            parser.error("--serve: отчеты, условия отбора и вывод задаются в запросах")
+        if args.socket is None and args.http_port is None:
+            from processing.protocol import DEFAULT_SOCKET
 
-def main():
-    """Основная функция программы"""
+            args.socket = DEFAULT_SOCKET
+        return args
+    if args.socket is not None or args.http_port is not None:
+        parser.error("--socket и --http-port используются только с --serve")
+    if args.merge is not None:
+        if (
+            args.files is not None
+            or args.report is not None
+            or args.student is not None
+            or args.watch
+            or args.partial is not None
+            or args.dedupe
+            or args.memory_limit is not None
+            or sampling(args)
+            or args.checkpoint is not None
+            or args.sketch_size is not None
+            or args.distinct_precision is not None
+            or create_filter(args)
+        ):
+            parser.error(
+                "--merge: файлы, отчеты и параметры расчета берутся из файлов "
+                "состояний"
+            )
+        if args.top is not None and args.top < 1:
+            parser.error("--top должно быть не меньше 1")
+        if args.bottom is not None and args.bottom < 1:
+            parser.error("--bottom должно быть не меньше 1")
+        return args
+    if args.files is None:
+        parser.error("нужно указать --files")
+    if args.report is None and args.student is None:
+        parser.error("нужно указать --report или --student")
+    if args.report is not None and args.student is not None:
+        parser.error("--report нельзя использовать вместе с --student")
+    if args.student is not None and (
+        args.date_from or args.date_to or args.subject or args.teacher
+    ):
+        parser.error("--student нельзя использовать вместе с условиями отбора")
+    if args.watch and args.student is not None:
+        parser.error("--watch нельзя использовать вместе с --student")
+    if args.watch_interval <= 0:
+        parser.error("--watch-interval должно быть больше 0")
+    if args.changes_only and not args.watch:
+        parser.error("--changes-only используется только с --watch")
+    if args.changes_only and args.output is not None:
+        parser.error("--changes-only выводит строки только в stdout")
+    if args.top is not None and args.top < 1:
+        parser.error("--top должно быть не меньше 1")
+    if args.bottom is not None and args.bottom < 1:
+        parser.error("--bottom должно быть не меньше 1")
+    if args.sketch_size is not None and args.sketch_size < 8:
+        parser.error("--sketch-size должно быть не меньше 8")
+    if args.distinct_precision is not None and not 4 <= args.distinct_precision <= 16:
+        parser.error("--distinct-precision должно быть от 4 до 16")
+    if args.date_from and args.date_to and args.date_from > args.date_to:
+        parser.error("--date-from должно быть не позже --date-to")
+    if args.workers < 1:
+        parser.error("--workers должно быть не меньше 1")
+    if args.dedupe and (args.student is not None or args.watch):
+        parser.error("--dedupe нельзя использовать вместе с --student и --watch")
+    if args.dedupe and args.workers > 1:
+        parser.error("--dedupe: файлы читаются по порядку, --workers не используется")
+    if args.dedupe_memory_mb <= 0:
+        parser.error("--dedupe-memory-mb должно быть больше 0")
+    if args.partial is not None and (
+        args.report is None
+        or args.watch
+        or args.dedupe
+        or args.memory_limit is not None
+        or args.output is not None
+    ):
+        parser.error(
+            "--partial сохраняет состояния отчетов из --report; --watch, "
+            "--dedupe, --memory-limit и --output с ним не используются"
+        )
+    if args.memory_limit is not None:
+        if args.memory_limit < 1:
+            parser.error("--memory-limit должно быть не меньше 1")
+        if args.student is not None or args.watch:
+            parser.error(
+                "--memory-limit нельзя использовать вместе с --student и --watch"
+            )
+        if args.workers > 1:
+            parser.error(
+                "--memory-limit: файлы читаются по порядку, --workers не используется"
+            )
+    if sampling(args):
+        if args.sample is not None and not 0 < args.sample <= 1:
+            parser.error("--sample должно быть больше 0 и не больше 1")
+        if args.sample_rows is not None and args.sample_rows < 1:
+            parser.error("--sample-rows должно быть не меньше 1")
+        if args.student is not None or args.watch or args.partial is not None:
+            parser.error(
+                "--sample и --sample-rows нельзя использовать вместе с "
+                "--student, --watch и --partial"
+            )
+        if args.sidecar or args.workers > 1:
+            parser.error(
+                "--sample и --sample-rows: строки отбираются при разборе CSV "
+                "по порядку, --sidecar и --workers не используются"
+            )
+        if args.sample_rows is not None and args.memory_limit is not None:
+            parser.error(
+                "--sample-rows уже ограничивает количество групп, "
+                "--memory-limit не используется"
+            )
+        if not 0 < args.confidence < 1:
+            parser.error("--confidence должно быть больше 0 и меньше 1")
+    elif args.seed is not None:
+        parser.error("--seed используется только с --sample и --sample-rows")
+    if args.checkpoint is not None:
+        if (
+            args.report is None
+            or args.watch
+            or args.partial is not None
+            or args.dedupe
+            or args.memory_limit is not None
+            or sampling(args)
+        ):
+            parser.error(
+                "--checkpoint сохраняет состояния отчетов из --report; --watch, "
+                "--partial, --dedupe, --memory-limit и выборка с ним не "
+                "используются"
+            )
+        if args.sidecar or args.workers > 1:
+            parser.error(
+                "--checkpoint: файлы читаются по порядку частями CSV, --sidecar "
+                "и --workers не используются"
+            )
+        if args.checkpoint_interval is not None and args.checkpoint_interval < 0:
+            parser.error("--checkpoint-interval должно быть не меньше 0")
+    elif args.resume:
+        parser.error("--resume используется только с --checkpoint")
+    if args.chunk_mb <= 0:
+        parser.error("--chunk-mb должно быть больше 0")
+    if args.cache_max_mb <= 0:
+        parser.error("--cache-max-mb должно быть больше 0")
+    if args.max_errors is not None and args.max_errors < 1:
+        parser.error("--max-errors должно быть не меньше 1")
+
+    return args
+
+
+def read_file_stats(
+    file_path: str, read: Callable[[], FileStats]
+) -> Tuple[ReportStates, Optional[DateRange]]:
+    """
+    Получает частичные состояния отчетов по файлу, завершая программу при
+    ошибке чтения
+
+    Пропущенные при пакетной проверке строки выводятся в stderr.
+
+    Args:
+        file_path: Путь к CSV файлу (для сообщения об ошибке)
+        read: Функция, возвращающая частичные состояния, сводку проверки
+            и диапазон дат
+
+    Returns:
+        Частичные состояния отчетов и диапазон дат строк файла
+    """
     try:
-        args = parse_arguments()
+        partial_states, validation, dates = read()
+    except FileNotFoundError:
+        print(f"Ошибка: Файл {file_path} не найден", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Ошибка при чтении файла {file_path}: {e}", file=sys.stderr)
+        sys.exit(1)
 
+    warn_skipped(file_path, validation)
+    return partial_states, dates
+
+
+def warn_skipped(file_path: str, validation: Optional[ValidationReport]) -> None:
+    """Выводит в stderr строки, пропущенные при пакетной проверке"""
+    if validation is not None and validation.errors:
+        print(
+            f"Предупреждение: в файле {file_path} пропущены строки. "
+            f"{validation.summary()}",
+            file=sys.stderr,
+        )
+
+
+def iter_file_stats(
+    engine: ScanEngine,
+    file_paths: List[str],
+    workers: int = 1,
+    csv_reader: Optional[CSVReader] = None,
+    dedupe: Optional["RowDeduplicator"] = None,
+) -> Iterator[Tuple[str, ReportStates, Optional[DateRange]]]:
+    """
+    Разбирает файлы и отдает их частичные состояния в порядке файлов
+
+    Args:
+        engine: Движок с отчетами
+        file_paths: Пути к CSV файлам
+        workers: Количество процессов для чтения файлов
+        csv_reader: Настроенный объект для чтения CSV файлов
+        dedupe: Отбор повторов строк (только при workers == 1)
+
+    Yields:
+        Путь к файлу, частичные состояния отчетов и диапазон дат строк
+    """
+    if csv_reader is None:
         csv_reader = CSVReader()
-        all_records = []
 
-        for file_path in args.files:
-            try:
-                records = csv_reader.read_file(file_path)
-                all_records.extend(records)
-            except FileNotFoundError:
-                print(f"Ошибка: Файл {file_path} не найден", file=sys.stderr)
-                sys.exit(1)
-            except Exception as e:
-                print(f"Ошибка при чтении файла {file_path}: {e}", file=sys.stderr)
-                sys.exit(1)
-
-        if not all_records:
+    profiler = get_profiler()
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            # Несколько задач на процесс: процессы не простаивают в ожидании
+            # следующей задачи, а результаты не копятся в памяти
+            for file_path, result in submit_files(
+                executor, engine, csv_reader, file_paths, 2 * workers
+            ):
+                # Разбор идет в других процессах: учитывается время ожидания
+                with profiler.stage("read"):
+                    partial_states, dates = read_file_stats(file_path, result)
+                yield file_path, partial_states, dates
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return
+
+    for file_path in file_paths:
+        with profiler.stage("read"):
+            partial_states, dates = read_file_stats(
+                file_path, lambda: read_stats(engine, csv_reader, file_path, dedupe)
+            )
+        yield file_path, partial_states, dates
+
+
+def collect_stats(
+    engine: ScanEngine,
+    file_paths: List[str],
+    workers: int = 1,
+    cache: Optional["AggregateCache"] = None,
+    csv_reader: Optional[CSVReader] = None,
+    dedupe: Optional["RowDeduplicator"] = None,
+) -> ReportStates:
+    """
+    Собирает состояния отчетов по всем файлам
+
+    Частичные состояния файлов (см. iter_partial_stats) объединяются в
+    порядке файлов, поэтому результат не зависит от количества процессов
+    и от того, взято ли состояние из кэша.
+
+    Args:
+        engine: Движок с отчетами
+        file_paths: Пути к CSV файлам
+        workers: Количество процессов для чтения файлов
+        cache: Кэш агрегатов по файлам
+        csv_reader: Настроенный объект для чтения CSV файлов
+        dedupe: Отбор повторов строк; состояние файла зависит от
+            предыдущих файлов, поэтому кэш с ним не используется
+
+    Returns:
+        Состояния отчетов в порядке engine.reports
+    """
+    return merge_partial_stats(
+        engine,
+        iter_partial_stats(engine, file_paths, workers, cache, csv_reader, dedupe),
+    )
+
+
+def merge_partial_stats(
+    engine: ScanEngine, partials: Iterable[Tuple[str, ReportStates]]
+) -> ReportStates:
+    """
+    Объединяет частичные состояния файлов в порядке их следования
+
+    Args:
+        engine: Движок с отчетами
+        partials: Пары (путь к файлу, частичные состояния)
+
+    Returns:
+        Состояния отчетов в порядке engine.reports
+    """
+    profiler = get_profiler()
+    states = engine.create_states()
+    for _, partial_states in partials:
+        with profiler.stage("merge"):
+            engine.merge(states, partial_states)
+    return states
+
+
+def iter_partial_stats(
+    engine: ScanEngine,
+    file_paths: List[str],
+    workers: int = 1,
+    cache: Optional["AggregateCache"] = None,
+    csv_reader: Optional[CSVReader] = None,
+    dedupe: Optional["RowDeduplicator"] = None,
+) -> Iterator[Tuple[str, ReportStates]]:
+    """
+    Отдает частичные состояния отчетов по файлам в порядке файлов
+
+    Разбираются только файлы, которых нет в кэше или которые изменились.
+    При условиях отбора по дате файлы, диапазон дат которых известен из
+    кэша и не пересекается с условиями, не читаются.
+
+    Args:
+        engine: Движок с отчетами
+        file_paths: Пути к CSV файлам
+        workers: Количество процессов для чтения файлов
+        cache: Кэш агрегатов по файлам
+        csv_reader: Настроенный объект для чтения CSV файлов
+        dedupe: Отбор повторов строк
+
+    Yields:
+        Путь к файлу и его частичные состояния
+    """
+    profiler = get_profiler()
+
+    record_filter = csv_reader.record_filter if csv_reader is not None else None
+
+    cached_states: Dict[str, ReportStates] = {}
+    # Отпечатки снимаются до чтения файлов: файл, дописанный во время
+    # разбора, не совпадет с записью кэша
+    fingerprints: Dict[str, Dict[str, Any]] = {}
+    if cache is not None:
+        with profiler.stage("cache"):
+            for file_path in file_paths:
+                try:
+                    fingerprint = fingerprints[file_path] = cache.fingerprint(file_path)
+                except OSError:
+                    # Ошибку сообщит чтение файла
+                    continue
+                partial_states = cache.get(file_path, fingerprint)
+                if partial_states is not None:
+                    cached_states[file_path] = engine.load_states(partial_states)
+                elif record_filter is not None and record_filter.has_dates:
+                    known_dates = cache.get_dates(file_path, fingerprint)
+                    if known_dates is not None and not record_filter.overlaps(
+                        DateRange(*known_dates)
+                    ):
+                        cached_states[file_path] = engine.create_states()
+
+    fresh_states = iter_file_stats(
+        engine,
+        [path for path in file_paths if path not in cached_states],
+        workers,
+        csv_reader,
+        dedupe,
+    )
+
+    stored = False
+    try:
+        for file_path in file_paths:
+            if file_path in cached_states:
+                partial_states = cached_states[file_path]
+            else:
+                _, partial_states, dates = next(fresh_states)
+                fingerprint = fingerprints.get(file_path)
+                if cache is not None and fingerprint is not None:
+                    with profiler.stage("cache"):
+                        cache.put(
+                            file_path, engine.dump_states(partial_states), fingerprint
+                        )
+                        stored = True
+                        if dates is not None:
+                            cache.put_dates(
+                                file_path, dates.first, dates.last, fingerprint
+                            )
+            yield file_path, partial_states
+    finally:
+        fresh_states.close()
+        if cache is not None and stored:
+            # Вытеснение просматривает весь каталог кэша: один раз за запуск
+            with profiler.stage("cache"):
+                cache.evict()
+
+
+def collect_spilled_stats(
+    scan: "SpillingScan",
+    file_paths: List[str],
+    csv_reader: CSVReader,
+    dedupe: Optional["RowDeduplicator"] = None,
+) -> ReportStates:
+    """
+    Собирает состояния отчетов, ограничивая количество групп в памяти
+
+    Файлы читаются по порядку; результат совпадает с collect_stats без
+    кэша (см. reports.spill.SpillingScan).
+
+    Args:
+        scan: Формирование отчетов с выгрузкой групп на диск
+        file_paths: Пути к CSV файлам
+        csv_reader: Настроенный объект для чтения CSV файлов
+        dedupe: Отбор повторов строк
+
+    Returns:
+        Состояния отчетов в порядке отчетов; состояния выгруженных отчетов
+        действительны, пока scan не закрыт
+    """
+    profiler = get_profiler()
+
+    for file_path in file_paths:
+
+        def read() -> FileStats:
+            validation = csv_reader.create_validation()
+            records: Iterable = csv_reader.iter_records(file_path, validation)
+            if dedupe is not None:
+                records = dedupe.filter(records)
+            scan.add_file(records)
+            return [], validation, None
+
+        with profiler.stage("read"):
+            read_file_stats(file_path, read)
+
+    return scan.finish()
+
+
+def collect_sampled_stats(
+    engine: ScanEngine,
+    file_paths: List[str],
+    csv_reader: CSVReader,
+    dedupe: Optional["RowDeduplicator"] = None,
+) -> ReportStates:
+    """
+    Собирает состояния отчетов по случайной выборке строк csv_reader.sampler
+
+    Строки выборки фиксированного размера известны только после чтения
+    всех файлов: они проверяются и учитываются после этого, по файлам в
+    порядке чтения.
+
+    Args:
+        engine: Движок с отчетами
+        file_paths: Пути к CSV файлам
+        csv_reader: Объект для чтения CSV файлов с выборкой строк
+        dedupe: Отбор повторов строк (среди выбранных строк)
+
+    Returns:
+        Состояния отчетов в порядке engine.reports
+    """
+    states = collect_stats(engine, file_paths, csv_reader=csv_reader, dedupe=dedupe)
+    if csv_reader.sampler is None:
+        return states
+
+    profiler = get_profiler()
+    for file_path, rows in csv_reader.sampler.drain():
+
+        def read() -> FileStats:
+            validation = csv_reader.create_validation()
+            records: Iterable = csv_reader.parse_sampled(rows, validation)
+            if dedupe is not None:
+                records = dedupe.filter(records)
+            return engine.scan(records), validation, None
+
+        with profiler.stage("read"):
+            partial_states, _ = read_file_stats(file_path, read)
+        with profiler.stage("merge"):
+            engine.merge(states, partial_states)
+    return states
+
+
+def lookup_students(
+    file_paths: List[str],
+    students: List[str],
+    csv_reader: Optional[CSVReader] = None,
+) -> Dict[str, Optional[List[float]]]:
+    """
+    Находит количество и сумму оценок студентов по индексам файлов
+
+    Файл без актуального индекса разбирается один раз, и индекс
+    сохраняется рядом с ним; следующие запросы не читают CSV файл.
+    Суммы по файлам складываются в порядке файлов, как при формировании
+    отчета.
+
+    Args:
+        file_paths: Пути к CSV файлам
+        students: Имена студентов
+        csv_reader: Настроенный объект для чтения CSV файлов
+
+    Returns:
+        Словарь {имя: [количество оценок, сумма оценок] или None, если
+        у студента нет оценок}
+    """
+    if csv_reader is None:
+        csv_reader = CSVReader()
+
+    profiler = get_profiler()
+    totals: Dict[str, Optional[List[float]]] = dict.fromkeys(students)
+
+    from data.student_index import build_stats, lookup_index, write_index
+
+    for file_path in file_paths:
+        with profiler.stage("index"):
+            found = lookup_index(file_path, students)
+
+        if found is None:
+
+            def build() -> Tuple[Any, Optional[ValidationReport], None]:
+                # Размер и время изменения снимаются до чтения: файл,
+                # дописанный во время разбора, не совпадет с индексом
+                try:
+                    stat: Optional[os.stat_result] = os.stat(file_path)
+                except OSError:
+                    stat = None
+                validation = csv_reader.create_validation()
+                if csv_reader.use_sidecar:
+                    records: Iterable = csv_reader.read_columns(file_path, validation)
+                else:
+                    records = csv_reader.iter_records(file_path, validation)
+                stats = build_stats(records)
+                if stat is not None and not (validation and validation.errors):
+                    write_index(file_path, stats, stat)
+                return stats, validation, None
+
+            with profiler.stage("read"):
+                stats, _ = read_file_stats(file_path, build)
+            found = {student: stats.get(student) for student in students}
+
+        for student, values in found.items():
+            if values is None:
+                continue
+            total = totals[student]
+            if total is None:
+                totals[student] = list(values)
+            else:
+                total[0] += values[0]
+                total[1] += values[1]
+
+    return totals
+
+
+def run_student_query(args: argparse.Namespace) -> None:
+    """Выводит средние оценки студентов из --student по индексам файлов"""
+    students = list(dict.fromkeys(name.strip() for name in args.student))
+    totals = lookup_students(
+        args.files, students, create_reader(args, ("student_name", "grade"))
+    )
+
+    for student, values in totals.items():
+        if values is None:
+            print(f"Предупреждение: студент {student} не найден", file=sys.stderr)
+    rows = [
+        (student, values[0], round(values[1] / values[0], 1))
+        for student, values in totals.items()
+        if values is not None
+    ]
+    if not rows:
+        print("Ошибка: Не найдено данных для обработки", file=sys.stderr)
+        sys.exit(1)
+
+    output: ContextManager[TextIO] = (
+        contextlib.nullcontext(sys.stdout)
+        if args.output is None
+        else open(args.output, "w", encoding="utf-8", newline="")
+    )
+    with output as stream:
+        writer = create_writer(
+            args.output_format, ["student_name", "grades", "grade"], stream
+        )
+        for row in rows:
+            writer.write_row(row)
+        writer.close()
+
+
+def create_reports(
+    names: List[str],
+    sketch_size: Optional[int] = None,
+    distinct_precision: Optional[int] = None,
+    confidence: Optional[float] = None,
+) -> List[BaseReport]:
+    """Создает отчеты по названиям, пропуская повторы"""
+    return [
+        REPORTS[name](sketch_size, distinct_precision, confidence)
+        for name in dict.fromkeys(names)
+    ]
+
+
+def report_output_path(output: str, report: BaseReport, several: bool) -> str:
+    """Путь к файлу отчета: при нескольких отчетах добавляется название отчета"""
+    if not several:
+        return output
+    root, ext = os.path.splitext(output)
+    return f"{root}.{report.name}{ext}"
+
+
+def create_reader(
+    args: argparse.Namespace,
+    fields: Optional[Iterable[str]] = None,
+    sampler: Optional["RowSampler"] = None,
+) -> CSVReader:
+    """
+    Создает объект для чтения CSV файлов согласно аргументам командной строки
+
+    Args:
+        args: Аргументы командной строки
+        fields: Поля записей, которые нужны отчетам (None - все поля)
+        sampler: Случайная выборка строк
+    """
+    return CSVReader(
+        use_sidecar=args.sidecar,
+        max_errors=args.max_errors,
+        skip_invalid=args.skip_invalid,
+        record_filter=create_filter(args),
+        chunk_bytes=int(args.chunk_mb * 1024 * 1024),
+        engine=args.csv_engine,
+        fields=fields,
+        sampler=sampler,
+    )
+
+
+def sampling(args: argparse.Namespace) -> bool:
+    """Строятся ли отчеты по случайной выборке строк"""
+    return args.sample is not None or args.sample_rows is not None
+
+
+def create_sampler(args: argparse.Namespace) -> Optional["RowSampler"]:
+    """
+    Создает выборку строк согласно аргументам командной строки
+
+    Без --seed начальное значение выбирается случайно и выводится в stderr
+    вместе с размером выборки, чтобы результат можно было повторить.
+    """
+    if not sampling(args):
+        return None
+    import random
+    from data.sampling import RowSampler
+
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    return RowSampler(args.sample, args.sample_rows, seed)
+
+
+def create_filter(args: argparse.Namespace) -> RecordFilter:
+    """Создает условия отбора строк согласно аргументам командной строки"""
+    return RecordFilter(args.date_from, args.date_to, args.subject, args.teacher)
+
+
+def create_cache(args: argparse.Namespace) -> Optional["AggregateCache"]:
+    """Создает кэш агрегатов согласно аргументам командной строки"""
+    if (
+        args.no_cache
+        or args.dedupe
+        or args.memory_limit is not None
+        or sampling(args)
+        or args.checkpoint is not None
+    ):
+        return None
+    import hashlib
+    from processing.cache import AggregateCache, default_cache_dir
+
+    # Агрегаты разных наборов отчетов, без пропущенных строк и с ними, а также
+    # с разными размерами скетчей и условиями отбора хранятся раздельно
+    namespace = "+".join(dict.fromkeys(args.report))
+    namespace += "-skip-invalid" if args.skip_invalid else ""
+    if args.sketch_size is not None:
+        namespace += f"-k{args.sketch_size}"
+    if args.distinct_precision is not None:
+        namespace += f"-p{args.distinct_precision}"
+    record_filter = create_filter(args)
+    if record_filter:
+        # Условия отбора могут содержать любые символы: в имя файла идет хэш
+        namespace += (
+            "-" + hashlib.sha1(record_filter.key.encode("utf-8")).hexdigest()[:12]
+        )
+    cache = AggregateCache(
+        args.cache_dir if args.cache_dir is not None else default_cache_dir(),
+        namespace,
+        max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        use_hash=args.cache_hash,
+    )
+    if args.rebuild_cache:
+        cache.clear()
+    return cache
+
+
+def run_report(args: argparse.Namespace) -> None:
+    """Формирует отчеты по аргументам командной строки"""
+    if args.student is not None:
+        run_student_query(args)
+        return
+    if args.watch:
+        run_watch(args)
+        return
+    if args.serve:
+        run_serve(args)
+        return
+    if args.merge is not None:
+        run_merge(args)
+        return
+
+    engine = ScanEngine(
+        create_reports(
+            args.report,
+            args.sketch_size,
+            args.distinct_precision,
+            args.confidence if sampling(args) else None,
+        )
+    )
+    if args.partial is not None:
+        run_partial(args, engine)
+        return
+    with contextlib.ExitStack() as resources:
+        dedupe = None
+        if args.dedupe:
+            from processing.dedupe import RowDeduplicator
+
+            dedupe = resources.enter_context(
+                RowDeduplicator(int(args.dedupe_memory_mb * 1024 * 1024))
+            )
+        sampler = create_sampler(args)
+        # Повтор определяется по всем полям строки
+        csv_reader = create_reader(args, None if dedupe else engine.fields, sampler)
+
+        if args.memory_limit is not None:
+            from reports.spill import SpillingScan
+
+            # Выгруженные группы читаются из временных файлов при выводе
+            scan = resources.enter_context(
+                SpillingScan(engine.reports, args.memory_limit)
+            )
+            states = collect_spilled_stats(scan, args.files, csv_reader, dedupe)
+        elif sampler is not None:
+            states = collect_sampled_stats(engine, args.files, csv_reader, dedupe)
+        elif args.checkpoint is not None:
+            checkpoints = create_checkpoints(args, engine, csv_reader)
+            states = collect_checkpointed_stats(checkpoints, args.files)
+        elif dedupe is not None:
+            states = collect_stats(
+                engine, args.files, csv_reader=csv_reader, dedupe=dedupe
+            )
+        else:
+            states = collect_stats(
+                engine, args.files, args.workers, create_cache(args), csv_reader
+            )
+
+        if sampler is not None:
+            print(
+                f"Выборка: {sampler.rows_sampled} из {sampler.rows_seen} строк "
+                f"(--seed {sampler.seed})",
+                file=sys.stderr,
+            )
+        if dedupe is not None and dedupe.duplicates:
+            print(
+                f"Пропущено повторяющихся строк: {dedupe.duplicates}",
+                file=sys.stderr,
+            )
+
+        if not engine.has_data(states):
             print("Ошибка: Не найдено данных для обработки", file=sys.stderr)
             sys.exit(1)
 
-        if args.report == "student-performance":
-            report = StudentPerformanceReport()
-            report.generate_report(all_records)
+        render_reports(engine, states, args)
+        if args.checkpoint is not None:
+            checkpoints.remove()
+
+
+def create_checkpoints(
+    args: argparse.Namespace, engine: ScanEngine, csv_reader: CSVReader
+) -> "CheckpointedScan":
+    """
+    Создает чтение с контрольными точками, при --resume - с загрузкой
+    сохраненной точки; завершает программу, если точка не подходит
+    """
+    from processing.checkpoint import DEFAULT_INTERVAL, CheckpointedScan
+
+    interval = args.checkpoint_interval
+    checkpoints = CheckpointedScan(
+        engine,
+        csv_reader,
+        args.checkpoint,
+        args.files,
+        shard_options(args),
+        DEFAULT_INTERVAL if interval is None else interval,
+        int(args.chunk_mb * 1024 * 1024),
+    )
+    if not args.resume:
+        return checkpoints
+    try:
+        resumed = checkpoints.resume()
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+    if resumed:
+        print(
+            f"Продолжение с контрольной точки: учтено файлов {checkpoints.done} "
+            f"из {len(args.files)}",
+            file=sys.stderr,
+        )
+    else:
+        print(
+            f"Контрольная точка {args.checkpoint} не найдена, расчет начинается "
+            "сначала",
+            file=sys.stderr,
+        )
+    return checkpoints
+
+
+def collect_checkpointed_stats(
+    checkpoints: "CheckpointedScan", file_paths: List[str]
+) -> ReportStates:
+    """
+    Собирает состояния отчетов, сохраняя контрольные точки
+
+    Файлы читаются по порядку, начиная с первого неучтенного. При ошибке
+    или прерывании сохраняется граница последнего учтенного файла, если
+    она дальше последней контрольной точки.
+
+    Args:
+        checkpoints: Чтение с контрольными точками
+        file_paths: Пути к CSV файлам
+
+    Returns:
+        Состояния отчетов в порядке отчетов
+    """
+    profiler = get_profiler()
+    try:
+        for file_path in file_paths[checkpoints.done :]:
+            with profiler.stage("read"):
+                partial_states, _ = read_file_stats(
+                    file_path, lambda: checkpoints.read_file(file_path)
+                )
+            with profiler.stage("merge"):
+                checkpoints.finish_file(partial_states)
+    except BaseException:
+        checkpoints.save_completed()
+        raise
+    return checkpoints.states
+
+
+def shard_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Параметры, от которых зависят состояния отчетов в файле состояний"""
+    return {
+        "sketch_size": args.sketch_size,
+        "distinct_precision": args.distinct_precision,
+        "filter": create_filter(args).key,
+        "skip_invalid": args.skip_invalid,
+    }
+
+
+def run_partial(args: argparse.Namespace, engine: ScanEngine) -> None:
+    """Сохраняет частичные состояния отчетов по файлам для --merge"""
+    from processing.shards import write_shard
+
+    partials = iter_partial_stats(
+        engine,
+        args.files,
+        args.workers,
+        create_cache(args),
+        create_reader(args, engine.fields),
+    )
+    try:
+        write_shard(args.partial, engine, shard_options(args), args.files, partials)
+    except OSError as e:
+        print(
+            f"Ошибка: не удалось сохранить файл состояний {args.partial}: {e}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def run_merge(args: argparse.Namespace) -> None:
+    """
+    Объединяет файлы состояний и выводит отчеты
+
+    Частичные состояния файлов складываются в порядке файлов состояний и
+    файлов внутри них, поэтому отчеты совпадают побитово с отчетами,
+    построенными одним запуском по всем файлам в том же порядке.
+    """
+    from processing.shards import Shard
+
+    shards = []
+    for path in args.merge:
+        try:
+            shards.append(Shard(path))
+        except FileNotFoundError:
+            print(f"Ошибка: Файл {path} не найден", file=sys.stderr)
+            sys.exit(1)
+        except ValueError as e:
+            print(f"Ошибка: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    first = shards[0]
+    for shard in shards[1:]:
+        if (shard.reports, shard.options) != (first.reports, first.options):
+            print(
+                f"Ошибка: файлы состояний {first.path} и {shard.path} сохранены "
+                "с разными отчетами или параметрами",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+    unknown = [name for name in first.reports if name not in REPORTS]
+    if unknown:
+        print(f"Ошибка: Неизвестный отчет: {unknown[0]}", file=sys.stderr)
+        sys.exit(1)
+
+    engine = ScanEngine(
+        create_reports(
+            first.reports,
+            first.options.get("sketch_size"),
+            first.options.get("distinct_precision"),
+        )
+    )
+    try:
+        states = merge_partial_stats(
+            engine, (item for shard in shards for item in shard.iter_states(engine))
+        )
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not engine.has_data(states):
+        print("Ошибка: Не найдено данных для обработки", file=sys.stderr)
+        sys.exit(1)
+
+    render_reports(engine, states, args)
+
+
+def render_reports(
+    engine: ScanEngine, states: ReportStates, args: argparse.Namespace
+) -> None:
+    """
+    Выводит отчеты в stdout или в файлы согласно аргументам командной строки
+
+    Args:
+        engine: Движок с отчетами
+        states: Состояния отчетов
+        args: Аргументы командной строки
+    """
+    several = len(engine.reports) > 1
+    for index, (report, state) in enumerate(zip(engine.reports, states)):
+        if args.output is None:
+            if index:
+                print()
+            report.render(
+                state,
+                create_writer(args.output_format, report.HEADERS, sys.stdout),
+                args.top,
+                args.bottom,
+            )
+            continue
+
+        output_path = report_output_path(args.output, report, several)
+        with open(output_path, "w", encoding="utf-8", newline="") as output:
+            report.render(
+                state,
+                create_writer(args.output_format, report.HEADERS, output),
+                args.top,
+                args.bottom,
+            )
+
+
+def render_changes(
+    engine: ScanEngine,
+    states: ReportStates,
+    args: argparse.Namespace,
+    previous: List[set],
+) -> None:
+    """
+    Выводит в stdout только новые и изменившиеся строки отчетов
+
+    Строка считается изменившейся, если изменились ее значения без учета
+    места в рейтинге.
+
+    Args:
+        engine: Движок с отчетами
+        states: Состояния отчетов
+        args: Аргументы командной строки
+        previous: Строки, выведенные ранее, по отчетам; обновляется на месте
+    """
+    for index, (report, state) in enumerate(zip(engine.reports, states)):
+        rows = report.finalize(state, args.top, args.bottom)
+        seen = {tuple(row[1:]) for row in rows}
+        changed = [row for row in rows if tuple(row[1:]) not in previous[index]]
+        previous[index] = seen
+        if not changed:
+            continue
+        writer = create_writer(args.output_format, report.HEADERS, sys.stdout)
+        for row in changed:
+            writer.write_row(row)
+        writer.close()
+        print()
+    sys.stdout.flush()
+
+
+def run_watch(args: argparse.Namespace, max_polls: Optional[int] = None) -> None:
+    """
+    Отслеживает дописывание строк в файлы и выводит обновленные отчеты
+
+    Args:
+        args: Аргументы командной строки
+        max_polls: Количество проверок файлов после первого чтения
+            (None - до прерывания пользователем)
+    """
+    from processing.watch import Watcher
+
+    engine = ScanEngine(
+        create_reports(args.report, args.sketch_size, args.distinct_precision)
+    )
+    watcher = Watcher(engine, args.files, create_reader(args, engine.fields))
+    previous: List[set] = [set() for _ in engine.reports]
+    profiler = get_profiler()
+
+    def refresh(initial: bool) -> bool:
+        changed = False
+        for tailed in watcher.files:
+            version = tailed.version
+            with profiler.stage("read"):
+                if initial:
+                    read_file_stats(tailed.path, lambda: watcher.update(tailed, True))
+                else:
+                    poll(tailed)
+            changed = changed or tailed.version != version
+        return changed
+
+    def poll(tailed: "TailedFile") -> None:
+        # Ошибка в дописанных строках не останавливает отслеживание:
+        # состояния файла не меняются, пока он не будет исправлен или дописан
+        try:
+            _, validation, _ = watcher.update(tailed)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка при чтении файла {tailed.path}: {e}", file=sys.stderr)
+            return
+        warn_skipped(tailed.path, validation)
+
+    def emit() -> None:
+        with profiler.stage("merge"):
+            states = watcher.states()
+        if not engine.has_data(states):
+            return
+        if args.changes_only:
+            render_changes(engine, states, args, previous)
+            return
+        render_reports(engine, states, args)
+        if args.output is None:
+            print()
+            sys.stdout.flush()
+
+    refresh(initial=True)
+    emit()
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            time.sleep(args.watch_interval)
+            polls += 1
+            if refresh(initial=False):
+                emit()
+    except KeyboardInterrupt:
+        return
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    """Загружает файлы и отвечает на запросы отчетов до прерывания"""
+    # asyncio, signal и сервер нужны только в этом режиме
+    import asyncio
+    import signal
+    from processing.server import ReportServer, serve
+
+    server = ReportServer(
+        args.files,
+        REPORTS,
+        CSVReader(
+            use_sidecar=args.sidecar,
+            max_errors=args.max_errors,
+            skip_invalid=args.skip_invalid,
+            engine=args.csv_engine,
+        ),
+    )
+    for file_path in server.file_paths:
+        read_file_stats(file_path, lambda: (None, server.load(file_path), None))
+
+    addresses = [args.socket] if args.socket is not None else []
+    if args.http_port is not None:
+        addresses.append(f"http://127.0.0.1:{args.http_port}/report")
+    message = f"Сервер отчетов запущен: {', '.join(addresses)}"
+
+    async def run() -> None:
+        serving = asyncio.ensure_future(
+            serve(
+                server,
+                args.socket,
+                args.http_port,
+                lambda: print(message, file=sys.stderr),
+            )
+        )
+        # SIGTERM по умолчанию завершает процесс без блоков finally, и файл
+        # сокета остался бы на диске: отмена задачи закрывает серверы
+        with contextlib.suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, serving.cancel
+            )
+        with contextlib.suppress(asyncio.CancelledError):
+            await serving
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        return
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    """Основная функция программы"""
+    try:
+        args = parse_arguments()
+
+        profiler = Profiler(
+            enabled=args.profile or args.profile_json is not None,
+            trace_memory=args.profile_memory,
+        )
+        with use_profiler(profiler):
+            try:
+                run_report(args)
+            finally:
+                if args.profile:
+                    profiler.write_summary(sys.stderr)
+                if args.profile_json is not None:
+                    profiler.write_json(args.profile_json)
 
     except KeyboardInterrupt:
         print("\nПрограмма прервана пользователем")
         sys.exit(1)
+    except BrokenPipeError:
+        # Получатель вывода закрыл канал (например, head): завершаемся молча
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
     except Exception as e:
         print(f"Неожиданная ошибка: {e}", file=sys.stderr)
         sys.exit(1)
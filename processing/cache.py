@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional, Any, Tuple
+
+
+def default_cache_dir() -> str:
+    """Каталог кэша по умолчанию (учитывает XDG_CACHE_HOME)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "student-reports")
+
+
+class AggregateCache:
+    """
+    Дисковый кэш частичных агрегатов отдельных файлов
+
+    Запись привязана к отпечатку файла: путь, размер, время изменения и,
+    при необходимости, SHA-256 содержимого. При изменении файла запись
+    считается устаревшей. Общий размер кэша ограничен: при превышении
+    удаляются записи, к которым дольше всего не обращались. Вытеснение
+    просматривает весь каталог кэша, поэтому оно запускается один раз
+    после сохранения всех записей (см. evict), а не при каждой записи.
+    """
+
+    VERSION = 1
+    # Пространство имен метаданных файлов (диапазонов дат), общее для отчетов
+    FILES_NAMESPACE = "files"
+
+    def __init__(
+        self,
+        cache_dir: str,
+        report_name: str,
+        max_bytes: int = 100 * 1024 * 1024,
+        use_hash: bool = False,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.report_name = report_name
+        self.max_bytes = max_bytes
+        self.use_hash = use_hash
+
+    def fingerprint(self, file_path: str) -> Dict[str, Any]:
+        """
+        Вычисляет отпечаток файла
+
+        Raises:
+            OSError: Если файл недоступен
+        """
+        stat = os.stat(file_path)
+        fingerprint: Dict[str, Any] = {
+            "path": os.path.realpath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if self.use_hash:
+            digest = hashlib.sha256()
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            fingerprint["sha256"] = digest.hexdigest()
+        return fingerprint
+
+    def get(
+        self, file_path: str, fingerprint: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, List[float]]]:
+        """
+        Возвращает закэшированный агрегат файла или None, если его нет
+        или файл изменился
+
+        Args:
+            file_path: Путь к файлу
+            fingerprint: Уже вычисленный отпечаток файла
+        """
+        entry = self._load(file_path, self.report_name, fingerprint)
+        return None if entry is None else entry["stats"]
+
+    def put(
+        self,
+        file_path: str,
+        stats: Dict[str, List[float]],
+        fingerprint: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Сохраняет агрегат файла; лимит размера применяет evict
+
+        Args:
+            file_path: Путь к файлу
+            stats: Агрегат файла
+            fingerprint: Отпечаток файла, вычисленный до его чтения; если
+                файл изменился во время чтения, запись не совпадет с ним.
+                По умолчанию вычисляется при сохранении
+        """
+        self._store(file_path, self.report_name, "stats", stats, fingerprint)
+
+    def get_dates(
+        self, file_path: str, fingerprint: Optional[Dict[str, Any]] = None
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Возвращает диапазон дат строк файла из метаданных кэша
+
+        Метаданные общие для всех отчетов и условий отбора.
+
+        Args:
+            file_path: Путь к файлу
+            fingerprint: Уже вычисленный отпечаток файла
+
+        Returns:
+            Первая и последняя дата или None, если они неизвестны
+        """
+        entry = self._load(file_path, self.FILES_NAMESPACE, fingerprint)
+        return None if entry is None else tuple(entry["dates"])
+
+    def put_dates(
+        self,
+        file_path: str,
+        first: str,
+        last: str,
+        fingerprint: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Сохраняет диапазон дат строк файла в метаданные кэша (см. put)"""
+        self._store(
+            file_path, self.FILES_NAMESPACE, "dates", [first, last], fingerprint
+        )
+
+    def _load(
+        self,
+        file_path: str,
+        namespace: str,
+        fingerprint: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Читает запись пространства имен, если она соответствует файлу"""
+        try:
+            if fingerprint is None:
+                fingerprint = self.fingerprint(file_path)
+            entry_path = self._entry_path(fingerprint["path"], namespace)
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            entry.get("version") != self.VERSION
+            or entry.get("report") != namespace
+            or entry.get("fingerprint") != fingerprint
+        ):
+            return None
+
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return entry
+
+    def _store(
+        self,
+        file_path: str,
+        namespace: str,
+        field: str,
+        value: Any,
+        fingerprint: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Атомарно записывает запись пространства имен для файла"""
+        try:
+            if fingerprint is None:
+                fingerprint = self.fingerprint(file_path)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry = {
+                "version": self.VERSION,
+                "report": namespace,
+                "fingerprint": fingerprint,
+                field: value,
+            }
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, self._entry_path(fingerprint["path"], namespace))
+        except OSError:
+            return
+
+    def evict(self) -> None:
+        """Удаляет самые давние записи, пока кэш превышает лимит размера"""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        """Удаляет все записи кэша текущего отчета"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        # Имя отчета может быть началом имени другого пространства имен
+        # (student-performance и student-performance-skip-invalid), поэтому
+        # имя записи проверяется целиком (см. _entry_path)
+        entry_name = re.compile(re.escape(self.report_name) + r"-[0-9a-f]{40}\.json")
+        for name in os.listdir(self.cache_dir):
+            if entry_name.fullmatch(name):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def _entry_path(self, real_path: str, namespace: Optional[str] = None) -> str:
+        key = hashlib.sha1(real_path.encode("utf-8")).hexdigest()
+        namespace = self.report_name if namespace is None else namespace
+        return os.path.join(self.cache_dir, f"{namespace}-{key}.json")
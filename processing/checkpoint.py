@@ -0,0 +1,296 @@
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional
+from data.csv_reader import ByteRange, CSVReader
+from data.validation import ValidationError, ValidationReport
+from processing.parallel import FileStats
+from reports.engine import ReportStates, ScanEngine
+
+VERSION = 1
+
+# Интервал сохранения контрольных точек по умолчанию (секунды)
+DEFAULT_INTERVAL = 60.0
+
+
+class Position(NamedTuple):
+    """Место в файле, до которого учтены строки"""
+
+    # Начало следующей строки (байты)
+    offset: int
+    # Количество строк файла до offset без заголовка
+    rows: int
+
+
+class CheckpointedScan:
+    """
+    Чтение файлов по порядку с сохранением контрольных точек
+
+    Файлы читаются диапазонами байтов примерно по chunk_bytes. После
+    каждого диапазона и каждого файла, если с прошлого сохранения прошло
+    не меньше interval секунд, в файл контрольной точки атомарно
+    записываются объединенные состояния прочитанных файлов, состояние
+    текущего файла, смещение в нем и найденные ошибки строк. Строки
+    диапазонов учитываются в одно состояние файла по порядку строк,
+    поэтому отчеты, в том числе после продолжения с контрольной точки,
+    совпадают побитово с расчетом без контрольных точек.
+
+    Attributes:
+        done: Количество полностью учтенных файлов
+        states: Объединенные состояния учтенных файлов
+    """
+
+    def __init__(
+        self,
+        engine: ScanEngine,
+        csv_reader: CSVReader,
+        path: str,
+        file_paths: List[str],
+        options: Dict[str, Any],
+        interval: float = DEFAULT_INTERVAL,
+        chunk_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        """
+        Args:
+            engine: Движок с отчетами
+            csv_reader: Настроенный объект для чтения CSV файлов
+            path: Путь к файлу контрольной точки
+            file_paths: Пути к CSV файлам в порядке чтения
+            options: Параметры, от которых зависят состояния (условия
+                отбора, размеры скетчей и т.п.); при продолжении должны
+                совпадать
+            interval: Наименьшее время между сохранениями (секунды)
+            chunk_bytes: Примерный размер диапазона байтов
+        """
+        self.engine = engine
+        self.csv_reader = csv_reader
+        self.path = path
+        self.file_paths = list(file_paths)
+        self.options = options
+        self.interval = interval
+        self.chunk_bytes = chunk_bytes
+
+        self.done = 0
+        self.states = engine.create_states()
+        # Текущий файл: место, состояние и сводка проверки после последнего
+        # учтенного диапазона
+        self._position: Optional[Position] = None
+        self._file_states: Optional[ReportStates] = None
+        self._validation: Optional[ValidationReport] = None
+        # Объединенные состояния не изменяются (нет незавершенного слияния)
+        self._consistent = True
+        self._saved_done = 0
+        self._saved_at = time.monotonic()
+
+    def resume(self) -> bool:
+        """
+        Загружает сохраненную контрольную точку
+
+        Returns:
+            True, если контрольная точка найдена и загружена
+
+        Raises:
+            ValueError: Если файл поврежден, сохранен с другими отчетами,
+                файлами или параметрами либо прочитанные файлы изменились
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except ValueError as e:
+            raise ValueError(f"Файл контрольной точки поврежден: {self.path}") from e
+
+        if data.get("version") != VERSION:
+            raise ValueError(
+                f"Неподдерживаемая версия контрольной точки {self.path}: "
+                f"{data.get('version')}"
+            )
+        if (data["reports"], data["options"], data["files"]) != (
+            self.engine.names,
+            self.options,
+            self.file_paths,
+        ):
+            raise ValueError(
+                f"Контрольная точка {self.path} сохранена с другими отчетами, "
+                "файлами или параметрами"
+            )
+        for file_path, stat in zip(self.file_paths, data["stats"]):
+            if _file_stat(file_path) != stat:
+                raise ValueError(
+                    f"Файл {file_path} изменился после сохранения контрольной точки"
+                )
+
+        self.done = data["done"]
+        self.states = self.engine.load_states(data["states"])
+        current = data["current"]
+        if current is not None:
+            self._position = Position(current["offset"], current["rows"])
+            self._file_states = self.engine.load_states(current["states"])
+            self._validation = self.csv_reader.create_validation()
+            if self._validation is not None:
+                for row_num, message in current["errors"]:
+                    self._validation.add(row_num, message)
+                self._validation.rows_checked = current["rows_checked"]
+        self._saved_done = self.done
+        return True
+
+    def read_file(self, file_path: str) -> FileStats:
+        """
+        Читает следующий файл, продолжая с сохраненного места
+
+        Ошибки строк проверяются так же, как при чтении файла целиком:
+        без пакетной проверки - ошибка первой некорректной строки, с
+        max_errors - остановка на max_errors-й ошибке.
+
+        Args:
+            file_path: Путь к файлу номер done
+
+        Returns:
+            Частичные состояния отчетов по файлу и сводка пакетной проверки
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если формат файла некорректен
+            ValidationError: Если пакетная проверка нашла ошибки
+        """
+        position = self._position
+        if position is None:
+            self._file_states = self.engine.create_states()
+            self._validation = self.csv_reader.create_validation()
+        states = self._file_states
+        validation = self._validation
+        assert states is not None
+
+        offset = None if position is None else position.offset
+        rows = 0 if position is None else position.rows
+        ranges = deque(
+            self.csv_reader.split_ranges(file_path, self.chunk_bytes, offset)
+        )
+        if not ranges and position is None:
+            # Файл без строк: проверяется только заголовок
+            ranges.append(ByteRange(0, 0))
+
+        while ranges:
+            byte_range = ranges.popleft()
+            part = ValidationReport(1 if validation is None else None, True)
+            records = self.csv_reader.read_range(file_path, byte_range, part)
+            while records.quotes % 2 and ranges:
+                # Граница попала внутрь значения в кавычках
+                byte_range = ByteRange(byte_range.start, ranges.popleft().end)
+                records = self.csv_reader.read_range(file_path, byte_range, part)
+
+            try:
+                self.engine.scan(records, states)
+            except ValidationError as e:
+                part = e.report
+            # Номера строк файла начинаются с 2: первая строка - заголовок
+            for error in part.errors:
+                row_num = rows + error.row_num + 1
+                if validation is None:
+                    raise ValueError(f"Ошибка в строке {row_num}: {error.message}")
+                validation.add(row_num, error.message)
+            if validation is not None:
+                validation.rows_checked += part.rows_checked
+
+            rows += records.rows
+            self._position = Position(byte_range.end, rows)
+            self._save_due()
+
+        if validation is not None:
+            validation.finish()
+        return states, validation, None
+
+    def finish_file(self, partial_states: ReportStates) -> None:
+        """
+        Добавляет состояния прочитанного файла к объединенным
+
+        Args:
+            partial_states: Состояния, возвращенные read_file
+        """
+        self._consistent = False
+        self.engine.merge(self.states, partial_states)
+        self.done += 1
+        self._position = None
+        self._file_states = None
+        self._validation = None
+        self._consistent = True
+        self._save_due()
+
+    def save(self) -> None:
+        """
+        Записывает контрольную точку
+
+        Raises:
+            OSError: Если файл не удалось записать
+        """
+        current = None
+        processed = self.done
+        if self._position is not None and self._file_states is not None:
+            validation = self._validation
+            current = {
+                "offset": self._position.offset,
+                "rows": self._position.rows,
+                "states": self.engine.dump_states(self._file_states),
+                "errors": [] if validation is None else validation.errors,
+                "rows_checked": 0 if validation is None else validation.rows_checked,
+            }
+            processed += 1
+        data = {
+            "version": VERSION,
+            "reports": self.engine.names,
+            "options": self.options,
+            "files": self.file_paths,
+            "stats": [_file_stat(path) for path in self.file_paths[:processed]],
+            "done": self.done,
+            "states": self.engine.dump_states(self.states),
+            "current": current,
+        }
+
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self._saved_done = self.done
+        self._saved_at = time.monotonic()
+
+    def save_completed(self) -> None:
+        """
+        Сохраняет учтенные файлы при прерывании чтения
+
+        Состояние текущего файла могло быть изменено не до конца
+        диапазона, поэтому сохраняется только граница последнего
+        учтенного файла и только если она дальше сохраненной точки.
+        """
+        if self._consistent and self.done > self._saved_done:
+            self._position = None
+            self.save()
+
+    def remove(self) -> None:
+        """Удаляет файл контрольной точки после завершения расчета"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _save_due(self) -> None:
+        """Сохраняет контрольную точку, если прошло не меньше interval"""
+        if time.monotonic() - self._saved_at >= self.interval:
+            self.save()
+
+
+def _file_stat(path: str) -> Optional[List[int]]:
+    """Размер и время изменения файла (None, если файла нет)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
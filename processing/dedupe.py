@@ -0,0 +1,259 @@
+import mmap
+import os
+import shutil
+import tempfile
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Оценка памяти на отпечаток в множестве: объект int и ячейка таблицы
+SET_ENTRY_BYTES = 80
+# Бит фильтра Блума на отпечаток и число проверяемых бит: ложных
+# срабатываний около 1%
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_HASHES = 7
+# Отпечатков в одном блоке записи файла выгрузки
+WRITE_CHUNK = 64 * 1024
+# Если фильтры Блума заняли почти весь бюджет, множество все равно
+# вмещает не меньше этой доли исходной емкости: иначе выгрузка шла бы
+# на каждой новой записи
+MIN_CAPACITY_SHARE = 16
+
+
+class BloomFilter:
+    """
+    Фильтр Блума для 64-битных отпечатков
+
+    Позиции бит получаются двойным хэшированием из половин отпечатка,
+    поэтому отпечаток не хэшируется повторно.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.size = max(64, capacity * BLOOM_BITS_PER_ENTRY)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fingerprint: int) -> Iterator[int]:
+        low = fingerprint & 0xFFFFFFFF
+        step = ((fingerprint >> 32) & 0xFFFFFFFF) | 1
+        size = self.size
+        for i in range(BLOOM_HASHES):
+            yield (low + i * step) % size
+
+    def add(self, fingerprint: int) -> None:
+        """Добавляет отпечаток"""
+        bits = self.bits
+        for position in self._positions(fingerprint):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        """False - отпечатка точно нет; True - отпечаток, вероятно, есть"""
+        bits = self.bits
+        size = self.size
+        position = fingerprint & 0xFFFFFFFF
+        step = ((fingerprint >> 32) & 0xFFFFFFFF) | 1
+        for _ in range(BLOOM_HASHES):
+            position %= size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+        return True
+
+
+class SpilledRun:
+    """Отсортированные отпечатки в файле, отображенном в память"""
+
+    def __init__(self, path: str, fingerprints: Iterable[int], count: int) -> None:
+        """
+        Отпечатки записываются в файл блоками по WRITE_CHUNK, поэтому
+        слияние выгрузок не загружает их в память целиком.
+
+        Args:
+            path: Путь к файлу выгрузки
+            fingerprints: Отсортированные отпечатки
+            count: Количество отпечатков (емкость фильтра Блума)
+        """
+        self.bloom = BloomFilter(count)
+        add = self.bloom.add
+        iterator = iter(fingerprints)
+        with open(path, "wb") as f:
+            while True:
+                chunk = array("q", islice(iterator, WRITE_CHUNK))
+                if not chunk:
+                    break
+                for fingerprint in chunk:
+                    add(fingerprint)
+                chunk.tofile(f)
+        self.path = path
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._values = memoryview(self._buffer).cast("q")
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        if fingerprint not in self.bloom:
+            return False
+        values = self._values
+        index = bisect_left(values, fingerprint)
+        return index < len(values) and values[index] == fingerprint
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._values)
+
+    def close(self) -> None:
+        """Закрывает отображение и удаляет файл"""
+        self._values.release()
+        self._buffer.close()
+        os.remove(self.path)
+
+
+class RowDeduplicator:
+    """
+    Отбрасывает повторы записей при потоковом чтении
+
+    Для записи хранится только 64-битный отпечаток - hash() кортежа ее
+    полей, а не сама запись. Пока отпечатки помещаются в бюджет памяти, они
+    хранятся в множестве. При превышении бюджета множество выгружается на
+    диск отсортированным файлом, который отображается в память, а в памяти
+    остается только фильтр Блума выгрузки (10 бит на отпечаток); фильтры
+    входят в бюджет, и множество уменьшается на их размер. Новые записи,
+    которых нет в выгрузке, почти всегда отсеиваются фильтром без
+    обращения к файлу; поиск в файле - двоичный. Выгрузки сливаются
+    потоком в новый файл, как разряды двоичного счетчика, поэтому их не
+    больше log2 числа выгруженных отпечатков.
+
+    Отпечатки сравниваются только в пределах одного запуска, поэтому
+    случайное зерно hash() для строк не мешает. Вероятность совпадения
+    отпечатков разных записей - около n**2 / 2**65 (для 100 млн записей
+    меньше 0.1%).
+
+    Attributes:
+        rows: Количество просмотренных записей
+        duplicates: Количество отброшенных повторов
+    """
+
+    def __init__(
+        self, memory_bytes: int = 256 * 1024 * 1024, spill_dir: Optional[str] = None
+    ) -> None:
+        """
+        Args:
+            memory_bytes: Бюджет памяти множества отпечатков и фильтров
+                Блума выгрузок в байтах
+            spill_dir: Каталог для временных файлов выгрузки (по умолчанию
+                системный временный каталог)
+        """
+        self.memory_bytes = memory_bytes
+        self.capacity = max(1, memory_bytes // SET_ENTRY_BYTES)
+        self._min_capacity = max(1, self.capacity // MIN_CAPACITY_SHARE)
+        self.spill_dir = spill_dir
+        self.rows = 0
+        self.duplicates = 0
+        self._recent: set = set()
+        self._runs: List[SpilledRun] = []
+        self._directory: Optional[str] = None
+        self._spills = 0
+
+    def __enter__(self) -> "RowDeduplicator":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def add(self, fingerprint: int) -> bool:
+        """
+        Учитывает отпечаток
+
+        Returns:
+            True, если отпечаток встретился впервые
+        """
+        recent = self._recent
+        if fingerprint in recent:
+            return False
+        for run in self._runs:
+            if fingerprint in run:
+                return False
+        recent.add(fingerprint)
+        if len(recent) >= self.capacity:
+            self._spill()
+        return True
+
+    def filter(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Пропускает только первые вхождения записей
+
+        Args:
+            records: Записи в порядке чтения
+
+        Yields:
+            Записи, которые не встречались раньше (в том числе в
+            предыдущих файлах)
+        """
+        add = self.add
+        key = self._key
+        for record in records:
+            self.rows += 1
+            if add(hash(key(record))):
+                yield record
+            else:
+                self.duplicates += 1
+
+    @staticmethod
+    def _key(record: Dict[str, Any]) -> Tuple:
+        """Поля записи, совпадение которых означает повтор"""
+        return (
+            record["student_name"],
+            record["subject"],
+            record["teacher_name"],
+            record["date"],
+            record["grade"],
+        )
+
+    @property
+    def spilled(self) -> int:
+        """Количество отпечатков, выгруженных на диск"""
+        return sum(len(run) for run in self._runs)
+
+    def _spill(self) -> None:
+        """
+        Выгружает множество отпечатков на диск
+
+        Множество сливается в один новый файл с последними выгрузками,
+        меньшими двойного размера сливаемого: каждая выгрузка остается хотя
+        бы вдвое больше следующей, даже когда множество уменьшается. Затем
+        емкость множества уменьшается на размер фильтров Блума всех
+        выгрузок.
+        """
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="dedupe-", dir=self.spill_dir)
+        runs = self._runs
+        recent = sorted(self._recent)
+        self._recent = set()
+        older: List[SpilledRun] = []
+        count = len(recent)
+        while runs and len(runs[-1]) < 2 * count:
+            older.append(runs.pop())
+            count += len(older[-1])
+        runs.append(SpilledRun(self._next_path(), merge(*older, recent), count))
+        for run in older:
+            run.close()
+        bloom_bytes = sum(len(run.bloom.bits) for run in runs)
+        self.capacity = max(
+            self._min_capacity, (self.memory_bytes - bloom_bytes) // SET_ENTRY_BYTES
+        )
+
+    def _next_path(self) -> str:
+        """Путь к новому файлу выгрузки"""
+        self._spills += 1
+        return os.path.join(self._directory or "", f"run{self._spills}.bin")
+
+    def close(self) -> None:
+        """Удаляет временные файлы выгрузки"""
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
@@ -0,0 +1,321 @@
+import os
+from collections import deque
+from functools import partial
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+from data.csv_reader import ByteRange, CSVReader
+from data.filters import DateRange
+from data.validation import ValidationError, ValidationReport
+from reports.engine import ReportStates, ScanEngine
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from processing.dedupe import RowDeduplicator
+
+FileStats = Tuple[ReportStates, Optional[ValidationReport], Optional[DateRange]]
+# Частичные состояния диапазона, сводка проверки с номерами строк от начала
+# диапазона, диапазон дат, количество строк и количество кавычек
+RangeStats = Tuple[
+    Optional[ReportStates], ValidationReport, Optional[DateRange], int, int
+]
+
+
+def aggregate_file(
+    engine: ScanEngine, csv_reader: CSVReader, file_path: str
+) -> FileStats:
+    """
+    Читает файл и сводит его записи в частичные состояния отчетов
+
+    Выполняется в процессе-обработчике: родителю возвращаются только
+    агрегаты (например, пары [количество, сумма] на студента), а не
+    словари строк.
+
+    Args:
+        engine: Движок с отчетами
+        csv_reader: Настроенный объект для чтения CSV файлов
+        file_path: Путь к CSV файлу
+
+    Returns:
+        Частичные состояния отчетов, сводка пакетной проверки (None,
+        если она не включена) и диапазон дат строк файла (None, если он
+        не определялся)
+    """
+    return read_stats(engine, csv_reader, file_path)
+
+
+def read_stats(
+    engine: ScanEngine,
+    csv_reader: CSVReader,
+    file_path: str,
+    dedupe: Optional["RowDeduplicator"] = None,
+) -> FileStats:
+    """
+    Сводит записи файла в частичные состояния отчетов
+
+    При включенных файлах-спутниках агрегируются столбцы, отображенные
+    в память, иначе записи читаются потоково. Файл больше
+    csv_reader.chunk_bytes сводится по тем же диапазонам байтов, что и при
+    разборе в нескольких процессах (см. combine_ranges), поэтому суммы не
+    зависят от количества процессов. Повторы строк отбрасываются только
+    при потоковом чтении файла целиком.
+
+    Args:
+        engine: Движок с отчетами
+        csv_reader: Объект для чтения CSV файлов
+        file_path: Путь к CSV файлу
+        dedupe: Отбор повторов строк, общий для всех файлов
+
+    Returns:
+        Частичные состояния отчетов, сводка пакетной проверки и диапазон
+        дат строк файла
+    """
+    if dedupe is None:
+        ranges = _split_file(csv_reader, file_path)
+        if ranges is not None:
+            return combine_ranges(
+                engine,
+                csv_reader,
+                file_path,
+                (
+                    (
+                        byte_range,
+                        partial(
+                            aggregate_range, engine, csv_reader, file_path, byte_range
+                        ),
+                    )
+                    for byte_range in ranges
+                ),
+            )
+
+    validation = csv_reader.create_validation()
+    dates = _create_dates(csv_reader)
+    if dedupe is not None:
+        records = dedupe.filter(csv_reader.iter_records(file_path, validation, dates))
+    elif csv_reader.use_sidecar:
+        records = csv_reader.read_columns(file_path, validation, dates)
+    else:
+        records = csv_reader.iter_records(file_path, validation, dates)
+    states = engine.scan(records)
+    return states, validation, dates if dates else None
+
+
+def _create_dates(csv_reader: CSVReader) -> Optional[DateRange]:
+    """Диапазон дат для заполнения при чтении (None, если он не нужен)"""
+    # Диапазон дат известен даром только по словарю спутника или при
+    # условиях отбора по дате, когда даты строк все равно просматриваются
+    record_filter = csv_reader.record_filter
+    if csv_reader.use_sidecar or (
+        record_filter is not None and record_filter.has_dates
+    ):
+        return DateRange()
+    return None
+
+
+def aggregate_range(
+    engine: ScanEngine, csv_reader: CSVReader, file_path: str, byte_range: ByteRange
+) -> RangeStats:
+    """
+    Сводит записи диапазона байтов файла в частичные состояния отчетов
+
+    Выполняется в процессе-обработчике: как и aggregate_file, он
+    возвращает только агрегаты. Ошибки строк всегда собираются в сводку
+    без остановки (кроме достижения max_errors), чтобы родитель мог
+    пронумеровать их в порядке файла и применить настройки проверки к
+    файлу целиком. Без пакетной проверки разбор диапазона прерывается на
+    первой ошибке.
+
+    Args:
+        engine: Движок с отчетами
+        csv_reader: Настроенный объект для чтения CSV файлов
+        file_path: Путь к CSV файлу
+        byte_range: Диапазон байтов
+
+    Returns:
+        Частичные состояния (None, если разбор прерван на max_errors
+        ошибке), сводка проверки с номерами строк от начала диапазона,
+        диапазон дат, количество строк и количество кавычек
+    """
+    strict = csv_reader.create_validation() is None
+    validation = ValidationReport(
+        1 if strict else csv_reader.max_errors, skip_invalid=True
+    )
+    dates = _create_dates(csv_reader)
+    records = csv_reader.read_range(file_path, byte_range, validation, dates)
+    try:
+        states: Optional[ReportStates] = engine.scan(records)
+    except ValidationError:
+        # Диапазон разобран не до конца: дальше файл не проверяется
+        states = None
+    return states, validation, dates, records.rows, records.quotes
+
+
+def combine_ranges(
+    engine: ScanEngine,
+    csv_reader: CSVReader,
+    file_path: str,
+    ranges: Iterable[Tuple[ByteRange, Callable[[], RangeStats]]],
+) -> FileStats:
+    """
+    Объединяет частичные состояния диапазонов файла в порядке файла
+
+    Состояние файла - сумма состояний его диапазонов в порядке файла;
+    диапазоны зависят только от chunk_bytes, поэтому результат один и тот
+    же при разборе в одном и в нескольких процессах.
+
+    Если граница диапазона попала внутрь значения в кавычках (нечетное
+    число кавычек), диапазон вместе со следующими сводится заново в
+    текущем процессе до первой границы между строками; это проверяется
+    до ошибок диапазона, так как строка, обрезанная границей, может
+    оказаться некорректной. Номера строк в ошибках диапазонов сдвигаются
+    на число строк предыдущих диапазонов, после чего ошибки проверяются
+    так же, как при чтении файла целиком: без пакетной проверки - ошибка
+    первой некорректной строки, с max_errors - остановка на max_errors-й
+    ошибке.
+
+    Args:
+        engine: Движок с отчетами
+        csv_reader: Настроенный объект для чтения CSV файлов
+        file_path: Путь к CSV файлу
+        ranges: Диапазоны байтов в порядке файла и функции получения их
+            результатов aggregate_range; функции диапазонов, сведенных
+            заново, не вызываются
+
+    Returns:
+        Частичные состояния отчетов по файлу, сводка пакетной проверки и
+        диапазон дат строк
+    """
+    validation = csv_reader.create_validation()
+    dates = _create_dates(csv_reader)
+    states = engine.create_states()
+    pending = iter(ranges)
+    rows = 0
+    for byte_range, result in pending:
+        part_states, part_validation, part_dates, part_rows, quotes = result()
+        if quotes % 2:
+            extended = byte_range
+            for next_range, _ in pending:
+                extended = ByteRange(extended.start, next_range.end)
+                quotes += csv_reader.count_quotes(file_path, next_range)
+                if quotes % 2 == 0:
+                    break
+            if extended != byte_range:
+                part_states, part_validation, part_dates, part_rows, _ = (
+                    aggregate_range(engine, csv_reader, file_path, extended)
+                )
+
+        # Номера строк файла начинаются с 2: первая строка - заголовок
+        for error in part_validation.errors:
+            row_num = rows + error.row_num + 1
+            if validation is None:
+                raise ValueError(f"Ошибка в строке {row_num}: {error.message}")
+            validation.add(row_num, error.message)
+        if validation is not None:
+            validation.rows_checked += part_validation.rows_checked
+
+        if part_states is None:
+            # Остальные диапазоны не учитываются, но их результаты
+            # забираются, чтобы не нарушить порядок задач
+            for _ in pending:
+                pass
+            break
+        engine.merge(states, part_states)
+        if dates is not None and part_dates:
+            dates.add(part_dates.first)
+            dates.add(part_dates.last)
+        rows += part_rows
+
+    if validation is not None:
+        validation.finish()
+    return states, validation, dates if dates else None
+
+
+def submit_files(
+    executor: "ProcessPoolExecutor",
+    engine: ScanEngine,
+    csv_reader: CSVReader,
+    file_paths: List[str],
+    max_pending: int,
+) -> Iterator[Tuple[str, Callable[[], FileStats]]]:
+    """
+    Отправляет файлы на обработку в пул процессов
+
+    Если задан csv_reader.chunk_bytes, файлы больше этого размера делятся
+    на диапазоны байтов, которые сводятся в разных процессах, поэтому
+    и один большой файл обрабатывается всеми процессами. Файлы-спутники
+    читаются целиком: их разбор уже не требует токенизации CSV.
+
+    Задачи (файлы и диапазоны) отправляются в пул по мере получения
+    результатов: отправленных и еще не полученных задач не больше
+    max_pending, поэтому результаты не копятся в памяти родителя.
+    Функции ожидания нужно вызывать в порядке файлов.
+
+    Args:
+        executor: Пул процессов
+        engine: Движок с отчетами
+        csv_reader: Настроенный объект для чтения CSV файлов
+        file_paths: Пути к CSV файлам
+        max_pending: Наибольшее число задач в пуле
+
+    Returns:
+        Пары (путь к файлу, функция ожидания частичных состояний) в порядке
+        файлов
+    """
+    split = [
+        (file_path, _split_file(csv_reader, file_path)) for file_path in file_paths
+    ]
+
+    def tasks() -> Iterator[Tuple[Any, ...]]:
+        for file_path, ranges in split:
+            if ranges is None:
+                yield aggregate_file, engine, csv_reader, file_path
+                continue
+            for byte_range in ranges:
+                yield aggregate_range, engine, csv_reader, file_path, byte_range
+
+    queued = tasks()
+    submitted: Deque["Future[Any]"] = deque()
+
+    def take() -> "Future[Any]":
+        """Следующая по порядку задача; пул пополняется до max_pending задач"""
+        for task in islice(queued, max_pending + 1 - len(submitted)):
+            submitted.append(executor.submit(*task))
+        return submitted.popleft()
+
+    def range_results(
+        ranges: List[ByteRange],
+    ) -> Iterator[Tuple[ByteRange, Callable[[], RangeStats]]]:
+        for byte_range in ranges:
+            yield byte_range, take().result
+
+    for file_path, ranges in split:
+        if ranges is None:
+            yield file_path, lambda: take().result()
+        else:
+            yield file_path, partial(
+                combine_ranges, engine, csv_reader, file_path, range_results(ranges)
+            )
+
+
+def _split_file(csv_reader: CSVReader, file_path: str) -> Optional[List[ByteRange]]:
+    """Диапазоны байтов файла или None, если файл читается целиком"""
+    chunk_bytes = csv_reader.chunk_bytes
+    if chunk_bytes is None or csv_reader.use_sidecar or csv_reader.sampler is not None:
+        return None
+    try:
+        if os.path.getsize(file_path) <= chunk_bytes:
+            return None
+        # Файл только с заголовком проверяется чтением целиком
+        return csv_reader.split_ranges(file_path, chunk_bytes) or None
+    except OSError:
+        # Ошибку чтения сообщит обработка файла целиком
+        return None
@@ -0,0 +1,268 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+
+class StageStats:
+    """Накопленные показатели одного этапа обработки"""
+
+    __slots__ = (
+        "calls",
+        "seconds",
+        "rows",
+        "bytes_read",
+        "distinct_keys",
+        "peak_bytes",
+    )
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes_read = 0
+        self.distinct_keys = 0
+        self.peak_bytes: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Показатели этапа в виде словаря"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _Frame:
+    __slots__ = ("name", "start", "child_seconds", "start_bytes", "peak_bytes")
+
+    def __init__(self, name: str, start_bytes: int) -> None:
+        self.name = name
+        self.start = time.perf_counter()
+        self.child_seconds = 0.0
+        self.start_bytes = start_bytes
+        self.peak_bytes = start_bytes
+
+
+class Profiler:
+    """
+    Сборщик времени и счетчиков по этапам обработки
+
+    Время этапа учитывается без вложенных этапов: например, время
+    агрегации не включает разбор CSV, выполняемый внутри нее. При
+    trace_memory=True для каждого этапа фиксируется пиковый объем
+    выделенной памяти (tracemalloc), что заметно замедляет работу.
+
+    Использование:
+        profiler = Profiler()
+        with use_profiler(profiler):
+            ...
+        profiler.to_dict()
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False) -> None:
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, StageStats] = {}
+        self._stack: List[_Frame] = []
+
+    def stats(self, name: str) -> StageStats:
+        """Возвращает показатели этапа, создавая их при первом обращении"""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """
+        Замеряет выполнение блока кода как этап
+
+        Yields:
+            Показатели этапа для обновления счетчиков внутри блока
+        """
+        if not self.enabled:
+            yield StageStats()
+            return
+
+        stats = self.stats(name)
+
+        frame = _Frame(name, self._memory_checkpoint())
+        self._stack.append(frame)
+        try:
+            yield stats
+        finally:
+            elapsed = time.perf_counter() - frame.start
+            current_peak = self._memory_peak()
+            self._stack.pop()
+
+            stats.calls += 1
+            stats.seconds += elapsed - frame.child_seconds
+            if self.trace_memory:
+                frame.peak_bytes = max(frame.peak_bytes, current_peak)
+                stats.peak_bytes = max(
+                    stats.peak_bytes or 0, frame.peak_bytes - frame.start_bytes
+                )
+            if self._stack:
+                self._stack[-1].child_seconds += elapsed
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """
+        Добавляет к этапу время, замеренное вызывающим кодом
+
+        Используется для мелких операций (разбор строки), где менеджер
+        контекста слишком дорог. Время вычитается из текущего этапа.
+        """
+        self.stats(name).seconds += seconds
+        if self._stack:
+            self._stack[-1].child_seconds += seconds
+
+    def timed_iter(
+        self, name: str, iterable: Iterable[Any], exclude: Optional[str] = None
+    ) -> Iterator[Any]:
+        """
+        Перебирает элементы, учитывая время получения каждого в этапе name
+
+        Каждый полученный элемент (строка файла или записи) учитывается в
+        rows этапа.
+
+        Args:
+            name: Этап, к которому относится время
+            iterable: Источник элементов
+            exclude: Вложенный этап (например, чтение файла внутри разбора
+                CSV), время которого не входит в этап name
+        """
+        stats = self.stats(name)
+        stats.calls += 1
+        excluded = self.stats(exclude) if exclude else None
+        iterator = iter(iterable)
+        perf_counter = time.perf_counter
+        while True:
+            nested = excluded.seconds if excluded else 0.0
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed = perf_counter() - start
+                if excluded:
+                    elapsed -= excluded.seconds - nested
+                self.add_time(name, elapsed)
+            stats.rows += 1
+            yield item
+
+    def timed(
+        self,
+        name: str,
+        function: Callable[..., Any],
+        count_rows: Optional[Callable[..., int]] = None,
+    ) -> Callable[..., Any]:
+        """
+        Оборачивает функцию, учитывая время ее вызовов в этапе name
+
+        Args:
+            name: Этап, к которому относится время
+            function: Оборачиваемая функция
+            count_rows: Функция от аргументов вызова, возвращающая число
+                обработанных строк; по умолчанию один вызов - одна строка
+        """
+        stats = self.stats(name)
+        perf_counter = time.perf_counter
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats.calls += 1
+                stats.rows += count_rows(*args, **kwargs) if count_rows else 1
+                self.add_time(name, perf_counter() - start)
+
+        return wrapper
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Показатели всех этапов в порядке их первого появления"""
+        return {name: stats.to_dict() for name, stats in self.stages.items()}
+
+    def summary(self) -> str:
+        """Текстовая сводка по этапам"""
+        lines = [
+            f"{'этап':<16}{'вызовы':>8}{'время, с':>11}{'строки':>12}"
+            f"{'строк/с':>12}{'байты':>14}{'ключи':>10}{'пик, МБ':>10}"
+        ]
+        for name, stats in self.stages.items():
+            rate = stats.rows / stats.seconds if stats.rows and stats.seconds else 0
+            peak = (
+                f"{stats.peak_bytes / 1024 / 1024:.1f}"
+                if stats.peak_bytes is not None
+                else "-"
+            )
+            lines.append(
+                f"{name:<16}{stats.calls:>8}{stats.seconds:>11.4f}{stats.rows:>12}"
+                f"{rate:>12.0f}{stats.bytes_read:>14}{stats.distinct_keys:>10}{peak:>10}"
+            )
+        return "\n".join(lines)
+
+    def write_summary(self, output: TextIO = sys.stderr) -> None:
+        """Выводит текстовую сводку"""
+        print(self.summary(), file=output)
+
+    def write_json(self, path: str) -> None:
+        """Сохраняет показатели в JSON файл"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self.to_dict()}, f, ensure_ascii=False, indent=2)
+
+    def _memory_checkpoint(self) -> int:
+        """Фиксирует пик для открытых этапов и начинает отсчет нового пика"""
+        if not self.trace_memory:
+            return 0
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._stack:
+            frame.peak_bytes = max(frame.peak_bytes, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _memory_peak(self) -> int:
+        if not self.trace_memory:
+            return 0
+        import tracemalloc
+
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame.peak_bytes = max(frame.peak_bytes, peak)
+        return peak
+
+
+_DISABLED = Profiler(enabled=False)
+_active = _DISABLED
+
+
+def get_profiler() -> Profiler:
+    """Текущий сборщик показателей (отключенный, если профилирование не включено)"""
+    return _active
+
+
+@contextmanager
+def use_profiler(profiler: Profiler) -> Iterator[Profiler]:
+    """
+    Делает сборщик текущим для CSVReader, отчетов и main
+
+    При trace_memory=True на время блока включается tracemalloc.
+    """
+    global _active
+    previous = _active
+    started_tracing = False
+    if profiler.trace_memory:
+        # tracemalloc загружается только при измерении памяти
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = previous
+        if started_tracing:
+            tracemalloc.stop()
@@ -0,0 +1,63 @@
+import json
+import os
+import socket
+import tempfile
+from typing import Any, Dict
+
+# Модуль используется клиентом, поэтому импортирует только стандартную
+# библиотеку: запуск клиента не загружает отчеты, numpy и tabulate
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "student-reports.sock")
+# Наибольший размер запроса или ответа в байтах
+MAX_MESSAGE = 64 * 1024 * 1024
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Кодирует сообщение в строку JSON с переводом строки"""
+    return json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def decode_message(line: bytes) -> Dict[str, Any]:
+    """
+    Декодирует сообщение из строки JSON
+
+    Raises:
+        ValueError: Если строка не является объектом JSON
+    """
+    try:
+        message = json.loads(line.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Некорректное сообщение: {e}")
+    if not isinstance(message, dict):
+        raise ValueError("Сообщение должно быть объектом JSON")
+    return message
+
+
+def request(
+    query: Dict[str, Any], socket_path: str = DEFAULT_SOCKET, timeout: float = 60
+) -> Dict[str, Any]:
+    """
+    Отправляет запрос серверу отчетов через Unix сокет
+
+    Args:
+        query: Параметры отчета (см. processing.server.ReportQuery)
+        socket_path: Путь к сокету сервера
+        timeout: Время ожидания ответа в секундах
+
+    Returns:
+        Ответ сервера: {"ok": true, "output": текст отчетов} или
+        {"ok": false, "error": сообщение}
+
+    Raises:
+        OSError: Если сервер недоступен
+        ValueError: Если ответ некорректен
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(encode_message(query))
+        with client.makefile("rb") as response:
+            line = response.readline(MAX_MESSAGE)
+    if not line:
+        raise ValueError("Сервер закрыл соединение без ответа")
+    return decode_message(line)
@@ -0,0 +1,533 @@
+import asyncio
+import datetime
+import io
+import os
+import stat
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Type
+from urllib.parse import parse_qs, urlsplit
+from data.columnar import ColumnarRecords
+from data.csv_reader import CSVReader
+from data.filters import RecordFilter
+from data.validation import ValidationReport
+from reports.base_report import BaseReport
+from reports.engine import ReportStates, ScanEngine
+from reports.writers import WRITERS, create_writer
+from .protocol import MAX_MESSAGE, decode_message, encode_message
+
+# Количество запомненных результатов запросов
+RESULTS_CACHE_SIZE = 64
+
+
+class ReportQuery(NamedTuple):
+    """
+    Параметры запроса отчетов к серверу
+
+    Соответствуют одноименным аргументам командной строки main.py.
+    """
+
+    reports: Tuple[str, ...]
+    output_format: str = "csv"
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    subjects: Tuple[str, ...] = ()
+    teachers: Tuple[str, ...] = ()
+    top: Optional[int] = None
+    bottom: Optional[int] = None
+    sketch_size: Optional[int] = None
+    distinct_precision: Optional[int] = None
+
+    @classmethod
+    def from_dict(
+        cls, data: Mapping[str, Any], registry: Mapping[str, Type[BaseReport]]
+    ) -> "ReportQuery":
+        """
+        Проверяет параметры запроса
+
+        Args:
+            data: Параметры: report (название или список названий),
+                output_format, date_from, date_to, subject, teacher (строка
+                или список строк), top, bottom, sketch_size, distinct_precision
+            registry: Доступные отчеты по названиям
+
+        Returns:
+            Запрос
+
+        Raises:
+            ValueError: Если параметры некорректны
+        """
+        unknown = set(data) - QUERY_FIELDS
+        if unknown:
+            raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+
+        reports = tuple(dict.fromkeys(_strings(data, "report")))
+        if not reports:
+            raise ValueError("Нужно указать report")
+        for name in reports:
+            if name not in registry:
+                raise ValueError(f"Неизвестный отчет: {name}")
+
+        output_format = data.get("output_format", "csv")
+        if output_format not in WRITERS:
+            raise ValueError(f"Неизвестный формат вывода: {output_format}")
+
+        date_from = _date(data, "date_from")
+        date_to = _date(data, "date_to")
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from должно быть не позже date_to")
+
+        top = _integer(data, "top", 1)
+        bottom = _integer(data, "bottom", 1)
+        if top is not None and bottom is not None:
+            raise ValueError("top нельзя использовать вместе с bottom")
+        distinct_precision = _integer(data, "distinct_precision", 4)
+        if distinct_precision is not None and distinct_precision > 16:
+            raise ValueError("distinct_precision должно быть от 4 до 16")
+
+        return cls(
+            reports,
+            output_format,
+            date_from,
+            date_to,
+            tuple(_strings(data, "subject")),
+            tuple(_strings(data, "teacher")),
+            top,
+            bottom,
+            _integer(data, "sketch_size", 8),
+            distinct_precision,
+        )
+
+    def record_filter(self) -> RecordFilter:
+        """Условия отбора строк запроса"""
+        return RecordFilter(self.date_from, self.date_to, self.subjects, self.teachers)
+
+
+QUERY_FIELDS = {
+    "report",
+    "output_format",
+    "date_from",
+    "date_to",
+    "subject",
+    "teacher",
+    "top",
+    "bottom",
+    "sketch_size",
+    "distinct_precision",
+}
+
+
+def _strings(data: Mapping[str, Any], name: str) -> List[str]:
+    """Строка или список строк параметра"""
+    value = data.get(name, [])
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{name} должно быть строкой или списком строк")
+    return value
+
+
+def _date(data: Mapping[str, Any], name: str) -> Optional[str]:
+    """Дата параметра в формате ГГГГ-ММ-ДД"""
+    value = data.get(name)
+    if value is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"{name}: дата должна быть в формате ГГГГ-ММ-ДД: {value}")
+
+
+def _integer(data: Mapping[str, Any], name: str, minimum: int) -> Optional[int]:
+    """Целое значение параметра не меньше minimum"""
+    value = data.get(name)
+    if value is None:
+        return None
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+        raise ValueError(f"{name} должно быть целым числом не меньше {minimum}")
+    return value
+
+
+class LoadedFile(NamedTuple):
+    """Файл, загруженный в память сервера"""
+
+    identity: Tuple[int, int, int, int]
+    columns: ColumnarRecords
+
+
+def _identity(file_path: str) -> Tuple[int, int, int, int]:
+    """Устройство, inode, размер и время изменения файла"""
+    stat = os.stat(file_path)
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _recall(cache: "OrderedDict[Any, Any]", key: Any) -> Any:
+    """Запомненное значение (None, если его нет)"""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _remember(cache: "OrderedDict[Any, Any]", key: Any, value: Any) -> Any:
+    """Запоминает значение, вытесняя самое давнее сверх RESULTS_CACHE_SIZE"""
+    cache[key] = value
+    if len(cache) > RESULTS_CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+
+class ReportServer:
+    """
+    Сервер отчетов, держащий разобранные файлы в памяти
+
+    Файлы разбираются один раз в колоночные хранилища. Запрос отбирает
+    строки каждого файла по кодам словарей (RecordFilter.filter_columns),
+    сводит их в частичные состояния и объединяет в порядке файлов, поэтому
+    ответ совпадает с выводом main.py с теми же аргументами. Состояния
+    отчетов и готовый текст ответа запоминаются до изменения файлов:
+    повторный запрос с другими top или форматом только выводит строки, а
+    такой же запрос отдает готовый текст. Перед каждым запросом файлы проверяются
+    через stat, и изменившиеся файлы перечитываются.
+
+    Запросы соединений выполняются по одному в отдельном потоке (respond):
+    пока файл перечитывается, цикл событий продолжает принимать
+    соединения.
+    """
+
+    def __init__(
+        self,
+        file_paths: List[str],
+        registry: Mapping[str, Type[BaseReport]],
+        csv_reader: Optional[CSVReader] = None,
+    ) -> None:
+        """
+        Args:
+            file_paths: Пути к CSV файлам
+            registry: Доступные отчеты по названиям
+            csv_reader: Объект для чтения CSV файлов (без условий отбора)
+        """
+        self.file_paths = list(file_paths)
+        self.registry = registry
+        self.csv_reader = csv_reader if csv_reader is not None else CSVReader()
+        self.files: Dict[str, LoadedFile] = {}
+        self._results: "OrderedDict[Any, Tuple[ScanEngine, ReportStates]]" = (
+            OrderedDict()
+        )
+        self._outputs: "OrderedDict[ReportQuery, str]" = OrderedDict()
+        # Один поток: запросы не меняют кэши и файлы одновременно
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def refresh(self) -> List[Tuple[str, Optional[ValidationReport]]]:
+        """
+        Перечитывает новые и изменившиеся файлы
+
+        Returns:
+            Перечитанные файлы и сводки их пакетной проверки
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если формат файла некорректен
+        """
+        loaded = []
+        for file_path in self.file_paths:
+            current = self.files.get(file_path)
+            if current is None or current.identity != _identity(file_path):
+                loaded.append((file_path, self.load(file_path)))
+        return loaded
+
+    def load(self, file_path: str) -> Optional[ValidationReport]:
+        """
+        Разбирает файл в память
+
+        Args:
+            file_path: Путь к CSV файлу
+
+        Returns:
+            Сводка пакетной проверки (None, если она не включена)
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если формат файла некорректен
+        """
+        identity = _identity(file_path)
+        validation = self.csv_reader.create_validation()
+        columns = self.csv_reader.read_columns(file_path, validation)
+        self.files[file_path] = LoadedFile(identity, columns)
+        self._results.clear()
+        self._outputs.clear()
+        return validation
+
+    def states(self, query: ReportQuery) -> Tuple[ScanEngine, ReportStates]:
+        """
+        Состояния отчетов запроса по загруженным файлам
+
+        Args:
+            query: Запрос
+
+        Returns:
+            Движок с отчетами запроса и их состояния
+        """
+        record_filter = query.record_filter()
+        key = (
+            query.reports,
+            record_filter.key,
+            query.sketch_size,
+            query.distinct_precision,
+        )
+        result = _recall(self._results, key)
+        if result is not None:
+            return result
+
+        engine = ScanEngine(
+            [
+                self.registry[name](query.sketch_size, query.distinct_precision)
+                for name in query.reports
+            ]
+        )
+        states = engine.create_states()
+        for file_path in self.file_paths:
+            columns = self.files[file_path].columns
+            if record_filter:
+                columns = record_filter.filter_columns(columns)
+            engine.merge(states, engine.scan(columns))
+
+        return _remember(self._results, key, (engine, states))
+
+    def answer(self, query: ReportQuery) -> str:
+        """
+        Формирует текст отчетов запроса
+
+        Отчеты выводятся так же, как main.py выводит их в stdout: через
+        пустую строку в порядке запроса.
+
+        Args:
+            query: Запрос
+
+        Returns:
+            Текст отчетов
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если формат файла некорректен или данных нет
+        """
+        for file_path, validation in self.refresh():
+            if validation is not None and validation.errors:
+                print(
+                    f"Предупреждение: в файле {file_path} пропущены строки. "
+                    f"{validation.summary()}",
+                    file=sys.stderr,
+                )
+
+        text = _recall(self._outputs, query)
+        if text is not None:
+            return text
+
+        engine, states = self.states(query)
+        if not engine.has_data(states):
+            raise ValueError("Не найдено данных для обработки")
+
+        output = io.StringIO()
+        for index, (report, state) in enumerate(zip(engine.reports, states)):
+            if index:
+                output.write("\n")
+            report.render(
+                state,
+                create_writer(query.output_format, report.HEADERS, output),
+                query.top,
+                query.bottom,
+            )
+        return _remember(self._outputs, query, output.getvalue())
+
+    def handle(self, data: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Отвечает на запрос в виде словаря
+
+        Returns:
+            {"ok": True, "output": текст отчетов} или
+            {"ok": False, "error": сообщение об ошибке}
+        """
+        try:
+            output = self.answer(ReportQuery.from_dict(data, self.registry))
+        except FileNotFoundError as e:
+            return {"ok": False, "error": f"Файл {e.filename} не найден"}
+        except OSError as e:
+            # Нет прав на файл, файл заменен при ротации и т.п.: соединение
+            # не должно обрываться
+            return {"ok": False, "error": f"Ошибка чтения файла: {e}"}
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "output": output}
+
+    async def respond(self, data: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Отвечает на запрос (см. handle), не блокируя цикл событий
+
+        Проверка и разбор изменившихся файлов (refresh, load) и подсчет
+        отчетов выполняются в потоке сервера через run_in_executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.handle, data)
+
+    def close(self) -> None:
+        """Останавливает поток обработки запросов"""
+        self._executor.shutdown(wait=False)
+
+    async def handle_socket(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Обслуживает клиента Unix сокета: запрос и ответ - строки JSON"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.respond(decode_message(line))
+                except ValueError as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(encode_message(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_http(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Обслуживает HTTP запрос GET /report?report=...&top=...
+
+        Параметры строки запроса совпадают с параметрами ReportQuery;
+        повторяющиеся параметры (report, subject, teacher) задают списки.
+        """
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] != "GET":
+                status, body = "405 Method Not Allowed", "Поддерживается только GET\n"
+            else:
+                url = urlsplit(parts[1])
+                if url.path != "/report":
+                    status, body = "404 Not Found", "Неизвестный путь\n"
+                else:
+                    params: Dict[str, Any] = {
+                        name: (
+                            values
+                            if name in ("report", "subject", "teacher")
+                            else values[-1]
+                        )
+                        for name, values in parse_qs(url.query).items()
+                    }
+                    response = await self.respond(params)
+                    if response["ok"]:
+                        status, body = "200 OK", response["output"]
+                    else:
+                        status, body = "400 Bad Request", response["error"] + "\n"
+            payload = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                "Connection: close\r\n\r\n".encode("ascii") + payload
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def start_servers(
+    server: ReportServer,
+    socket_path: Optional[str] = None,
+    http_port: Optional[int] = None,
+    http_host: str = "127.0.0.1",
+) -> List[asyncio.AbstractServer]:
+    """
+    Запускает прием соединений
+
+    Запросы обрабатываются по очереди в потоке сервера (ReportServer.respond),
+    а цикл событий тем временем принимает соединения и передает ответы.
+    Сокет, оставшийся от прошлого запуска, удаляется; путь, занятый другим
+    файлом или работающим сервером, не трогается.
+
+    Args:
+        server: Сервер отчетов
+        socket_path: Путь к Unix сокету
+        http_port: Порт HTTP (0 - любой свободный)
+        http_host: Адрес HTTP; по умолчанию только локальные соединения
+
+    Returns:
+        Запущенные серверы asyncio
+
+    Raises:
+        ValueError: Если путь сокета занят
+    """
+    servers = []
+    if socket_path is not None:
+        await _remove_stale_socket(socket_path)
+        servers.append(
+            await asyncio.start_unix_server(
+                server.handle_socket, socket_path, limit=MAX_MESSAGE
+            )
+        )
+    if http_port is not None:
+        servers.append(
+            await asyncio.start_server(server.handle_http, http_host, http_port)
+        )
+    return servers
+
+
+async def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Удаляет сокет, оставшийся от прошлого запуска
+
+    Raises:
+        ValueError: Если по пути находится не сокет или сокет принимает
+            соединения
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"Файл {socket_path} существует и не является сокетом")
+    try:
+        _, writer = await asyncio.open_unix_connection(socket_path)
+    except ConnectionRefusedError:
+        # Сервер, создавший сокет, завершился
+        os.unlink(socket_path)
+        return
+    writer.close()
+    raise ValueError(f"Сокет {socket_path} уже используется другим сервером")
+
+
+async def serve(
+    server: ReportServer,
+    socket_path: Optional[str] = None,
+    http_port: Optional[int] = None,
+    on_start: Optional[Callable[[], None]] = None,
+) -> None:
+    """
+    Принимает соединения до отмены
+
+    on_start вызывается после запуска приема соединений.
+    """
+    servers = await start_servers(server, socket_path, http_port)
+    if on_start is not None:
+        on_start()
+    try:
+        await asyncio.gather(*(s.serve_forever() for s in servers))
+    finally:
+        for s in servers:
+            s.close()
+        server.close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
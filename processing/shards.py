@@ -0,0 +1,214 @@
+import json
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
+from reports.base_report import BaseReport
+from reports.engine import ReportStates, ScanEngine
+from reports.groupby import SKETCHES
+from reports.sketches import DistinctCounter, QuantileSketch
+
+MAGIC = b"SPST"
+VERSION = 1
+
+# magic, версия, длина блока параметров (JSON)
+HEADER = struct.Struct("<4sIQ")
+# Блок состояния отчета по файлу: количество групп, длина сжатой zlib
+# JSON части (ключи и скетчи), длина числовой части
+BLOCK = struct.Struct("<QQQ")
+
+# Типы array для числовых накопителей: количество целое, остальные float64
+NUMERIC_TYPES = {"count": "q"}
+
+
+def write_shard(
+    path: str,
+    engine: ScanEngine,
+    options: Dict[str, Any],
+    file_paths: List[str],
+    partials: Iterable[Tuple[str, ReportStates]],
+) -> None:
+    """
+    Сохраняет частичные состояния отчетов по файлам в бинарный файл
+
+    Формат: заголовок, параметры (JSON: отчеты, параметры расчета и пути
+    к файлам), затем для каждого файла по блоку на отчет. Блок отчета с
+    группировкой - ключи групп и скетчи в JSON, затем столбцы числовых
+    накопителей (int64 для количества, float64 для остальных) в порядке
+    групп; JSON часть сжимается zlib. Состояния хранятся по файлам, а не объединенными, чтобы при
+    слиянии их можно было сложить в том же порядке, что и при расчете
+    в одном процессе.
+
+    Args:
+        path: Путь к файлу состояний
+        engine: Движок с отчетами
+        options: Параметры, от которых зависят состояния (условия отбора,
+            размеры скетчей и т.п.); при слиянии должны совпадать
+        file_paths: Пути к CSV файлам в порядке partials
+        partials: Пары (путь к файлу, частичные состояния) в порядке файлов
+
+    Raises:
+        OSError: Если файл не удалось записать
+    """
+    metadata = json.dumps(
+        {"reports": engine.names, "options": options, "files": file_paths},
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(metadata)))
+            f.write(metadata)
+            for _, states in partials:
+                for report, state in zip(engine.reports, states):
+                    f.write(_pack_state(report, state))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class Shard:
+    """
+    Файл состояний, записанный write_shard
+
+    Attributes:
+        reports: Названия отчетов
+        options: Параметры расчета
+        files: Пути к CSV файлам
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Путь к файлу состояний
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если файл не является файлом состояний или его
+                версия не поддерживается
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} не является файлом состояний отчетов")
+            magic, version, metadata_size = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path} не является файлом состояний отчетов")
+            if version != VERSION:
+                raise ValueError(
+                    f"Неподдерживаемая версия файла состояний {path}: {version}"
+                )
+            try:
+                metadata = json.loads(f.read(metadata_size).decode("utf-8"))
+            except ValueError as e:
+                raise ValueError(f"Файл состояний поврежден: {path}") from e
+            self._offset = f.tell()
+
+        self.reports: List[str] = metadata["reports"]
+        self.options: Dict[str, Any] = metadata["options"]
+        self.files: List[str] = metadata["files"]
+
+    def iter_states(self, engine: ScanEngine) -> Iterator[Tuple[str, ReportStates]]:
+        """
+        Читает частичные состояния файлов по порядку
+
+        Args:
+            engine: Движок с теми же отчетами, что и в файле
+
+        Yields:
+            Путь к CSV файлу и его частичные состояния
+
+        Raises:
+            ValueError: Если файл поврежден
+        """
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for file_path in self.files:
+                try:
+                    states = [_read_state(f, report) for report in engine.reports]
+                except ValueError as e:
+                    raise ValueError(f"{e}: {self.path}") from e
+                yield file_path, states
+            if f.read(1):
+                raise ValueError(f"Лишние данные в конце файла состояний {self.path}")
+
+
+def _pack_state(report: BaseReport, state: Any) -> bytes:
+    """Блок состояния отчета"""
+    kernel = report.kernel
+    if kernel is None:
+        data = _compress(report.dump_state(state))
+        return BLOCK.pack(0, len(data), 0) + data
+
+    keys = list(state)
+    columns = list(zip(*state.values())) if state else [()] * len(kernel.slots)
+    sketches = []
+    numeric = bytearray()
+    for (_, accumulator), column in zip(kernel.slots, columns):
+        if accumulator in SKETCHES:
+            sketches.append([sketch.to_state() for sketch in column])
+        else:
+            values = array(NUMERIC_TYPES.get(accumulator, "d"), column)
+            if sys.byteorder != "little":
+                values.byteswap()
+            numeric += values.tobytes()
+    if len(kernel.keys) > 1:
+        keys = [list(key) for key in keys]
+    data = _compress({"keys": keys, "sketches": sketches})
+    return BLOCK.pack(len(keys), len(data), len(numeric)) + data + bytes(numeric)
+
+
+def _read_state(f: BinaryIO, report: BaseReport) -> Any:
+    """Читает блок состояния отчета"""
+    header = f.read(BLOCK.size)
+    if len(header) < BLOCK.size:
+        raise ValueError("Файл состояний обрезан")
+    size, text_size, numeric_size = BLOCK.unpack(header)
+    text = f.read(text_size)
+    numeric = f.read(numeric_size)
+    if len(text) < text_size or len(numeric) < numeric_size:
+        raise ValueError("Файл состояний обрезан")
+    try:
+        data = json.loads(zlib.decompress(text).decode("utf-8"))
+    except zlib.error as e:
+        raise ValueError("Файл состояний поврежден") from e
+
+    kernel = report.kernel
+    if kernel is None:
+        return report.load_state(data)
+
+    keys = data["keys"]
+    if len(kernel.keys) > 1:
+        keys = [tuple(key) for key in keys]
+    sketches = iter(data["sketches"])
+    columns: List[List[Any]] = []
+    offset = 0
+    for _, accumulator in kernel.slots:
+        if accumulator == "quantiles":
+            columns.append([QuantileSketch.from_state(s) for s in next(sketches)])
+        elif accumulator == "distinct":
+            columns.append([DistinctCounter.from_state(s) for s in next(sketches)])
+        else:
+            values = array(NUMERIC_TYPES.get(accumulator, "d"))
+            end = offset + size * values.itemsize
+            values.frombytes(numeric[offset:end])
+            if sys.byteorder != "little":
+                values.byteswap()
+            columns.append(values.tolist())
+            offset = end
+    if len(keys) != size or offset != numeric_size:
+        raise ValueError("Файл состояний поврежден")
+    return {key: list(slots) for key, slots in zip(keys, zip(*columns))}
+
+
+def _compress(data: Any) -> bytes:
+    """JSON представление, сжатое zlib"""
+    return zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
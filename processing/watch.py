@@ -0,0 +1,241 @@
+import csv
+import os
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from data.csv_reader import CSVReader
+from data.validation import ValidationReport
+from processing.parallel import FileStats
+from reports.engine import ReportStates, ScanEngine
+
+# Размер блока при поиске конца последней полной строки
+BLOCK_SIZE = 64 * 1024
+
+
+class TailedFile:
+    """
+    Состояние чтения отслеживаемого файла
+
+    Attributes:
+        path: Путь к CSV файлу
+        offset: Смещение в байтах, до которого файл уже прочитан
+        identity: Устройство и inode файла при последнем чтении
+        fieldnames: Заголовок CSV файла
+        rows_read: Количество прочитанных строк данных
+        states: Частичные состояния отчетов по файлу
+        version: Счетчик изменений состояний
+        failed_end: Конец дописанной части, разбор которой завершился
+            ошибкой; она не разбирается повторно, пока файл не изменится
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.offset = 0
+        self.identity: Optional[Tuple[int, int]] = None
+        self.fieldnames: Optional[List[str]] = None
+        self.rows_read = 0
+        self.states: Optional[ReportStates] = None
+        self.version = 0
+        self.failed_end: Optional[int] = None
+
+
+class Watcher:
+    """
+    Инкрементальное обновление отчетов по дописываемым CSV файлам
+
+    Для каждого файла хранятся частичные состояния отчетов и смещение
+    прочитанной части. При проверке разбираются только полные строки,
+    дописанные после прошлого чтения; они читаются из файла потоково, без
+    загрузки дописанной части целиком. Если файл стал короче или заменен
+    другим (изменился inode, например при ротации), он перечитывается
+    целиком. Частичные состояния объединяются в порядке файлов, поэтому
+    результат совпадает с повторным запуском по тем же файлам (суммы
+    дописанных частей прибавляются целиком и могут отличаться в последних
+    знаках).
+
+    Дописанные строки сводятся в новые состояния, которые объединяются
+    с состояниями файла только после успешного разбора: при ошибке в
+    строке состояния и смещение файла не меняются.
+    """
+
+    def __init__(
+        self,
+        engine: ScanEngine,
+        file_paths: List[str],
+        csv_reader: Optional[CSVReader] = None,
+    ) -> None:
+        self.engine = engine
+        self.csv_reader = csv_reader if csv_reader is not None else CSVReader()
+        self.files = [TailedFile(path) for path in file_paths]
+
+    def poll(self, initial: bool = False) -> bool:
+        """
+        Проверяет все файлы и дочитывает изменения
+
+        Args:
+            initial: Первое чтение: последняя строка файла без перевода
+                строки считается полной; при следующих проверках такая
+                строка ждет перевода строки
+
+        Returns:
+            True, если состояние хотя бы одного файла изменилось
+        """
+        changed = False
+        for tailed in self.files:
+            version = tailed.version
+            self.update(tailed, initial)
+            changed = changed or tailed.version != version
+        return changed
+
+    def states(self) -> ReportStates:
+        """Состояния отчетов по всем файлам"""
+        states = self.engine.create_states()
+        for tailed in self.files:
+            if tailed.states is not None:
+                self.engine.merge(states, tailed.states)
+        return states
+
+    def update(self, tailed: TailedFile, initial: bool = False) -> FileStats:
+        """
+        Дочитывает изменения одного файла
+
+        Args:
+            tailed: Отслеживаемый файл
+            initial: Первое чтение файла
+
+        Returns:
+            Частичные состояния отчетов по файлу, сводка пакетной проверки
+            дописанных строк (None, если она не включена или изменений нет)
+            и None вместо диапазона дат
+
+        Raises:
+            FileNotFoundError: Если файла нет при первом чтении
+            ValueError: Если дописанные строки некорректны (при следующих
+                проверках та же часть файла пропускается, пока он не
+                изменится)
+        """
+        try:
+            stat = os.stat(tailed.path)
+        except FileNotFoundError:
+            if initial:
+                raise
+            # Файл удален или переименован при ротации: его строк больше нет
+            if tailed.identity is not None:
+                self._reset(tailed, None)
+            return tailed.states or self.engine.create_states(), None, None
+
+        identity = (stat.st_dev, stat.st_ino)
+        if identity != tailed.identity or stat.st_size < tailed.offset:
+            self._reset(tailed, identity)
+
+        if stat.st_size == tailed.offset:
+            return tailed.states, None, None
+
+        with open(tailed.path, "rb") as f:
+            end = stat.st_size
+            if not initial:
+                # Недописанная строка могла быть прервана на середине
+                end = _lines_end(f, tailed.offset, end)
+            if end == tailed.offset or end == tailed.failed_end:
+                return tailed.states, None, None
+
+            try:
+                states, validation, fieldnames, rows_read = self._scan(tailed, f, end)
+            except ValueError:
+                tailed.failed_end = end
+                raise
+
+        if tailed.offset == 0:
+            tailed.states = states
+        else:
+            self.engine.merge(tailed.states, states)
+        tailed.fieldnames = fieldnames
+        tailed.failed_end = None
+        tailed.offset = end
+        tailed.rows_read += rows_read
+        tailed.version += 1
+        return tailed.states, validation, None
+
+    def _scan(
+        self, tailed: TailedFile, f: BinaryIO, end: int
+    ) -> Tuple[ReportStates, Optional[ValidationReport], List[str], int]:
+        """
+        Сводит строки части файла [tailed.offset, end) в новые состояния
+
+        Returns:
+            Состояния отчетов по строкам части, сводка пакетной проверки,
+            заголовок файла и количество прочитанных строк
+
+        Raises:
+            ValueError: Если строки некорректны
+        """
+        f.seek(tailed.offset)
+        lines = _decode_lines(f, end - tailed.offset, tailed.path)
+        if tailed.fieldnames is None:
+            reader = csv.DictReader(lines)
+            self.csv_reader.check_columns(reader.fieldnames)
+            fieldnames = list(reader.fieldnames or [])
+        else:
+            fieldnames = tailed.fieldnames
+            reader = csv.DictReader(lines, fieldnames=fieldnames)
+
+        rows_read = [0]
+
+        def count_rows() -> Iterator[Dict[str, str]]:
+            for row in reader:
+                rows_read[0] += 1
+                yield row
+
+        validation = self.csv_reader.create_validation()
+        records = self.csv_reader.parse_rows(
+            count_rows(), tailed.rows_read + 2, validation
+        )
+        states = self.engine.scan(records)
+        return states, validation, fieldnames, rows_read[0]
+
+    def _reset(self, tailed: TailedFile, identity: Optional[Tuple[int, int]]) -> None:
+        """Сбрасывает файл для чтения с начала"""
+        tailed.identity = identity
+        tailed.offset = 0
+        tailed.fieldnames = None
+        tailed.rows_read = 0
+        tailed.states = self.engine.create_states()
+        tailed.failed_end = None
+        tailed.version += 1
+
+
+def _lines_end(f: BinaryIO, start: int, end: int) -> int:
+    """
+    Конец последней полной строки в части файла [start, end)
+
+    Перевод строки ищется с конца блоками по BLOCK_SIZE байт.
+
+    Returns:
+        Смещение после последнего перевода строки или start, если его нет
+    """
+    position = end
+    while position > start:
+        block_start = max(start, position - BLOCK_SIZE)
+        f.seek(block_start)
+        newline = f.read(position - block_start).rfind(b"\n")
+        if newline != -1:
+            return block_start + newline + 1
+        position = block_start
+    return start
+
+
+def _decode_lines(f: BinaryIO, size: int, path: str) -> Iterator[str]:
+    """
+    Строки части файла размером size от текущей позиции
+
+    Raises:
+        ValueError: Если строка не в UTF-8
+    """
+    for line in f:
+        if len(line) > size:
+            line = line[:size]
+        size -= len(line)
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError:
+            raise ValueError(f"Ошибка кодировки файла {path}")
+        if size <= 0:
+            return
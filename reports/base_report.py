@@ -1,16 +1,227 @@
-from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+import sys
+from abc import ABC
+from typing import (
+    Iterable,
+    Dict,
+    Any,
+    ContextManager,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from processing.profiler import StageStats, get_profiler
+from .groupby import Aggregate, GroupBy, estimate_aggregates
+from .writers import GridWriter, ReportWriter
 
 
 class BaseReport(ABC):
-    """Абстрактный базовый класс для отчетов"""
+    """
+    Абстрактный базовый класс для отчетов
 
-    @abstractmethod
-    def generate_report(self, records: List[Dict[str, Any]]) -> None:
+    Отчет накапливает состояние по одной записи (accumulate), объединяет
+    частичные состояния, например по отдельным файлам (merge), и строит
+    строки результата (finalize). Состояние хранится вне объекта отчета,
+    поэтому один проход по записям может питать несколько отчетов
+    (см. reports.engine.ScanEngine).
+
+    Отчет с группировкой достаточно объявить: поля group_by и агрегатные
+    функции aggregates выполняются ядром reports.groupby.GroupBy, а
+    заголовки столбцов строятся по объявлению. Прочие отчеты
+    переопределяют accumulate, merge и finalize.
+    """
+
+    # Название отчета в параметре --report
+    name = ""
+    # Заголовки столбцов; пустой заголовок - место в рейтинге
+    HEADERS: List[str] = []
+    # Поля группировки и агрегатные функции
+    group_by: Tuple[str, ...] = ()
+    aggregates: Tuple[Aggregate, ...] = ()
+    # Ядро группировки, создается по объявлению подкласса
+    kernel: Optional[GroupBy] = None
+    # Поля записей, которые читает отчет; None - все поля
+    fields: Optional[Tuple[str, ...]] = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "group_by" in vars(cls) or "aggregates" in vars(cls):
+            cls.kernel = GroupBy(cls.group_by, cls.aggregates)
+            if "HEADERS" not in vars(cls):
+                cls.HEADERS = cls.kernel.headers
+            if "fields" not in vars(cls):
+                cls.fields = tuple(cls.kernel.fields)
+
+    def __init__(
+        self,
+        sketch_size: Optional[int] = None,
+        distinct_precision: Optional[int] = None,
+        confidence: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            sketch_size: Размер квантильных скетчей (median, quantile)
+            distinct_precision: Точность счетчиков различных значений (distinct)
+            confidence: Уровень доверия для отчета по выборке записей: к
+                средним добавляются границы доверительных интервалов и
+                размер выборки (см. reports.groupby.estimate_aggregates)
+        """
+        if self.kernel is not None and (
+            sketch_size is not None
+            or distinct_precision is not None
+            or confidence is not None
+        ):
+            aggregates = self.aggregates
+            if confidence is not None:
+                aggregates = estimate_aggregates(aggregates, confidence)
+            self.kernel = GroupBy(
+                self.group_by,
+                aggregates,
+                self.kernel.backend,
+                sketch_size or self.kernel.sketch_size,
+                distinct_precision or self.kernel.distinct_precision,
+            )
+            # Заголовки, построенные по объявлению, дополняются новыми столбцами
+            if self.HEADERS == type(self).kernel.headers:
+                self.HEADERS = self.kernel.headers
+
+    def create_state(self) -> Any:
+        """Создает пустое состояние отчета"""
+        return {}
+
+    def accumulate(self, state: Any, record: Dict[str, Any]) -> None:
+        """
+        Учитывает одну запись в состоянии отчета
+
+        Args:
+            state: Состояние отчета, изменяется на месте
+            record: Запись с данными
+        """
+        self._require_kernel().accumulate(state, record)
+
+    def merge(self, state: Any, partial_state: Any) -> Any:
+        """
+        Добавляет частичное состояние к общему
+
+        Args:
+            state: Общее состояние, изменяется на месте
+            partial_state: Частичное состояние
+
+        Returns:
+            Общее состояние
+        """
+        return self._require_kernel().merge(state, partial_state)
+
+    def finalize(
+        self, state: Any, top: Optional[int] = None, bottom: Optional[int] = None
+    ) -> List[Sequence[Any]]:
+        """
+        Строит строки отчета по накопленному состоянию
+
+        Args:
+            state: Состояние отчета
+            top: Оставить только N первых строк
+            bottom: Оставить только N последних строк
+
+        Returns:
+            Строки отчета в порядке вывода
+        """
+        # Выгрузка групп на диск нужна только с --memory-limit
+        from .spill import SpilledGroups
+
+        if isinstance(state, SpilledGroups):
+            return state.finalize(top, bottom)
+        return self._require_kernel().finalize(state, top, bottom)
+
+    def aggregate(self, records: Iterable[Dict[str, Any]], state: Any = None) -> Any:
+        """
+        Накапливает состояние отчета по набору записей
+
+        Args:
+            records: Итерируемый набор записей с данными (список, генератор
+                или колоночное хранилище data.columnar.ColumnarRecords)
+            state: Ранее накопленное состояние для продолжения подсчета
+
+        Returns:
+            Состояние отчета
+        """
+        if state is None:
+            state = self.create_state()
+
+        with self.stage("aggregate") as stage:
+            if self.kernel is not None:
+                self.kernel.aggregate(records, state)
+                stage.distinct_keys = max(stage.distinct_keys, len(state))
+            else:
+                for record in records:
+                    self.accumulate(state, record)
+
+        return state
+
+    def dump_state(self, state: Any) -> Any:
+        """Представляет состояние в виде, пригодном для JSON (для кэша)"""
+        return self.kernel.dump_state(state) if self.kernel is not None else state
+
+    def load_state(self, data: Any) -> Any:
+        """Восстанавливает состояние, сохраненное dump_state"""
+        return self.kernel.load_state(data) if self.kernel is not None else data
+
+    def has_data(self, state: Any) -> bool:
+        """Есть ли в состоянии данные для отчета"""
+        return bool(state)
+
+    def render(
+        self,
+        state: Any,
+        writer: Optional[ReportWriter] = None,
+        top: Optional[int] = None,
+        bottom: Optional[int] = None,
+    ) -> None:
+        """
+        Выводит отчет
+
+        Args:
+            state: Состояние отчета
+            writer: Объект вывода строк; по умолчанию таблица с рамками в stdout
+            top: Вывести только N первых строк
+            bottom: Вывести только N последних строк
+        """
+        if writer is None:
+            writer = GridWriter(self.HEADERS, sys.stdout)
+
+        with self.stage("sort") as stage:
+            rows = self.finalize(state, top, bottom)
+            stage.rows += len(rows)
+
+        with self.stage("render") as stage:
+            for row in rows:
+                writer.write_row(row)
+            writer.close()
+            stage.rows += len(rows)
+
+    def generate_report(self, records: Iterable[Dict[str, Any]]) -> None:
         """
         Генерирует отчет на основе переданных записей
 
         Args:
-            records: Список записей с данными
+            records: Итерируемый набор записей с данными (список, генератор
+                или колоночное хранилище data.columnar.ColumnarRecords)
+        """
+        self.render(self.aggregate(records))
+
+    def _require_kernel(self) -> GroupBy:
+        """Ядро группировки; без объявления методы нужно переопределить"""
+        if self.kernel is None:
+            raise NotImplementedError(
+                f"Отчет {type(self).__name__} не объявляет группировку"
+            )
+        return self.kernel
+
+    def stage(self, name: str) -> ContextManager[StageStats]:
+        """
+        Замеряет этап формирования отчета текущим сборщиком показателей
+
+        Args:
+            name: Название этапа (например, "aggregate" или "render")
         """
-        pass
+        return get_profiler().stage(name)
@@ -0,0 +1,101 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from data.columnar import ColumnarRecords
+from processing.profiler import get_profiler
+from .base_report import BaseReport
+
+ReportStates = List[Any]
+
+
+class ScanEngine:
+    """
+    Движок, формирующий несколько отчетов за один проход по записям
+
+    Каждая запись читается один раз и передается всем отчетам через
+    BaseReport.accumulate. Состояния отчетов хранятся списком в порядке
+    отчетов.
+    """
+
+    def __init__(self, reports: Sequence[BaseReport]) -> None:
+        self.reports = list(reports)
+
+    @property
+    def names(self) -> List[str]:
+        """Названия отчетов"""
+        return [report.name for report in self.reports]
+
+    @property
+    def fields(self) -> Optional[List[str]]:
+        """Поля записей, которые читают отчеты; None - нужны все поля"""
+        fields: Dict[str, None] = {}
+        for report in self.reports:
+            if report.fields is None:
+                return None
+            fields.update(dict.fromkeys(report.fields))
+        return list(fields)
+
+    def create_states(self) -> ReportStates:
+        """Создает пустые состояния всех отчетов"""
+        return [report.create_state() for report in self.reports]
+
+    def scan(
+        self, records: Iterable[Dict[str, Any]], states: Optional[ReportStates] = None
+    ) -> ReportStates:
+        """
+        Передает записи всем отчетам за один проход
+
+        Колоночное хранилище обрабатывается каждым отчетом отдельно: проход
+        по столбцам не создает записей и не требует повторного чтения.
+
+        Args:
+            records: Итерируемый набор записей
+            states: Ранее накопленные состояния для продолжения подсчета
+
+        Returns:
+            Состояния отчетов
+        """
+        if states is None:
+            states = self.create_states()
+
+        if len(self.reports) == 1 or isinstance(records, ColumnarRecords):
+            for report, state in zip(self.reports, states):
+                report.aggregate(records, state)
+            return states
+
+        accumulators = [
+            (report.accumulate, state) for report, state in zip(self.reports, states)
+        ]
+        with get_profiler().stage("aggregate"):
+            for record in records:
+                for accumulate, state in accumulators:
+                    accumulate(state, record)
+
+        return states
+
+    def merge(self, states: ReportStates, partial_states: ReportStates) -> ReportStates:
+        """
+        Добавляет частичные состояния отчетов к общим
+
+        Args:
+            states: Общие состояния, изменяются на месте
+            partial_states: Частичные состояния
+
+        Returns:
+            Общие состояния
+        """
+        for report, state, partial_state in zip(self.reports, states, partial_states):
+            report.merge(state, partial_state)
+        return states
+
+    def dump_states(self, states: ReportStates) -> List[Any]:
+        """Представляет состояния отчетов в виде, пригодном для JSON"""
+        return [report.dump_state(state) for report, state in zip(self.reports, states)]
+
+    def load_states(self, data: List[Any]) -> ReportStates:
+        """Восстанавливает состояния, сохраненные dump_states"""
+        return [report.load_state(state) for report, state in zip(self.reports, data)]
+
+    def has_data(self, states: ReportStates) -> bool:
+        """Есть ли данные хотя бы для одного отчета"""
+        return any(
+            report.has_data(state) for report, state in zip(self.reports, states)
+        )
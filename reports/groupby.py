@@ -0,0 +1,685 @@
+import heapq
+import importlib.util
+import math
+from array import array
+from functools import lru_cache
+from operator import itemgetter
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from data.columnar import ColumnarRecords
+
+# Размер квантильного скетча по умолчанию: ошибка ранга около 1.7%
+DEFAULT_SKETCH_SIZE = 200
+# Точность счетчика различных значений по умолчанию: 4096 регистров, ошибка 1.6%
+DEFAULT_DISTINCT_PRECISION = 12
+
+
+@lru_cache(maxsize=None)
+def load_numpy() -> Optional[ModuleType]:
+    """
+    Модуль numpy или None, если он не установлен
+
+    numpy импортируется при первом обращении, а не при импорте модуля:
+    он нужен только для колоночного хранилища, а его импорт заметно
+    удлиняет запуск программы.
+    """
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - зависит от окружения
+        return None
+    return numpy
+
+
+@lru_cache(maxsize=None)
+def load_sketches() -> ModuleType:
+    """
+    Модуль reports.sketches
+
+    Скетчи импортируются при первой группировке с функциями median,
+    quantile или distinct: остальным отчетам они не нужны.
+    """
+    from . import sketches
+
+    return sketches
+
+
+def __getattr__(name: str) -> Any:
+    # reports.groupby.numpy - модуль numpy или None, как при обычном импорте
+    if name == "numpy":
+        return load_numpy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+GroupState = Dict[Any, List[float]]
+
+# Порядок накопителей в состоянии группы
+ACCUMULATORS = ("count", "sum", "sumsq", "min", "max", "quantiles", "distinct")
+
+# Накопители-скетчи: объекты с add/merge вместо чисел
+SKETCHES = ("quantiles", "distinct")
+
+# Накопители, необходимые для вычисления каждой агрегатной функции
+FUNCTIONS = {
+    "count": ("count",),
+    "mean": ("count", "sum"),
+    "min": ("min",),
+    "max": ("max",),
+    "stddev": ("count", "sum", "sumsq"),
+    "median": ("quantiles",),
+    "quantile": ("quantiles",),
+    "distinct": ("distinct",),
+    "ci_low": ("count", "sum", "sumsq"),
+    "ci_high": ("count", "sum", "sumsq"),
+}
+
+BACKENDS = ("python", "numpy")
+
+
+class Aggregate(NamedTuple):
+    """
+    Объявление агрегатной функции отчета
+
+    Функции median и quantile считаются приближенно квантильным скетчем,
+    distinct - счетчиком HyperLogLog (см. reports.sketches); память на
+    группу у них фиксирована и не зависит от числа записей. Функции
+    ci_low и ci_high - границы доверительного интервала среднего по
+    выборке записей.
+
+    Attributes:
+        field: Поле записи: числовое (например, "grade"), для distinct -
+            строковое (например, "student_name")
+        function: Функция: count, mean, min, max, stddev, median, quantile,
+            distinct, ci_low или ci_high
+        label: Заголовок столбца; по умолчанию "<function>_<field>"
+        fraction: Доля для функции quantile (0.9 - 90-й процентиль), для
+            ci_low и ci_high - уровень доверия (0.95)
+    """
+
+    field: str
+    function: str
+    label: str = ""
+    fraction: float = 0.5
+
+    @property
+    def header(self) -> str:
+        """Заголовок столбца отчета"""
+        if self.label:
+            return self.label
+        if self.function == "quantile":
+            return f"p{round(self.fraction * 100)}_{self.field}"
+        return f"{self.function}_{self.field}"
+
+
+def default_backend() -> str:
+    """Векторизованный вариант, если установлен NumPy, иначе чистый Python"""
+    return "numpy" if importlib.util.find_spec("numpy") is not None else "python"
+
+
+class GroupBy:
+    """
+    Группировка записей с агрегатными функциями
+
+    Состояние - словарь {ключ группы: накопители}, где ключ - значение поля
+    группировки (кортеж значений при нескольких полях), а накопители -
+    список количества, суммы, суммы квадратов, минимума и максимума в
+    объеме, нужном объявленным функциям. Для одной функции mean это пара
+    [количество, сумма]. Функции median, quantile и distinct хранят
+    скетчи размера sketch_size и distinct_precision.
+    Группы хранятся в порядке первого появления.
+
+    Колоночное хранилище обрабатывается без создания записей: ключи
+    кодируются номерами групп, а накопители считаются отдельными проходами
+    по столбцам (через numpy.bincount, если доступен NumPy). Результаты
+    обоих вариантов и построчного подсчета совпадают побитово, так как
+    суммы накапливаются в том же порядке строк.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        aggregates: Sequence[Aggregate],
+        backend: Optional[str] = None,
+        sketch_size: int = DEFAULT_SKETCH_SIZE,
+        distinct_precision: int = DEFAULT_DISTINCT_PRECISION,
+    ) -> None:
+        if not keys:
+            raise ValueError("Не заданы поля группировки")
+        if not aggregates:
+            raise ValueError("Не заданы агрегатные функции")
+        for aggregate in aggregates:
+            if aggregate.function not in FUNCTIONS:
+                raise ValueError(
+                    f"Неизвестная агрегатная функция: {aggregate.function}"
+                )
+            if aggregate.function == "quantile" and not 0 < aggregate.fraction <= 1:
+                raise ValueError("Доля для функции quantile должна быть от 0 до 1")
+            if aggregate.function in ("ci_low", "ci_high") and not (
+                0 < aggregate.fraction < 1
+            ):
+                raise ValueError("Уровень доверия должен быть от 0 до 1")
+        if backend is None:
+            backend = default_backend()
+        if backend not in BACKENDS:
+            raise ValueError(f"Неизвестный вариант вычислений: {backend}")
+        if backend == "numpy" and load_numpy() is None:
+            raise ValueError("Для варианта numpy требуется пакет numpy")
+
+        self.keys = tuple(keys)
+        self.aggregates = tuple(aggregates)
+        self.backend = backend
+        self.sketch_size = sketch_size
+        self.distinct_precision = distinct_precision
+
+        # Накопители (поле, накопитель) в порядке полей и ACCUMULATORS
+        needed = {
+            (aggregate.field, accumulator)
+            for aggregate in self.aggregates
+            for accumulator in FUNCTIONS[aggregate.function]
+        }
+        fields = list(dict.fromkeys(aggregate.field for aggregate in self.aggregates))
+        self.slots: List[Tuple[str, str]] = [
+            (field, accumulator)
+            for field in fields
+            for accumulator in ACCUMULATORS
+            if (field, accumulator) in needed
+        ]
+        self._key = itemgetter(*self.keys)
+        # Частый случай - среднее одного поля: накопители [количество, сумма]
+        self._count_sum = [accumulator for _, accumulator in self.slots] == [
+            "count",
+            "sum",
+        ]
+        self._has_sketches = any(
+            accumulator in SKETCHES for _, accumulator in self.slots
+        )
+        if self._has_sketches:
+            # Проверка размеров скетчей до начала подсчета
+            sketches = load_sketches()
+            sketches.QuantileSketch(sketch_size)
+            sketches.DistinctCounter(distinct_precision)
+
+    @property
+    def fields(self) -> List[str]:
+        """Поля записей, которые читает группировка"""
+        return list(
+            dict.fromkeys(
+                [*self.keys, *(aggregate.field for aggregate in self.aggregates)]
+            )
+        )
+
+    @property
+    def headers(self) -> List[str]:
+        """Заголовки отчета: место, поля группировки и функции"""
+        return ["", *self.keys, *(aggregate.header for aggregate in self.aggregates)]
+
+    def accumulate(self, state: GroupState, record: Dict[str, Any]) -> None:
+        """
+        Учитывает одну запись
+
+        Args:
+            state: Состояние группировки, изменяется на месте
+            record: Запись с данными
+        """
+        key = self._key(record)
+        slots = state.get(key)
+        if slots is None:
+            state[key] = [
+                self._initial(accumulator, record[field])
+                for field, accumulator in self.slots
+            ]
+            return
+        for index, (field, accumulator) in enumerate(self.slots):
+            slots[index] = _update(accumulator, slots[index], record[field])
+
+    def aggregate(
+        self, records: Iterable[Dict[str, Any]], state: Optional[GroupState] = None
+    ) -> GroupState:
+        """
+        Накапливает состояние по набору записей
+
+        Args:
+            records: Итерируемый набор записей или колоночное хранилище
+            state: Ранее накопленное состояние для продолжения подсчета
+
+        Returns:
+            Состояние группировки
+        """
+        if state is None:
+            state = {}
+
+        if isinstance(records, ColumnarRecords):
+            return self.merge(state, self._aggregate_columns(records))
+
+        if self._count_sum:
+            key_of = self._key
+            field = self.slots[0][0]
+            for record in records:
+                key = key_of(record)
+                slots = state.get(key)
+                if slots is None:
+                    state[key] = [1, record[field]]
+                else:
+                    slots[0] += 1
+                    slots[1] += record[field]
+            return state
+
+        for record in records:
+            self.accumulate(state, record)
+        return state
+
+    def merge(self, state: GroupState, partial_state: GroupState) -> GroupState:
+        """
+        Добавляет частичное состояние (например, по одному файлу) к общему
+
+        Args:
+            state: Общее состояние, изменяется на месте
+            partial_state: Частичное состояние
+
+        Returns:
+            Общее состояние
+        """
+        for key, partial_slots in partial_state.items():
+            slots = state.get(key)
+            if slots is None:
+                state[key] = [
+                    slot.copy() if accumulator in SKETCHES else slot
+                    for (_, accumulator), slot in zip(self.slots, partial_slots)
+                ]
+                continue
+            for index, (_, accumulator) in enumerate(self.slots):
+                slots[index] = _combine(accumulator, slots[index], partial_slots[index])
+
+        return state
+
+    def finalize(
+        self,
+        state: GroupState,
+        top: Optional[int] = None,
+        bottom: Optional[int] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Ранжирует группы по убыванию первой агрегатной функции
+
+        Группы с одинаковым значением идут в порядке первого появления.
+        При top/bottom первые/последние N строк полного рейтинга отбираются
+        ограниченной кучей за O(S log N) без сортировки всех групп и
+        совпадают с соответствующими строками полного отчета.
+
+        Args:
+            state: Состояние группировки
+            top: Оставить только N первых строк
+            bottom: Оставить только N последних строк
+
+        Returns:
+            Строки (место, поля группировки..., значения функций...)
+        """
+        rows = (
+            (index, self.key_values(key), self.values(slots))
+            for index, (key, slots) in enumerate(state.items())
+        )
+
+        if top is not None:
+            selected = heapq.nsmallest(top, rows, key=_rank_key)
+            first_rank = 1
+        elif bottom is not None:
+            selected = heapq.nlargest(bottom, rows, key=_rank_key)
+            selected.reverse()
+            first_rank = len(state) - len(selected) + 1
+        else:
+            selected = list(rows)
+            selected.sort(key=lambda row: row[2][0], reverse=True)
+            first_rank = 1
+
+        return [
+            (rank, *key, *values)
+            for rank, (_, key, values) in enumerate(selected, first_rank)
+        ]
+
+    def values(self, slots: Sequence[float]) -> Tuple[Any, ...]:
+        """
+        Вычисляет значения агрегатных функций группы по ее накопителям
+
+        Средние, отклонения и границы интервалов округляются до одного
+        знака после запятой; граница интервала группы из одной записи
+        не определена (None).
+        """
+        accumulated = dict(zip(self.slots, slots))
+        values = []
+        for aggregate in self.aggregates:
+            field = aggregate.field
+            if aggregate.function == "count":
+                values.append(accumulated[field, "count"])
+            elif aggregate.function == "mean":
+                count = accumulated[field, "count"]
+                values.append(round(accumulated[field, "sum"] / count, 1))
+            elif aggregate.function == "stddev":
+                count = accumulated[field, "count"]
+                mean = accumulated[field, "sum"] / count
+                variance = accumulated[field, "sumsq"] / count - mean * mean
+                values.append(round(math.sqrt(max(variance, 0.0)), 1))
+            elif aggregate.function in ("median", "quantile"):
+                sketch = accumulated[field, "quantiles"]
+                values.append(round(sketch.quantile(aggregate.fraction), 1))
+            elif aggregate.function == "distinct":
+                values.append(accumulated[field, "distinct"].count())
+            elif aggregate.function in ("ci_low", "ci_high"):
+                margin = _margin(
+                    accumulated[field, "count"],
+                    accumulated[field, "sum"],
+                    accumulated[field, "sumsq"],
+                    aggregate.fraction,
+                )
+                if margin is None:
+                    values.append(None)
+                    continue
+                mean = accumulated[field, "sum"] / accumulated[field, "count"]
+                bound = (
+                    mean - margin if aggregate.function == "ci_low" else mean + margin
+                )
+                values.append(round(bound, 1))
+            else:
+                values.append(accumulated[field, aggregate.function])
+        return tuple(values)
+
+    def dump_state(self, state: GroupState) -> Any:
+        """Представляет состояние в виде, пригодном для JSON"""
+        if self._has_sketches:
+            state = {
+                key: [
+                    slot.to_state() if accumulator in SKETCHES else slot
+                    for (_, accumulator), slot in zip(self.slots, slots)
+                ]
+                for key, slots in state.items()
+            }
+        if len(self.keys) == 1:
+            return state
+        return [[list(key), slots] for key, slots in state.items()]
+
+    def load_state(self, data: Any) -> GroupState:
+        """Восстанавливает состояние, сохраненное dump_state"""
+        if len(self.keys) == 1:
+            state = data
+        else:
+            state = {tuple(key): slots for key, slots in data}
+        if self._has_sketches:
+            sketches = load_sketches()
+            for slots in state.values():
+                for index, (_, accumulator) in enumerate(self.slots):
+                    if accumulator == "quantiles":
+                        slots[index] = sketches.QuantileSketch.from_state(slots[index])
+                    elif accumulator == "distinct":
+                        slots[index] = sketches.DistinctCounter.from_state(slots[index])
+        return state
+
+    def _initial(self, accumulator: str, value: Any) -> Any:
+        """Значение накопителя после первой записи группы"""
+        if accumulator == "quantiles":
+            sketch = load_sketches().QuantileSketch(self.sketch_size)
+            sketch.add(value)
+            return sketch
+        if accumulator == "distinct":
+            counter = load_sketches().DistinctCounter(self.distinct_precision)
+            counter.add(value)
+            return counter
+        if accumulator == "count":
+            return 1
+        if accumulator == "sumsq":
+            return value * value
+        return value
+
+    def key(self, record: Dict[str, Any]) -> Any:
+        """Ключ группы записи"""
+        return self._key(record)
+
+    def key_values(self, key: Any) -> Tuple[Any, ...]:
+        """Значения полей группировки по ключу группы"""
+        return key if len(self.keys) > 1 else (key,)
+
+    def _aggregate_columns(self, columns: ColumnarRecords) -> GroupState:
+        """
+        Группирует колоночное хранилище по кодам ключей без создания записей
+
+        Args:
+            columns: Колоночное хранилище записей
+
+        Returns:
+            Состояние группировки по хранилищу
+        """
+        if self.backend == "numpy":
+            group_keys, reduced = self._reduce_numpy(columns)
+        else:
+            group_keys, reduced = self._reduce_python(columns)
+
+        return {
+            key: [reduced[slot][code] for slot in self.slots]
+            for code, key in enumerate(group_keys)
+        }
+
+    def _reduce_python(self, columns: ColumnarRecords) -> Tuple[List[Any], Dict]:
+        """Свертка столбцов циклами по кодам групп"""
+        key_columns = [columns.column(key) for key in self.keys]
+        if len(key_columns) == 1:
+            codes = key_columns[0].codes
+            group_keys: List[Any] = list(key_columns[0].values)
+        else:
+            index: Dict[Tuple[int, ...], int] = {}
+            codes = array("I")
+            for combination in zip(*(column.codes for column in key_columns)):
+                code = index.get(combination)
+                if code is None:
+                    code = index[combination] = len(index)
+                codes.append(code)
+            group_keys = [
+                tuple(
+                    column.values[value_code]
+                    for column, value_code in zip(key_columns, combination)
+                )
+                for combination in index
+            ]
+
+        size = len(group_keys)
+        reduced: Dict[Tuple[str, str], List[Any]] = {}
+        for field, accumulator in self.slots:
+            if accumulator in SKETCHES:
+                reduced[field, accumulator] = self._reduce_sketches(
+                    columns, field, accumulator, codes, size
+                )
+                continue
+            values = getattr(columns, field)
+            if accumulator == "count":
+                result: List[Any] = [0] * size
+                for code in codes:
+                    result[code] += 1
+            elif accumulator in ("sum", "sumsq"):
+                result = [0.0] * size
+                if accumulator == "sumsq":
+                    values = [value * value for value in values]
+                for code, value in zip(codes, values):
+                    result[code] += value
+            elif accumulator == "min":
+                result = [math.inf] * size
+                for code, value in zip(codes, values):
+                    if value < result[code]:
+                        result[code] = value
+            else:
+                result = [-math.inf] * size
+                for code, value in zip(codes, values):
+                    if value > result[code]:
+                        result[code] = value
+            reduced[field, accumulator] = result
+
+        return group_keys, reduced
+
+    def _reduce_numpy(self, columns: ColumnarRecords) -> Tuple[List[Any], Dict]:
+        """Векторизованная свертка столбцов через numpy.bincount"""
+        numpy = load_numpy()
+        key_columns = [columns.column(key) for key in self.keys]
+        if len(key_columns) == 1:
+            codes = numpy.asarray(key_columns[0].codes, dtype=numpy.intp)
+            group_keys: List[Any] = list(key_columns[0].values)
+        else:
+            key_codes = [
+                numpy.asarray(column.codes, dtype=numpy.int64) for column in key_columns
+            ]
+            combined = key_codes[0]
+            for column, column_codes in zip(key_columns[1:], key_codes[1:]):
+                combined = combined * len(column.values) + column_codes
+            _, first_rows, inverse = numpy.unique(
+                combined, return_index=True, return_inverse=True
+            )
+            # Номера групп в порядке первого появления, как при построчном подсчете
+            order = numpy.argsort(first_rows, kind="stable")
+            ranks = numpy.empty_like(order)
+            ranks[order] = numpy.arange(len(order))
+            codes = ranks[inverse.reshape(-1)]
+            group_keys = [
+                tuple(
+                    column.values[int(column_codes[row])]
+                    for column, column_codes in zip(key_columns, key_codes)
+                )
+                for row in first_rows[order].tolist()
+            ]
+
+        size = len(group_keys)
+        reduced: Dict[Tuple[str, str], List[Any]] = {}
+        for field, accumulator in self.slots:
+            if accumulator in SKETCHES:
+                reduced[field, accumulator] = self._reduce_sketches(
+                    columns, field, accumulator, codes.tolist(), size
+                )
+                continue
+            values = numpy.asarray(getattr(columns, field), dtype=numpy.float64)
+            if accumulator == "count":
+                result = numpy.bincount(codes, minlength=size)
+            elif accumulator == "sum":
+                result = numpy.bincount(codes, weights=values, minlength=size)
+            elif accumulator == "sumsq":
+                result = numpy.bincount(codes, weights=values * values, minlength=size)
+            elif accumulator == "min":
+                result = numpy.full(size, numpy.inf)
+                numpy.minimum.at(result, codes, values)
+            else:
+                result = numpy.full(size, -numpy.inf)
+                numpy.maximum.at(result, codes, values)
+            reduced[field, accumulator] = result.tolist()
+
+        return group_keys, reduced
+
+    def _reduce_sketches(
+        self,
+        columns: ColumnarRecords,
+        field: str,
+        accumulator: str,
+        codes: Sequence[int],
+        size: int,
+    ) -> List[Any]:
+        """
+        Заполняет скетчи групп значениями столбца в порядке строк
+
+        Для счетчика различных значений хэш считается один раз на значение
+        словаря строкового столбца, а не на каждую строку.
+        """
+        sketches = load_sketches()
+        if accumulator == "quantiles":
+            quantiles = [sketches.QuantileSketch(self.sketch_size) for _ in range(size)]
+            for code, value in zip(codes, getattr(columns, field)):
+                quantiles[code].add(value)
+            return quantiles
+
+        column = columns.column(field)
+        hashes = [
+            sketches.register_rank(value, self.distinct_precision)
+            for value in column.values
+        ]
+        counters = [
+            sketches.DistinctCounter(self.distinct_precision) for _ in range(size)
+        ]
+        for code, value_code in zip(codes, column.codes):
+            counters[code].add_hash(*hashes[value_code])
+        return counters
+
+
+def _update(accumulator: str, current: Any, value: Any) -> Any:
+    """Значение накопителя после очередной записи группы"""
+    if accumulator in SKETCHES:
+        current.add(value)
+        return current
+    if accumulator == "count":
+        return current + 1
+    if accumulator == "sum":
+        return current + value
+    if accumulator == "sumsq":
+        return current + value * value
+    if accumulator == "min":
+        return value if value < current else current
+    return value if value > current else current
+
+
+def _combine(accumulator: str, current: Any, partial: Any) -> Any:
+    """Объединение накопителей двух частичных состояний"""
+    if accumulator in SKETCHES:
+        return current.merge(partial)
+    if accumulator == "min":
+        return partial if partial < current else current
+    if accumulator == "max":
+        return partial if partial > current else current
+    return current + partial
+
+
+def estimate_aggregates(
+    aggregates: Sequence[Aggregate], confidence: float
+) -> Tuple[Aggregate, ...]:
+    """
+    Объявление отчета по выборке: к средним добавляются границы интервалов
+
+    Для каждой функции mean добавляются столбцы "<заголовок>_ci_low" и
+    "<заголовок>_ci_high", а в конце - размер выборки группы sample_size
+    (количество записей поля первого среднего). Первая функция, по которой
+    ранжируются группы, не меняется.
+
+    Args:
+        aggregates: Агрегатные функции отчета
+        confidence: Уровень доверия (0.95)
+
+    Returns:
+        Агрегатные функции отчета по выборке; без функций mean - исходные
+    """
+    means = [aggregate for aggregate in aggregates if aggregate.function == "mean"]
+    if not means:
+        return tuple(aggregates)
+    bounds = [
+        Aggregate(mean.field, function, f"{mean.header}_{function}", confidence)
+        for mean in means
+        for function in ("ci_low", "ci_high")
+    ]
+    return (*aggregates, *bounds, Aggregate(means[0].field, "count", "sample_size"))
+
+
+def _margin(
+    count: int, total: float, sumsq: float, confidence: float
+) -> Optional[float]:
+    """
+    Половина ширины доверительного интервала среднего
+
+    Нормальное приближение: z * s / sqrt(n), где s - выборочное отклонение
+    (с делителем n - 1). None, если записей меньше двух.
+    """
+    if count < 2:
+        return None
+    mean = total / count
+    variance = max(sumsq - count * mean * mean, 0.0) / (count - 1)
+    return _z_score(confidence) * math.sqrt(variance / count)
+
+
+@lru_cache(maxsize=None)
+def _z_score(confidence: float) -> float:
+    """Квантиль нормального распределения для двустороннего интервала"""
+    from statistics import NormalDist
+
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def _rank_key(row: Tuple[int, Any, Tuple[Any, ...]]) -> Tuple[Any, int]:
+    """Ключ порядка в отчете: значение по убыванию, затем порядок появления"""
+    index, _, values = row
+    return -values[0], index
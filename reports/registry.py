@@ -0,0 +1,63 @@
+import importlib
+from typing import Dict, Iterator, Mapping, MutableMapping, Type, Union
+from .base_report import BaseReport
+
+# Название отчета -> "модуль:класс" (модуль относительно пакета reports)
+REPORT_CLASSES = {
+    "student-performance": ".student_performance_report:StudentPerformanceReport",
+    "subject-performance": ".subject_performance_report:SubjectPerformanceReport",
+    "teacher-performance": ".teacher_performance_report:TeacherPerformanceReport",
+    "subject-distribution": ".subject_distribution_report:SubjectDistributionReport",
+    "teacher-students": ".teacher_students_report:TeacherStudentsReport",
+}
+
+
+class ReportRegistry(MutableMapping[str, Type[BaseReport]]):
+    """
+    Отчеты по названиям с импортом модуля отчета при первом обращении
+
+    Названия известны без импорта, поэтому список отчетов для аргументов
+    командной строки не требует загрузки модулей; модуль отчета и его
+    зависимости загружаются только тогда, когда отчет выбран. Отчет можно
+    зарегистрировать и готовым классом.
+    """
+
+    def __init__(self, paths: Mapping[str, str]) -> None:
+        """
+        Args:
+            paths: Пути к классам отчетов вида "модуль:класс" по названиям;
+                относительные модули - в пакете reports
+        """
+        # Строка - еще не загруженный класс, иначе сам класс
+        self._entries: Dict[str, Union[str, Type[BaseReport]]] = dict(paths)
+
+    def __getitem__(self, name: str) -> Type[BaseReport]:
+        """
+        Класс отчета по названию
+
+        Raises:
+            KeyError: Если отчет с таким названием не зарегистрирован
+        """
+        entry = self._entries[name]
+        if isinstance(entry, str):
+            module_name, _, class_name = entry.partition(":")
+            entry = getattr(
+                importlib.import_module(module_name, __package__), class_name
+            )
+            self._entries[name] = entry
+        return entry
+
+    def __setitem__(self, name: str, report: Type[BaseReport]) -> None:
+        self._entries[name] = report
+
+    def __delitem__(self, name: str) -> None:
+        del self._entries[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
@@ -0,0 +1,252 @@
+import base64
+import hashlib
+import math
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+from .groupby import DEFAULT_DISTINCT_PRECISION, DEFAULT_SKETCH_SIZE
+
+
+class QuantileSketch:
+    """
+    Квантильный скетч KLL с ограниченной памятью
+
+    Значения хранятся на уровнях; значение уровня h представляет 2**h
+    исходных значений. Переполненный уровень сортируется, и каждое второе
+    значение переносится на уровень выше, поэтому скетч хранит не более
+    примерно 3 * k значений при любом числе записей. Пока значений меньше
+    емкости первого уровня, квантили точные.
+
+    Ошибка ранга при k=200 - около 1.7% (для медианы 1000 оценок ответ
+    лежит между 483-й и 517-й по величине оценкой), и убывает как 1/k.
+    Сжатие детерминировано (чередованием четных и нечетных позиций),
+    поэтому одинаковые данные в одинаковом порядке всегда дают одинаковый
+    скетч.
+
+    Attributes:
+        k: Емкость верхнего уровня, задает память и точность
+        count: Количество учтенных значений
+        levels: Значения по уровням
+    """
+
+    # Коэффициент уменьшения емкости нижних уровней
+    RATIO = 2 / 3
+
+    def __init__(self, k: int = DEFAULT_SKETCH_SIZE) -> None:
+        if k < 8:
+            raise ValueError("Размер квантильного скетча должен быть не меньше 8")
+        self.k = k
+        self.count = 0
+        self.levels: List[List[float]] = [[]]
+        # Сдвиг следующего сжатия для каждого уровня (0 или 1)
+        self._offsets: List[int] = [0]
+
+    def add(self, value: float) -> None:
+        """Учитывает значение"""
+        self.levels[0].append(value)
+        self.count += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def update(self, values: Iterable[float]) -> None:
+        """Учитывает значения по порядку"""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Добавляет другой скетч к текущему
+
+        Args:
+            other: Скетч того же размера k
+
+        Returns:
+            Текущий скетч
+        """
+        if other.k != self.k:
+            raise ValueError("Нельзя объединить квантильные скетчи разного размера")
+        while len(self.levels) < len(other.levels):
+            self._add_level()
+        for level, values in zip(self.levels, other.levels):
+            level.extend(values)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """
+        Возвращает приближенный квантиль по ближайшему рангу
+
+        Args:
+            q: Доля от 0 до 1 (0.5 - медиана)
+        """
+        if not self.count:
+            raise ValueError("Квантиль пустого скетча не определен")
+        weighted = sorted(
+            (value, 1 << height)
+            for height, level in enumerate(self.levels)
+            for value in level
+        )
+        total = sum(weight for _, weight in weighted)
+        target = q * total
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return weighted[-1][0]
+
+    def copy(self) -> "QuantileSketch":
+        """Независимая копия скетча"""
+        return self.from_state(self.to_state())
+
+    def to_state(self) -> Dict[str, Any]:
+        """Представление скетча для JSON"""
+        return {
+            "k": self.k,
+            "count": self.count,
+            "levels": self.levels,
+            "offsets": self._offsets,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "QuantileSketch":
+        """Восстанавливает скетч из представления to_state"""
+        sketch = cls(state["k"])
+        sketch.count = state["count"]
+        sketch.levels = [list(level) for level in state["levels"]]
+        sketch._offsets = list(state["offsets"])
+        return sketch
+
+    def _capacity(self, height: int) -> int:
+        """Емкость уровня: у верхнего k, у каждого нижнего в RATIO раз меньше"""
+        depth = len(self.levels) - height - 1
+        return max(2, math.ceil(self.k * self.RATIO**depth))
+
+    def _add_level(self) -> None:
+        self.levels.append([])
+        self._offsets.append(0)
+
+    def _compress(self) -> None:
+        """Сжимает переполненные уровни снизу вверх"""
+        height = 0
+        while height < len(self.levels):
+            level = self.levels[height]
+            if len(level) >= self._capacity(height):
+                if height + 1 == len(self.levels):
+                    self._add_level()
+                level.sort()
+                # При нечетной длине наибольшее значение остается на уровне
+                kept = [level.pop()] if len(level) % 2 else []
+                offset = self._offsets[height]
+                self._offsets[height] = 1 - offset
+                self.levels[height + 1].extend(level[offset::2])
+                self.levels[height] = kept
+            height += 1
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QuantileSketch):
+            return NotImplemented
+        return self.to_state() == other.to_state()
+
+    def __repr__(self) -> str:
+        return f"QuantileSketch(k={self.k}, count={self.count})"
+
+
+class DistinctCounter:
+    """
+    Счетчик различных значений HyperLogLog
+
+    Значение хэшируется в 64 бита: старшие p бит выбирают регистр, а в
+    регистре хранится наибольшая позиция первой единицы в остальных битах.
+    Память фиксирована - 2**p байт; стандартная ошибка оценки
+    1.04 / sqrt(2**p) (1.6% при p=12). Малые количества оцениваются
+    линейным подсчетом и практически точны. Счетчики объединяются
+    поэлементным максимумом регистров без потери точности.
+
+    Attributes:
+        precision: Число бит номера регистра p (от 4 до 16)
+        registers: Регистры
+    """
+
+    def __init__(self, precision: int = DEFAULT_DISTINCT_PRECISION) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError("Точность счетчика различных значений - от 4 до 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str) -> None:
+        """Учитывает значение"""
+        self.add_hash(*register_rank(value, self.precision))
+
+    def add_hash(self, index: int, rank: int) -> None:
+        """Учитывает значение по готовым номеру регистра и рангу"""
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "DistinctCounter") -> "DistinctCounter":
+        """
+        Добавляет другой счетчик к текущему
+
+        Args:
+            other: Счетчик той же точности
+
+        Returns:
+            Текущий счетчик
+        """
+        if other.precision != self.precision:
+            raise ValueError("Нельзя объединить счетчики разной точности")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        """Оценка количества различных значений"""
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0**-rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def copy(self) -> "DistinctCounter":
+        """Независимая копия счетчика"""
+        counter = DistinctCounter(self.precision)
+        counter.registers = bytearray(self.registers)
+        return counter
+
+    def to_state(self) -> Dict[str, Any]:
+        """Представление счетчика для JSON"""
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(bytes(self.registers)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "DistinctCounter":
+        """Восстанавливает счетчик из представления to_state"""
+        counter = cls(state["precision"])
+        counter.registers = bytearray(base64.b64decode(state["registers"]))
+        return counter
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DistinctCounter):
+            return NotImplemented
+        return (self.precision, self.registers) == (other.precision, other.registers)
+
+    def __repr__(self) -> str:
+        return f"DistinctCounter(precision={self.precision})"
+
+
+@lru_cache(maxsize=65536)
+def register_rank(value: str, precision: int) -> Tuple[int, int]:
+    """
+    Номер регистра и ранг значения для HyperLogLog
+
+    Используется blake2b, а не hash(): результат не зависит от процесса и
+    запуска, поэтому счетчики из разных процессов и из кэша совместимы.
+    """
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+    hashed = int.from_bytes(digest, "big")
+    width = 64 - precision
+    rest = hashed & ((1 << width) - 1)
+    return hashed >> width, width - rest.bit_length() + 1
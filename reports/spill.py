@@ -0,0 +1,498 @@
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+from collections import deque
+from itertools import islice
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+)
+from processing.profiler import get_profiler
+from .groupby import GroupBy, GroupState
+
+if TYPE_CHECKING:
+    from .base_report import BaseReport
+
+# Количество строк, после которого проверяется число групп в памяти
+BATCH_SIZE = 4096
+# Количество разделов при выгрузке и элементов в одной записи файла
+FANOUT = 16
+WRITE_BATCH = 1024
+# Наибольшее количество файлов строк рейтинга, сливаемых за раз
+MERGE_FANIN = 64
+# Глубина повторного деления разделов, после которой раздел сводится
+# в памяти целиком
+MAX_DEPTH = 6
+
+# Виды элементов выгрузки: накопители группы или значения полей строки
+SLOTS = 0
+ROW = 1
+
+# Элемент выгрузки: (номер файла, порядок появления, ключ, вид, данные).
+# Номер файла -1 - накопители, уже объединенные по предыдущим файлам
+Item = Tuple[int, int, Any, int, Any]
+# Строка рейтинга: (порядок появления, поля группировки, значения функций)
+RankedRow = Tuple[int, Tuple[Any, ...], Tuple[Any, ...]]
+
+
+class SpillFile:
+    """Временный файл элементов, записываемый пакетами через pickle"""
+
+    def __init__(self, directory: str, suffix: str) -> None:
+        """
+        Args:
+            directory: Каталог временных файлов
+            suffix: Расширение файла
+        """
+        self._file: Optional[BinaryIO] = tempfile.NamedTemporaryFile(
+            "wb", suffix=suffix, dir=directory, delete=False
+        )
+        self.path = self._file.name
+        self._buffer: List[Any] = []
+
+    def append(self, item: Any) -> None:
+        """Добавляет элемент"""
+        self._buffer.append(item)
+        if len(self._buffer) >= WRITE_BATCH:
+            self._flush()
+
+    def close(self) -> None:
+        """Дописывает буфер и закрывает файл"""
+        if self._file is not None:
+            self._flush()
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """Закрывает файл без записи буфера"""
+        self._buffer = []
+        self.close()
+
+    def __iter__(self) -> Iterator[Any]:
+        self.close()
+        with open(self.path, "rb") as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+
+    def _flush(self) -> None:
+        if self._buffer and self._file is not None:
+            pickle.dump(self._buffer, self._file, pickle.HIGHEST_PROTOCOL)
+            self._buffer = []
+
+
+class Partitions:
+    """Разделы выгрузки: элемент попадает в раздел по хэшу ключа группы"""
+
+    def __init__(self, directory: str, depth: int) -> None:
+        """
+        Args:
+            directory: Каталог временных файлов
+            depth: Глубина деления; на каждой глубине хэш ключа свой
+        """
+        self.directory = directory
+        self.depth = depth
+        # Файлы создаются при первом элементе раздела
+        self.files: Dict[int, SpillFile] = {}
+
+    def append(self, item: Item) -> None:
+        """Записывает элемент в раздел его ключа"""
+        index = hash((self.depth, item[2])) % FANOUT
+        spill_file = self.files.get(index)
+        if spill_file is None:
+            spill_file = self.files[index] = SpillFile(self.directory, ".part")
+        spill_file.append(item)
+
+    def close(self) -> None:
+        """Дописывает и закрывает файлы разделов"""
+        for spill_file in self.files.values():
+            spill_file.close()
+
+
+class GroupSpiller:
+    """
+    Группировка одного отчета по файлам с выгрузкой групп на диск
+
+    Пока группы помещаются в память, записи каждого файла сводятся ядром
+    GroupBy в частичное состояние файла, которое затем добавляется к общему,
+    как в main.collect_stats. После выгрузки (spill) общее и частичное
+    состояния записываются в разделы по хэшу ключа, а все следующие строки
+    записываются в разделы без свертки. Раздел затем сводится заново в том
+    же порядке: накопители продолжают считаться с места выгрузки, а файлы
+    объединяются по одному, поэтому суммы совпадают с расчетом в памяти
+    побитово. Порядок первого появления группы хранится явно и задает
+    порядок групп с равными значениями.
+    """
+
+    def __init__(self, kernel: GroupBy, directory: str, depth: int = 0) -> None:
+        """
+        Args:
+            kernel: Ядро группировки отчета
+            directory: Каталог временных файлов
+            depth: Глубина деления разделов
+        """
+        self.kernel = kernel
+        self.directory = directory
+        self.depth = depth
+        self.fields = kernel.fields
+        self.total: GroupState = {}
+        self.partial: GroupState = {}
+        self.partitions: Optional[Partitions] = None
+        self.segment = -1
+        # Порядок появления групп; пока выгрузки не было, он задается
+        # порядком ключей словарей и не хранится (None)
+        self._total_orders: Optional[Dict[Any, int]] = None
+        self._partial_orders: Optional[Dict[Any, int]] = None
+        self._next_order = 0
+
+    @property
+    def groups(self) -> int:
+        """Количество групп в памяти"""
+        return len(self.total) + len(self.partial)
+
+    def begin_file(self) -> None:
+        """Начинает частичное состояние следующего файла"""
+        self.segment += 1
+
+    def add(self, records: Sequence[Dict[str, Any]]) -> None:
+        """Учитывает записи текущего файла"""
+        if self.partitions is None:
+            self.kernel.aggregate(records, self.partial)
+            return
+        append = self.partitions.append
+        key_of = self.kernel.key
+        segment = self.segment
+        order = self._next_order
+        for record in records:
+            payload = tuple(record[field] for field in self.fields)
+            append((segment, order, key_of(record), ROW, payload))
+            order += 1
+        self._next_order = order
+
+    def end_file(self) -> None:
+        """Добавляет частичное состояние файла к общему"""
+        if self.partitions is not None:
+            return
+        if self._total_orders is not None and self._partial_orders is not None:
+            for key, order in self._partial_orders.items():
+                self._total_orders.setdefault(key, order)
+            self._partial_orders = {}
+        self.kernel.merge(self.total, self.partial)
+        self.partial = {}
+
+    def spill(self) -> None:
+        """Записывает группы из памяти в разделы; дальше строки не сводятся"""
+        self.partitions = Partitions(self.directory, self.depth)
+        total_orders = self._total_orders
+        if total_orders is None:
+            total_orders = {key: order for order, key in enumerate(self.total)}
+        partial_orders = self._partial_orders
+        if partial_orders is None:
+            partial_orders = {
+                key: order for order, key in enumerate(self.partial, len(self.total))
+            }
+            self._next_order = len(self.total) + len(self.partial)
+
+        append = self.partitions.append
+        for key, slots in self.total.items():
+            append((-1, total_orders[key], key, SLOTS, slots))
+        for key, slots in self.partial.items():
+            append((self.segment, partial_orders[key], key, SLOTS, slots))
+        self.total = {}
+        self.partial = {}
+        self._total_orders = self._partial_orders = None
+
+    def add_items(self, items: Iterable[Item], max_groups: int) -> None:
+        """
+        Сводит элементы раздела в порядке их записи
+
+        Args:
+            items: Элементы раздела
+            max_groups: Наибольшее количество групп в памяти; при
+                превышении оставшиеся элементы делятся на разделы глубже
+        """
+        self._total_orders = {}
+        self._partial_orders = {}
+        kernel = self.kernel
+        fields = self.fields
+        items = iter(items)
+        for segment, order, key, kind, payload in items:
+            if segment != self.segment:
+                self.end_file()
+                self.segment = segment
+            partial = self.partial
+            if key not in partial:
+                self._partial_orders[key] = order
+            if kind == SLOTS:
+                partial[key] = payload
+            else:
+                kernel.accumulate(partial, dict(zip(fields, payload)))
+            if self.groups > max_groups and self.depth < MAX_DEPTH:
+                self.spill()
+                assert self.partitions is not None
+                for rest in items:
+                    self.partitions.append(rest)
+                return
+        self.end_file()
+
+    def ranked_rows(self) -> List[RankedRow]:
+        """Строки рейтинга по группам в памяти в порядке вывода"""
+        orders = self._total_orders
+        if orders is None:
+            orders = {key: order for order, key in enumerate(self.total)}
+        rows = [
+            (orders[key], self.kernel.key_values(key), self.kernel.values(slots))
+            for key, slots in self.total.items()
+        ]
+        rows.sort(key=_rank_key)
+        return rows
+
+
+class SpilledGroups:
+    """
+    Состояние отчета, группы которого выгружены на диск
+
+    Хранит отсортированные по рейтингу файлы строк разделов; строки отчета
+    получаются их слиянием, поэтому в памяти не собирается весь рейтинг.
+    """
+
+    def __init__(self, runs: List[SpillFile], size: int) -> None:
+        """
+        Args:
+            runs: Файлы строк рейтинга разделов
+            size: Количество групп
+        """
+        self.runs = runs
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def finalize(
+        self, top: Optional[int] = None, bottom: Optional[int] = None
+    ) -> Sequence[Tuple[Any, ...]]:
+        """Строки отчета, как GroupBy.finalize для того же состояния в памяти"""
+        if top is not None:
+            return list(self._numbered(islice(self._merged(), top), 1))
+        if bottom is not None:
+            selected = deque(self._merged(), maxlen=bottom)
+            return list(self._numbered(selected, self.size - len(selected) + 1))
+        return RankedRows(self)
+
+    def _merged(self) -> Iterator[RankedRow]:
+        return heapq.merge(*self.runs, key=_rank_key)
+
+    @staticmethod
+    def _numbered(
+        rows: Iterable[RankedRow], first_rank: int
+    ) -> Iterator[Tuple[Any, ...]]:
+        for rank, (_, key, values) in enumerate(rows, first_rank):
+            yield (rank, *key, *values)
+
+
+class RankedRows:
+    """Все строки отчета по выгруженным группам, читаемые по мере вывода"""
+
+    def __init__(self, groups: SpilledGroups) -> None:
+        self.groups = groups
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        return self.groups._numbered(self.groups._merged(), 1)
+
+
+class SpillingScan:
+    """
+    Формирование отчетов по файлам с ограничением числа групп в памяти
+
+    Записи каждого файла передаются всем отчетам пакетами по BATCH_SIZE
+    строк. Если после пакета групп в памяти больше max_groups, группы
+    отчета, у которого их больше всего, выгружаются на диск
+    (см. GroupSpiller). Отчеты, которым хватило памяти, считаются как
+    обычно, и их состояния - обычные словари.
+
+    Результат совпадает с main.collect_stats без кэша, включая порядок
+    строк с равными значениями.
+
+    Использование:
+        with SpillingScan(reports, max_groups) as scan:
+            for records in files:
+                scan.add_file(records)
+            states = scan.finish()
+            ...  # вывод отчетов до выхода из блока
+    """
+
+    def __init__(
+        self,
+        reports: Sequence["BaseReport"],
+        max_groups: int,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            reports: Отчеты с объявленной группировкой
+            max_groups: Наибольшее количество групп всех отчетов в памяти
+            spill_dir: Каталог для временных файлов (по умолчанию системный
+                временный каталог)
+
+        Raises:
+            ValueError: Если max_groups меньше 1 или отчет не объявляет
+                группировку
+        """
+        if max_groups < 1:
+            raise ValueError("Количество групп в памяти должно быть не меньше 1")
+        for report in reports:
+            if report.kernel is None:
+                raise ValueError(f"Отчет {report.name} не объявляет группировку")
+        self.max_groups = max_groups
+        self.directory = tempfile.mkdtemp(prefix="spill-", dir=spill_dir)
+        self.spillers = [
+            GroupSpiller(report.kernel, self.directory)
+            for report in reports
+            if report.kernel is not None
+        ]
+
+    def __enter__(self) -> "SpillingScan":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def spilled(self) -> bool:
+        """Выгружались ли группы на диск"""
+        return any(spiller.partitions is not None for spiller in self.spillers)
+
+    def add_file(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Учитывает записи очередного файла
+
+        Args:
+            records: Записи файла в порядке строк
+        """
+        spillers = self.spillers
+        for spiller in spillers:
+            spiller.begin_file()
+        records = iter(records)
+        with get_profiler().stage("aggregate") as stage:
+            while True:
+                batch = list(islice(records, BATCH_SIZE))
+                if not batch:
+                    break
+                for spiller in spillers:
+                    spiller.add(batch)
+                self._check_memory()
+                stage.distinct_keys = max(
+                    stage.distinct_keys, sum(spiller.groups for spiller in spillers)
+                )
+        for spiller in spillers:
+            spiller.end_file()
+
+    def finish(self) -> List[Any]:
+        """
+        Состояния отчетов после всех файлов
+
+        Returns:
+            Для каждого отчета словарь групп или SpilledGroups, если
+            группы выгружались
+        """
+        states: List[Any] = []
+        resident = sum(spiller.groups for spiller in self.spillers)
+        for spiller in self.spillers:
+            if spiller.partitions is None:
+                states.append(spiller.total)
+                continue
+            with get_profiler().stage("spill"):
+                runs: List[SpillFile] = []
+                size = self._rank(
+                    spiller.kernel,
+                    spiller.partitions,
+                    max(1, self.max_groups - resident),
+                    runs,
+                )
+                while len(runs) > MERGE_FANIN:
+                    runs = [
+                        self._merge_runs(runs[start : start + MERGE_FANIN])
+                        for start in range(0, len(runs), MERGE_FANIN)
+                    ]
+            states.append(SpilledGroups(runs, size))
+        return states
+
+    def close(self) -> None:
+        """Удаляет временные файлы"""
+        for spiller in self.spillers:
+            if spiller.partitions is not None:
+                for spill_file in spiller.partitions.files.values():
+                    spill_file.discard()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _check_memory(self) -> None:
+        """Выгружает группы отчетов, пока их в памяти больше max_groups"""
+        resident = [spiller for spiller in self.spillers if spiller.partitions is None]
+        while (
+            resident and sum(spiller.groups for spiller in resident) > self.max_groups
+        ):
+            largest = max(resident, key=lambda spiller: spiller.groups)
+            largest.spill()
+            resident.remove(largest)
+
+    def _rank(
+        self,
+        kernel: GroupBy,
+        partitions: Partitions,
+        max_groups: int,
+        runs: List[SpillFile],
+    ) -> int:
+        """
+        Сводит разделы и записывает их строки рейтинга в runs
+
+        Returns:
+            Количество групп в разделах
+        """
+        partitions.close()
+        size = 0
+        for spill_file in partitions.files.values():
+            spiller = GroupSpiller(kernel, self.directory, partitions.depth + 1)
+            spiller.add_items(spill_file, max_groups)
+            os.remove(spill_file.path)
+            if spiller.partitions is not None:
+                size += self._rank(kernel, spiller.partitions, max_groups, runs)
+                continue
+            run = SpillFile(self.directory, ".run")
+            for row in spiller.ranked_rows():
+                run.append(row)
+            run.close()
+            runs.append(run)
+            size += len(spiller.total)
+        return size
+
+    def _merge_runs(self, runs: List[SpillFile]) -> SpillFile:
+        """Сливает файлы строк рейтинга в один"""
+        merged = SpillFile(self.directory, ".run")
+        for row in heapq.merge(*runs, key=_rank_key):
+            merged.append(row)
+        merged.close()
+        for run in runs:
+            os.remove(run.path)
+        return merged
+
+
+def _rank_key(row: RankedRow) -> Tuple[Any, int]:
+    """Ключ порядка в отчете: значение по убыванию, затем порядок появления"""
+    order, _, values = row
+    return -values[0], order
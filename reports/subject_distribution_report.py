@@ -0,0 +1,21 @@
+from .base_report import BaseReport
+from .groupby import Aggregate
+
+
+class SubjectDistributionReport(BaseReport):
+    """
+    Класс для формирования отчета по распределению оценок по предметам
+
+    Медиана и процентили считаются квантильными скетчами с фиксированной
+    памятью на предмет, поэтому отчет строится и по многолетним архивам.
+    """
+
+    name = "subject-distribution"
+    group_by = ("subject",)
+    aggregates = (
+        Aggregate("grade", "median", "median"),
+        Aggregate("grade", "quantile", "p25", 0.25),
+        Aggregate("grade", "quantile", "p75", 0.75),
+        Aggregate("grade", "quantile", "p90", 0.9),
+        Aggregate("grade", "count", "grades"),
+    )
@@ -0,0 +1,10 @@
+from .base_report import BaseReport
+from .groupby import Aggregate
+
+
+class SubjectPerformanceReport(BaseReport):
+    """Класс для формирования отчета по средней оценке по предметам"""
+
+    name = "subject-performance"
+    group_by = ("subject",)
+    aggregates = (Aggregate("grade", "mean", "grade"),)
@@ -0,0 +1,10 @@
+from .base_report import BaseReport
+from .groupby import Aggregate
+
+
+class TeacherPerformanceReport(BaseReport):
+    """Класс для формирования отчета по средней оценке у преподавателей"""
+
+    name = "teacher-performance"
+    group_by = ("teacher_name",)
+    aggregates = (Aggregate("grade", "mean", "grade"),)
@@ -0,0 +1,18 @@
+from .base_report import BaseReport
+from .groupby import Aggregate
+
+
+class TeacherStudentsReport(BaseReport):
+    """
+    Класс для формирования отчета по количеству студентов у преподавателей
+
+    Количество различных студентов оценивается счетчиком HyperLogLog с
+    фиксированной памятью на преподавателя.
+    """
+
+    name = "teacher-students"
+    group_by = ("teacher_name",)
+    aggregates = (
+        Aggregate("student_name", "distinct", "students"),
+        Aggregate("grade", "mean", "grade"),
+    )
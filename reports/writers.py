@@ -0,0 +1,113 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Sequence, TextIO, Type
+
+RANK_HEADER = "rank"
+
+
+class ReportWriter(ABC):
+    """Абстрактный базовый класс для вывода строк отчета"""
+
+    def __init__(self, headers: Sequence[str], output: TextIO) -> None:
+        """
+        Args:
+            headers: Заголовки столбцов; пустой заголовок обозначает столбец
+                с местом в рейтинге
+            output: Текстовый поток для вывода
+        """
+        self.headers = list(headers)
+        self.output = output
+
+    @abstractmethod
+    def write_row(self, row: Sequence[Any]) -> None:
+        """Выводит строку отчета"""
+        pass
+
+    def close(self) -> None:
+        """Завершает вывод"""
+        self.output.flush()
+
+    def _named_headers(self) -> List[str]:
+        return [header or RANK_HEADER for header in self.headers]
+
+    @staticmethod
+    def _format(value: Any) -> Any:
+        return f"{value:.1f}" if isinstance(value, float) else value
+
+
+class DelimitedWriter(ReportWriter):
+    """Построчный вывод в формате CSV"""
+
+    delimiter = ","
+
+    def __init__(self, headers: Sequence[str], output: TextIO) -> None:
+        super().__init__(headers, output)
+        self._writer = csv.writer(output, delimiter=self.delimiter, lineterminator="\n")
+        self._writer.writerow(self._named_headers())
+
+    def write_row(self, row: Sequence[Any]) -> None:
+        self._writer.writerow([self._format(value) for value in row])
+
+
+class TSVWriter(DelimitedWriter):
+    """Построчный вывод в формате TSV"""
+
+    delimiter = "\t"
+
+
+class JSONLinesWriter(ReportWriter):
+    """Построчный вывод объектов JSON (JSON Lines)"""
+
+    def write_row(self, row: Sequence[Any]) -> None:
+        record: Dict[str, Any] = dict(zip(self._named_headers(), row))
+        self.output.write(json.dumps(record, ensure_ascii=False))
+        self.output.write("\n")
+
+
+class GridWriter(ReportWriter):
+    """
+    Вывод таблицы с рамками через tabulate
+
+    Таблица выравнивается по ширине столбцов, поэтому строки накапливаются
+    и выводятся целиком при закрытии.
+    """
+
+    def __init__(self, headers: Sequence[str], output: TextIO) -> None:
+        super().__init__(headers, output)
+        self._rows: List[Sequence[Any]] = []
+
+    def write_row(self, row: Sequence[Any]) -> None:
+        self._rows.append(row)
+
+    def close(self) -> None:
+        # tabulate загружается только для этого формата
+        from tabulate import tabulate
+
+        table = tabulate(
+            self._rows, headers=self.headers, tablefmt="grid", floatfmt=".1f"
+        )
+        print(table, file=self.output)
+        super().close()
+
+
+WRITERS: Dict[str, Type[ReportWriter]] = {
+    "grid": GridWriter,
+    "csv": DelimitedWriter,
+    "tsv": TSVWriter,
+    "jsonl": JSONLinesWriter,
+}
+
+
+def create_writer(
+    output_format: str, headers: Sequence[str], output: TextIO
+) -> ReportWriter:
+    """
+    Создает объект вывода для указанного формата
+
+    Raises:
+        ValueError: Если формат неизвестен
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Неизвестный формат вывода: {output_format}")
+    return WRITERS[output_format](headers, output)
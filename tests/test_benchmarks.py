@@ -0,0 +1,54 @@
+import io
+from benchmarks.generate_data import iter_rows, write_dataset
+from benchmarks.run_benchmarks import compare
+from data.csv_reader import CSVReader
+
+
+class TestGenerateData:
+
+    def test_deterministic(self):
+        """Тест воспроизводимости генератора при одинаковом зерне"""
+        assert list(iter_rows(100, seed=1)) == list(iter_rows(100, seed=1))
+        assert list(iter_rows(100, seed=1)) != list(iter_rows(100, seed=2))
+
+    def test_cardinality(self, tmp_path):
+        """Тест ограничения числа различных значений и корректности файла"""
+        path = tmp_path / "students.csv"
+        with open(path, "w", encoding="utf-8", newline="") as output:
+            write_dataset(output, 2000, students=5, subjects=3, teachers=2)
+
+        records = CSVReader().read_file(str(path))
+
+        assert len(records) == 2000
+        assert len({r["student_name"] for r in records}) <= 5
+        assert len({r["subject"] for r in records}) <= 3
+        assert len({r["teacher_name"] for r in records}) <= 2
+
+    def test_write_dataset_header(self):
+        """Тест заголовка сгенерированного файла"""
+        output = io.StringIO()
+        write_dataset(output, 0)
+
+        assert output.getvalue() == "student_name,subject,teacher_name,date,grade\n"
+
+
+class TestCompare:
+
+    def test_detects_regression(self):
+        """Тест обнаружения снижения пропускной способности"""
+        baseline = {
+            "results": [
+                {"stage": "main", "rows": 1000, "rows_per_sec": 100.0},
+                {"stage": "read_file", "rows": 1000, "rows_per_sec": 100.0},
+            ]
+        }
+        results = [
+            {"stage": "main", "rows": 1000, "rows_per_sec": 95.0},
+            {"stage": "read_file", "rows": 1000, "rows_per_sec": 50.0},
+            {"stage": "iter_records", "rows": 1000, "rows_per_sec": 1.0},
+        ]
+
+        regressions = compare(results, baseline, tolerance=0.1)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("read_file (1000 строк)")
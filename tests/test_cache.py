@@ -0,0 +1,124 @@
+import os
+from processing.cache import AggregateCache
+
+
+class TestAggregateCache:
+
+    def setup_method(self):
+        """Настройка для каждого теста"""
+        self.stats = {"Иванов Иван": [2, 9.0], "Сидоров Сидор": [1, 3.7]}
+
+    def _write(self, path, content):
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n" + content,
+            encoding="utf-8",
+        )
+        return str(path)
+
+    def test_put_and_get(self, tmp_path):
+        """Тест сохранения и чтения агрегата"""
+        cache = AggregateCache(str(tmp_path / "cache"), "student-performance")
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+
+        assert cache.get(file_path) is None
+        cache.put(file_path, self.stats)
+
+        assert cache.get(file_path) == self.stats
+
+    def test_changed_file_invalidates_entry(self, tmp_path):
+        """Тест инвалидации записи при изменении файла"""
+        cache = AggregateCache(str(tmp_path / "cache"), "student-performance")
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        cache.put(file_path, self.stats)
+
+        self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5\nА,Б,В,2023-10-02,4")
+
+        assert cache.get(file_path) is None
+
+    def test_file_changed_while_reading(self, tmp_path):
+        """Тест: запись с отпечатком до изменения файла не используется"""
+        cache = AggregateCache(str(tmp_path / "cache"), "student-performance")
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        fingerprint = cache.fingerprint(file_path)
+
+        self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5\nА,Б,В,2023-10-02,4")
+        cache.put(file_path, self.stats, fingerprint)
+
+        assert cache.get(file_path) is None
+
+    def test_content_hash(self, tmp_path):
+        """Тест сверки содержимого при совпадении размера и времени изменения"""
+        cache = AggregateCache(
+            str(tmp_path / "cache"), "student-performance", use_hash=True
+        )
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        cache.put(file_path, self.stats)
+        stat = os.stat(file_path)
+
+        self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,4")
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert cache.get(file_path) is None
+
+    def test_other_report_is_miss(self, tmp_path):
+        """Тест разделения записей разных отчетов"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        AggregateCache(str(tmp_path / "cache"), "student-performance").put(
+            file_path, self.stats
+        )
+
+        assert AggregateCache(str(tmp_path / "cache"), "other").get(file_path) is None
+
+    def test_eviction_removes_oldest_entries(self, tmp_path):
+        """Тест вытеснения давних записей при превышении размера"""
+        cache_dir = tmp_path / "cache"
+        cache = AggregateCache(str(cache_dir), "student-performance", max_bytes=600)
+        paths = [
+            self._write(tmp_path / f"{i}.csv", "А,Б,В,2023-10-01,5") for i in range(3)
+        ]
+
+        for i, file_path in enumerate(paths):
+            cache.put(file_path, self.stats)
+            entry = cache._entry_path(os.path.realpath(file_path))
+            os.utime(entry, ns=(i * 10**9, i * 10**9))
+        cache.evict()
+
+        assert cache.get(paths[0]) is None
+        assert cache.get(paths[2]) == self.stats
+        assert sum(f.stat().st_size for f in cache_dir.iterdir()) <= 600
+
+    def test_clear(self, tmp_path):
+        """Тест очистки кэша"""
+        cache = AggregateCache(str(tmp_path / "cache"), "student-performance")
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        cache.put(file_path, self.stats)
+
+        cache.clear()
+
+        assert cache.get(file_path) is None
+
+    def test_clear_keeps_namespaces_with_same_prefix(self, tmp_path):
+        """Тест: очистка не удаляет записи пространства имен с тем же началом"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        cache = AggregateCache(str(tmp_path / "cache"), "student-performance")
+        other = AggregateCache(
+            str(tmp_path / "cache"), "student-performance-skip-invalid"
+        )
+        cache.put(file_path, self.stats)
+        other.put(file_path, self.stats)
+
+        cache.clear()
+
+        assert cache.get(file_path) is None
+        assert other.get(file_path) == self.stats
+
+    def test_put_does_not_evict(self, tmp_path):
+        """Тест: запись не просматривает каталог, лимит применяет evict"""
+        cache = AggregateCache(str(tmp_path / "cache"), "student-performance", 1)
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+
+        cache.put(file_path, self.stats)
+        assert cache.get(file_path) == self.stats
+
+        cache.evict()
+        assert cache.get(file_path) is None
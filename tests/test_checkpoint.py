@@ -0,0 +1,186 @@
+import json
+import os
+import random
+import sys
+from unittest.mock import patch
+import pytest
+import main
+from reports.engine import ScanEngine
+
+REPORT_NAMES = list(main.REPORTS)
+HEADER_LINE = "student_name,subject,teacher_name,date,grade"
+# Части по ~2 КБ: файлы из нескольких сотен строк читаются в несколько частей
+CHUNK = ["--chunk-mb", "0.002"]
+
+
+def write_csv(path, rows=300, seed=0, bad_row=None, quoted=False):
+    """CSV файл с дробными оценками; bad_row - номер строки с ошибкой"""
+    rng = random.Random(seed)
+    lines = [HEADER_LINE]
+    for index in range(rows):
+        teacher = f"Учитель {rng.randrange(12)}"
+        if quoted and index % 7 == 0:
+            teacher = f'"Учитель\n{rng.randrange(12)}"'
+        grade = f"{rng.uniform(2, 5):.3f}"
+        if bad_row is not None and index + 2 == bad_row:
+            grade = "abc"
+        lines.append(
+            f"Студент {rng.randrange(80)},Предмет {rng.randrange(5)},{teacher},"
+            f"2023-10-{rng.randrange(1, 29):02d},{grade}"
+        )
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def run_main(capsys, *argv):
+    with patch.object(sys, "argv", ["main.py", *argv]):
+        main.main()
+    return capsys.readouterr()
+
+
+def interrupt_after(calls):
+    """ScanEngine.scan, прерывающий расчет на заданном вызове"""
+    scan = ScanEngine.scan
+    remaining = [calls]
+
+    def interrupted(engine, records, states=None):
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            raise KeyboardInterrupt
+        return scan(engine, records, states)
+
+    return interrupted
+
+
+class TestCheckpoint:
+
+    @pytest.mark.parametrize("quoted", [False, True])
+    def test_matches_plain_run(self, tmp_path, capsys, quoted):
+        """Тест: отчеты с контрольными точками совпадают с обычным расчетом"""
+        paths = [
+            write_csv(tmp_path / f"d{i}.csv", seed=i, quoted=quoted) for i in range(3)
+        ]
+        common = ["--files", *paths, "--report", *REPORT_NAMES, "--no-cache"]
+        checkpoint = str(tmp_path / "run.checkpoint")
+
+        expected = run_main(capsys, *common).out
+        captured = run_main(
+            capsys,
+            *common,
+            *CHUNK,
+            "--checkpoint",
+            checkpoint,
+            "--checkpoint-interval",
+            "0",
+        )
+
+        assert captured.out == expected
+        assert not os.path.exists(checkpoint)
+
+    @pytest.mark.parametrize("calls", [2, 5, 9])
+    def test_resume_after_interrupt(self, tmp_path, capsys, calls):
+        """Тест продолжения с контрольной точки после прерывания"""
+        paths = [write_csv(tmp_path / f"d{i}.csv", seed=i) for i in range(3)]
+        common = ["--files", *paths, "--report", *REPORT_NAMES, "--no-cache"]
+        checkpoint = str(tmp_path / "run.checkpoint")
+        argv = [*common, *CHUNK, "--checkpoint", checkpoint]
+        expected = run_main(capsys, *common).out
+
+        with patch.object(ScanEngine, "scan", interrupt_after(calls)):
+            with pytest.raises(SystemExit):
+                run_main(capsys, *argv, "--checkpoint-interval", "0")
+        assert "прервана" in capsys.readouterr().out
+        with open(checkpoint, encoding="utf-8") as f:
+            saved = json.load(f)
+        assert saved["current"] is not None or saved["done"] > 0
+
+        captured = run_main(capsys, *argv, "--resume")
+
+        assert captured.out == expected
+        assert "Продолжение с контрольной точки" in captured.err
+        assert not os.path.exists(checkpoint)
+
+    def test_bad_file_keeps_finished_files(self, tmp_path, capsys):
+        """Тест: после ошибки в файле учтенные файлы не читаются повторно"""
+        paths = [write_csv(tmp_path / f"d{i}.csv", seed=i) for i in range(3)]
+        expected = run_main(
+            capsys, "--files", *paths, "--report", "student-performance", "--no-cache"
+        ).out
+        write_csv(tmp_path / "d1.csv", seed=1, bad_row=250)
+        checkpoint = str(tmp_path / "run.checkpoint")
+        argv = ["--files", *paths, "--report", "student-performance", *CHUNK]
+        argv += ["--checkpoint", checkpoint]
+
+        with pytest.raises(SystemExit):
+            run_main(capsys, *argv)
+        assert "Ошибка в строке 250" in capsys.readouterr().err
+        with open(checkpoint, encoding="utf-8") as f:
+            assert json.load(f)["done"] == 1
+
+        write_csv(tmp_path / "d1.csv", seed=1)
+        assert run_main(capsys, *argv, "--resume").out == expected
+
+    def test_skip_invalid_summary(self, tmp_path, capsys):
+        """Тест: сводка пропущенных строк совпадает с обычным расчетом"""
+        path = write_csv(tmp_path / "data.csv", bad_row=180)
+        common = ["--files", path, "--report", "student-performance"]
+        common += ["--no-cache", "--skip-invalid"]
+        checkpoint = str(tmp_path / "run.checkpoint")
+
+        expected = run_main(capsys, *common)
+        captured = run_main(capsys, *common, *CHUNK, "--checkpoint", checkpoint)
+
+        assert (captured.out, captured.err) == (expected.out, expected.err)
+        assert "Ошибка в строке 180" in captured.err
+
+    def test_resume_without_checkpoint(self, tmp_path, capsys):
+        """Тест --resume без сохраненной контрольной точки"""
+        path = write_csv(tmp_path / "data.csv")
+        checkpoint = str(tmp_path / "run.checkpoint")
+        argv = ["--files", path, "--report", "student-performance"]
+
+        expected = run_main(capsys, *argv, "--no-cache").out
+        captured = run_main(capsys, *argv, "--checkpoint", checkpoint, "--resume")
+
+        assert captured.out == expected
+        assert "не найдена" in captured.err
+
+    @pytest.mark.parametrize(
+        "change, message",
+        [
+            (["--skip-invalid"], "с другими отчетами, файлами или параметрами"),
+            ([], "изменился после сохранения"),
+        ],
+    )
+    def test_resume_rejected(self, tmp_path, capsys, change, message):
+        """Тест: контрольная точка не подходит к другим параметрам или файлам"""
+        paths = [write_csv(tmp_path / f"d{i}.csv", seed=i) for i in range(2)]
+        checkpoint = str(tmp_path / "run.checkpoint")
+        argv = ["--files", *paths, "--report", "student-performance", *CHUNK]
+        argv += ["--checkpoint", checkpoint]
+        with patch.object(ScanEngine, "scan", interrupt_after(4)):
+            with pytest.raises(SystemExit):
+                run_main(capsys, *argv, "--checkpoint-interval", "0")
+        if not change:
+            write_csv(tmp_path / "d0.csv", rows=301)
+
+        with pytest.raises(SystemExit):
+            run_main(capsys, *argv, *change, "--resume")
+
+        assert message in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        "extra",
+        [
+            ["--resume"],
+            ["--checkpoint", "a.checkpoint", "--workers", "2"],
+            ["--checkpoint", "a.checkpoint", "--dedupe"],
+            ["--checkpoint", "a.checkpoint", "--checkpoint-interval", "-1"],
+        ],
+    )
+    def test_invalid_options(self, extra):
+        """Тест недопустимых параметров контрольных точек"""
+        argv = ["main.py", "--files", "data.csv", "--report", "student-performance"]
+        with patch.object(sys, "argv", argv + extra):
+            with pytest.raises(SystemExit):
+                main.parse_arguments()
@@ -0,0 +1,57 @@
+from data.columnar import ColumnarRecords, StringColumn
+
+
+class TestColumnarRecords:
+
+    def setup_method(self):
+        """Настройка для каждого теста"""
+        self.records = [
+            {
+                "student_name": "Иванов Иван",
+                "subject": "Математика",
+                "teacher_name": "Петров Петр",
+                "date": "2023-10-01",
+                "grade": 5.0,
+            },
+            {
+                "student_name": "Сидоров Сидор",
+                "subject": "Математика",
+                "teacher_name": "Петров Петр",
+                "date": "2023-10-02",
+                "grade": 3.7,
+            },
+            {
+                "student_name": "Иванов Иван",
+                "subject": "Физика",
+                "teacher_name": "Иванова Анна",
+                "date": "2023-10-02",
+                "grade": 4.0,
+            },
+        ]
+
+    def test_string_column_dictionary_encoding(self):
+        """Тест кодирования повторяющихся строк словарем"""
+        column = StringColumn()
+        for value in ["б", "а", "б", "б"]:
+            column.append(value)
+
+        assert list(column.codes) == [0, 1, 0, 0]
+        assert column.values == ["б", "а"]
+        assert column[3] == "б"
+        assert len(column) == 4
+
+    def test_round_trip(self):
+        """Тест восстановления записей из столбцов"""
+        columns = ColumnarRecords.from_records(self.records)
+
+        assert len(columns) == 3
+        assert list(columns) == self.records
+        assert columns[1]["grade"] == 3.7
+        assert columns.subject.values == ["Математика", "Физика"]
+
+    def test_nbytes_is_fixed_per_row(self):
+        """Тест компактности: фиксированный размер на строку"""
+        columns = ColumnarRecords.from_records(self.records * 1000)
+
+        assert columns.nbytes() == len(columns) * (4 * 4 + 8)
+        assert len(columns.student_name.values) == 2
@@ -1,7 +1,8 @@
 import pytest
 import tempfile
 import os
-from data.csv_reader import CSVReader
+from data.csv_reader import ByteRange, CSVReader
+from data.validation import RowError, ValidationError
 
 
 class TestCSVReader:
@@ -160,3 +161,216 @@ class TestCSVReader:
 
         finally:
             os.unlink(temp_path)
+
+    def test_iter_records_is_lazy(self):
+        """Тест потокового чтения: записи отдаются до разбора ошибочной строки"""
+        csv_content = """student_name,subject,teacher_name,date,grade
+Иванов Иван,Математика,Петров Петр,2023-10-01,5
+Сидоров Сидор,Физика,Иванова Анна,2023-10-02,abc"""
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", delete=False, suffix=".csv", encoding="utf-8"
+        ) as f:
+            f.write(csv_content)
+            f.flush()
+            temp_path = f.name
+
+        try:
+            records = self.csv_reader.iter_records(temp_path)
+
+            first = next(records)
+            assert first["student_name"] == "Иванов Иван"
+            assert first["grade"] == 5.0
+
+            with pytest.raises(ValueError, match="Ошибка в строке 3"):
+                next(records)
+
+        finally:
+            os.unlink(temp_path)
+
+    def test_read_columns(self):
+        """Тест чтения файла в колоночное хранилище"""
+        csv_content = """student_name,subject,teacher_name,date,grade
+Иванов Иван,Математика,Петров Петр,2023-10-01,5
+Сидоров Сидор,Физика,Иванова Анна,2023-10-02,4
+Иванов Иван,Физика,Иванова Анна,2023-10-03,4.5"""
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", delete=False, suffix=".csv", encoding="utf-8"
+        ) as f:
+            f.write(csv_content)
+            f.flush()
+            temp_path = f.name
+
+        try:
+            columns = self.csv_reader.read_columns(temp_path)
+
+            assert len(columns) == 3
+            assert list(columns) == self.csv_reader.read_file(temp_path)
+            assert columns.student_name.values == ["Иванов Иван", "Сидоров Сидор"]
+            assert list(columns.grade) == [5.0, 4.0, 4.5]
+
+        finally:
+            os.unlink(temp_path)
+
+    def _write_temp(self, csv_content):
+        with tempfile.NamedTemporaryFile(
+            mode="w", delete=False, suffix=".csv", encoding="utf-8"
+        ) as f:
+            f.write(csv_content)
+            return f.name
+
+    def test_batch_validation_collects_all_errors(self):
+        """Тест пакетной проверки: собираются ошибки всех строк"""
+        temp_path = self._write_temp(
+            """student_name,subject,teacher_name,date,grade
+Иванов Иван,Математика,Петров Петр,2023-10-01,5
+Сидоров Сидор,Физика,Иванова Анна,2023-10-02,abc
+,Физика,Иванова Анна,2023-10-02,4
+Петров Петр,Химия,Иванова Анна,2023-10-03,7"""
+        )
+
+        try:
+            csv_reader = CSVReader(max_errors=10)
+            validation = csv_reader.create_validation()
+
+            with pytest.raises(ValidationError) as exc_info:
+                list(csv_reader.iter_records(temp_path, validation))
+
+            assert [error.row_num for error in validation.errors] == [3, 4, 5]
+            assert "Ошибка в строке 4: Поле student_name" in str(exc_info.value)
+            assert validation.rows_checked == 4
+
+        finally:
+            os.unlink(temp_path)
+
+    def test_batch_validation_max_errors(self):
+        """Тест остановки пакетной проверки после N ошибок"""
+        temp_path = self._write_temp(
+            "student_name,subject,teacher_name,date,grade\n"
+            + "\n".join(f"С{i},М,П,2023-10-01,0" for i in range(10))
+        )
+
+        try:
+            csv_reader = CSVReader(max_errors=3)
+            validation = csv_reader.create_validation()
+
+            with pytest.raises(ValidationError):
+                list(csv_reader.iter_records(temp_path, validation))
+
+            assert len(validation.errors) == 3
+
+        finally:
+            os.unlink(temp_path)
+
+    def test_batch_validation_skip_invalid(self):
+        """Тест пропуска некорректных строк"""
+        temp_path = self._write_temp(
+            """student_name,subject,teacher_name,date,grade
+Иванов Иван,Математика,Петров Петр,2023-10-01,5
+Сидоров Сидор,Физика,Иванова Анна,2023-10-02
+Петров Петр,Химия,Иванова Анна,2023-10-03,4"""
+        )
+
+        try:
+            csv_reader = CSVReader(skip_invalid=True)
+            validation = csv_reader.create_validation()
+
+            records = list(csv_reader.iter_records(temp_path, validation))
+
+            assert [r["student_name"] for r in records] == [
+                "Иванов Иван",
+                "Петров Петр",
+            ]
+            assert validation.errors == [RowError(3, "Недостаточно значений в строке")]
+
+        finally:
+            os.unlink(temp_path)
+
+    def test_batch_validation_matches_row_validation(self):
+        """Тест совпадения пакетной и построчной обработки корректного файла"""
+        temp_path = self._write_temp(
+            "student_name,subject,teacher_name,date,grade\n"
+            + "\n".join(
+                f" Студент {i % 7} ,Предмет {i % 3},Учитель,2023-10-01, {1 + i % 40 / 10}"
+                for i in range(CSVReader.BATCH_SIZE + 5)
+            )
+        )
+
+        try:
+            batch_records = list(CSVReader(max_errors=1).iter_records(temp_path))
+
+            assert batch_records == self.csv_reader.read_file(temp_path)
+
+        finally:
+            os.unlink(temp_path)
+
+    @pytest.mark.parametrize("grade", ["nan", "inf", "-inf", "5.5", " "])
+    def test_batch_validation_rejects_grade(self, grade):
+        """Тест пакетной проверки: блок с nan, inf или пустой оценкой"""
+        rows = [
+            f"Студент {i},Предмет,Учитель,2023-10-01,{1 + i % 5}" for i in range(50)
+        ]
+        rows[17] = f"Студент 17,Предмет,Учитель,2023-10-01,{grade}"
+        temp_path = self._write_temp(
+            "student_name,subject,teacher_name,date,grade\n" + "\n".join(rows)
+        )
+
+        try:
+            csv_reader = CSVReader(skip_invalid=True)
+            validation = csv_reader.create_validation()
+
+            records = list(csv_reader.iter_records(temp_path, validation))
+
+            assert len(records) == 49
+            assert [error.row_num for error in validation.errors] == [19]
+
+        finally:
+            os.unlink(temp_path)
+
+    def test_split_ranges(self):
+        """Тест деления файла на диапазоны байтов по границам строк"""
+        content = "student_name,subject,teacher_name,date,grade\n" + "".join(
+            f"Студент {i},Математика,Петров,2023-10-01,{1 + i % 5}\n" for i in range(50)
+        )
+        temp_path = self._write_temp(content)
+
+        try:
+            ranges = self.csv_reader.split_ranges(temp_path, 100)
+            data = content.encode("utf-8")
+
+            assert len(ranges) > 1
+            assert ranges[0].start == data.index(b"\n") + 1
+            assert ranges[-1].end == len(data)
+            for previous, current in zip(ranges, ranges[1:]):
+                assert previous.end == current.start
+                assert data[current.start - 1 : current.start] == b"\n"
+
+            records = [
+                record
+                for byte_range in ranges
+                for record in self.csv_reader.read_range(temp_path, byte_range)
+            ]
+            assert records == self.csv_reader.read_file(temp_path)
+
+        finally:
+            os.unlink(temp_path)
+
+    def test_read_range_row_numbers(self):
+        """Тест номеров строк диапазона: от его начала"""
+        header = "student_name,subject,teacher_name,date,grade\nА,Б,В,2023-10-01,5\n"
+        temp_path = self._write_temp(
+            header + "А,Б,В,2023-10-01,4\nА,Б,В,2023-10-01,abc\n"
+        )
+
+        try:
+            byte_range = ByteRange(len(header.encode()), os.path.getsize(temp_path))
+            validation = CSVReader(skip_invalid=True).create_validation()
+            records = CSVReader().read_range(temp_path, byte_range, validation)
+
+            assert [record["grade"] for record in records] == [4.0]
+            assert validation.errors == [RowError(2, "Некорректная оценка: abc")]
+            assert records.rows == 2
+
+        finally:
+            os.unlink(temp_path)
@@ -0,0 +1,135 @@
+import os
+import sys
+from unittest.mock import patch
+import pytest
+from processing.dedupe import SET_ENTRY_BYTES, BloomFilter, RowDeduplicator
+import main
+
+HEADER = "student_name,subject,teacher_name,date,grade\n"
+
+
+def record(name, grade=5.0, date="2023-10-01"):
+    return {
+        "student_name": name,
+        "subject": "Математика",
+        "teacher_name": "Петров",
+        "date": date,
+        "grade": grade,
+    }
+
+
+class TestRowDeduplicator:
+
+    def test_keeps_first_occurrences(self):
+        """Тест отбора первых вхождений записей"""
+        records = [
+            record("Иванов"),
+            record("Иванов", 4.0),
+            record("Иванов"),
+            record("Иванов", date="2023-10-02"),
+            record("Иванов", 4.0),
+        ]
+
+        with RowDeduplicator() as dedupe:
+            kept = list(dedupe.filter(records))
+
+        assert kept == [records[0], records[1], records[3]]
+        assert (dedupe.rows, dedupe.duplicates) == (5, 2)
+
+    def test_duplicates_across_calls(self):
+        """Тест повторов между файлами: отпечатки общие для всех вызовов"""
+        with RowDeduplicator() as dedupe:
+            first = list(dedupe.filter([record("Иванов"), record("Сидоров")]))
+            second = list(dedupe.filter([record("Сидоров"), record("Орлов")]))
+
+        assert len(first) == 2
+        assert second == [record("Орлов")]
+
+    def test_spilled_runs_match_memory(self, tmp_path):
+        """Тест выгрузки отпечатков на диск при маленьком бюджете памяти"""
+        records = [record(f"Студент {i % 700}", float(i % 3)) for i in range(5000)]
+
+        with RowDeduplicator() as dedupe:
+            expected = list(dedupe.filter(records))
+        with RowDeduplicator(memory_bytes=8000, spill_dir=str(tmp_path)) as dedupe:
+            kept = list(dedupe.filter(records))
+            assert dedupe.spilled > 0
+            assert os.listdir(tmp_path)
+
+        assert kept == expected
+        assert len(kept) == 2100
+        assert os.listdir(tmp_path) == []
+
+    def test_bloom_filters_count_against_budget(self, tmp_path):
+        """Тест: фильтры Блума выгрузок уменьшают емкость множества"""
+        records = [record(f"Студент {i}") for i in range(20000)]
+
+        with RowDeduplicator(memory_bytes=80000, spill_dir=str(tmp_path)) as dedupe:
+            kept = list(dedupe.filter(records))
+            bloom_bytes = sum(len(run.bloom.bits) for run in dedupe._runs)
+
+            assert dedupe.spilled + len(dedupe._recent) == 20000
+            assert bloom_bytes > 0
+            assert bloom_bytes + dedupe.capacity * SET_ENTRY_BYTES <= 80000
+            assert len(dedupe._runs) <= (20000 // 900).bit_length() + 1
+
+        assert kept == records
+
+    def test_bloom_filter(self):
+        """Тест фильтра Блума: добавленные отпечатки всегда находятся"""
+        bloom = BloomFilter(1000)
+        for value in range(-500, 500):
+            bloom.add(hash(("Иванов", value)))
+
+        assert all(hash(("Иванов", value)) in bloom for value in range(-500, 500))
+        false_positives = sum(
+            hash(("Сидоров", value)) in bloom for value in range(10000)
+        )
+        assert false_positives < 500
+
+
+class TestDedupeOption:
+
+    def test_cross_file_duplicates(self, tmp_path, capsys):
+        """Тест --dedupe: повторы из разных файлов учитываются один раз"""
+        first = tmp_path / "first.csv"
+        first.write_text(
+            HEADER + "Иванов,Математика,Петров,2023-10-01,5\n"
+            "Иванов,Математика,Петров,2023-10-01,5\n"
+            "Сидоров,Физика,Орлов,2023-10-02,3\n",
+            encoding="utf-8",
+        )
+        second = tmp_path / "second.csv"
+        second.write_text(
+            HEADER + "Сидоров,Физика,Орлов,2023-10-02,3\n"
+            "Сидоров,Физика,Орлов,2023-10-03,5\n",
+            encoding="utf-8",
+        )
+        argv = ["main.py", "--files", str(first), str(second)]
+        argv += ["--report", "student-performance", "--dedupe"]
+
+        with patch.object(sys, "argv", argv):
+            main.main()
+
+        captured = capsys.readouterr()
+        assert captured.out == (
+            "rank,student_name,grade\n1,Иванов,5.0\n2,Сидоров,4.0\n"
+        )
+        assert "Пропущено повторяющихся строк: 2" in captured.err
+
+    @pytest.mark.parametrize(
+        "extra",
+        [
+            ["--workers", "2"],
+            ["--watch"],
+            ["--dedupe-memory-mb", "0"],
+        ],
+    )
+    def test_invalid_options(self, extra, capsys):
+        """Тест несовместимых с --dedupe параметров"""
+        argv = ["main.py", "--files", "data.csv", "--report", "student-performance"]
+        with patch.object(sys, "argv", argv + ["--dedupe", *extra]):
+            with pytest.raises(SystemExit):
+                main.parse_arguments()
+
+        assert "--dedupe" in capsys.readouterr().err
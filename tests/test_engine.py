@@ -0,0 +1,85 @@
+from data.columnar import ColumnarRecords
+from reports.engine import ScanEngine
+from reports.student_performance_report import StudentPerformanceReport
+from reports.subject_performance_report import SubjectPerformanceReport
+from reports.teacher_performance_report import TeacherPerformanceReport
+
+RECORDS = [
+    {
+        "student_name": "Иванов",
+        "subject": "Математика",
+        "teacher_name": "Петров",
+        "date": "2023-10-01",
+        "grade": 5.0,
+    },
+    {
+        "student_name": "Сидоров",
+        "subject": "Физика",
+        "teacher_name": "Петров",
+        "date": "2023-10-02",
+        "grade": 3.0,
+    },
+    {
+        "student_name": "Иванов",
+        "subject": "Физика",
+        "teacher_name": "Смирнова",
+        "date": "2023-10-03",
+        "grade": 4.0,
+    },
+]
+
+
+class TestScanEngine:
+
+    def setup_method(self):
+        """Настройка для каждого теста"""
+        self.engine = ScanEngine(
+            [
+                StudentPerformanceReport(),
+                SubjectPerformanceReport(),
+                TeacherPerformanceReport(),
+            ]
+        )
+
+    def test_scan_matches_separate_reports(self):
+        """Тест совпадения одного прохода с отдельным подсчетом каждого отчета"""
+        states = self.engine.scan(iter(RECORDS))
+
+        assert states == [report.aggregate(RECORDS) for report in self.engine.reports]
+        assert states[1] == {"Математика": [1, 5.0], "Физика": [2, 7.0]}
+        assert states[2] == {"Петров": [2, 8.0], "Смирнова": [1, 4.0]}
+
+    def test_scan_columnar_records(self):
+        """Тест подсчета по колоночному хранилищу"""
+        columns = ColumnarRecords.from_records(RECORDS)
+
+        assert self.engine.scan(columns) == self.engine.scan(RECORDS)
+
+    def test_merge_partial_states(self):
+        """Тест объединения частичных состояний в порядке файлов"""
+        states = self.engine.scan(RECORDS[:1])
+        self.engine.merge(states, self.engine.scan(RECORDS[1:]))
+
+        assert states == self.engine.scan(RECORDS)
+
+    def test_has_data(self):
+        """Тест проверки наличия данных"""
+        assert not self.engine.has_data(self.engine.create_states())
+        assert self.engine.has_data(self.engine.scan(RECORDS))
+
+    def test_names(self):
+        """Тест названий отчетов"""
+        assert self.engine.names == [
+            "student-performance",
+            "subject-performance",
+            "teacher-performance",
+        ]
+
+    def test_finalize_sorts_subjects(self):
+        """Тест сортировки предметов по убыванию средней оценки"""
+        report = SubjectPerformanceReport()
+
+        assert report.finalize(report.aggregate(RECORDS)) == [
+            (1, "Математика", 5.0),
+            (2, "Физика", 3.5),
+        ]
@@ -0,0 +1,176 @@
+from unittest.mock import patch
+import pytest
+from data.columnar import ColumnarRecords
+from data.csv_reader import CSVReader
+from data.filters import DateRange, RecordFilter
+from data.validation import ValidationError
+from processing.cache import AggregateCache
+from reports.engine import ScanEngine
+from reports.student_performance_report import StudentPerformanceReport
+import main
+
+CSV_CONTENT = """student_name,subject,teacher_name,date,grade
+Иванов,Математика,Петров,2023-09-01,5
+Сидоров,Физика,Смирнова,2023-10-01,3
+Петров,Математика,Смирнова,2023-10-15,4
+Сидоров,Математика,Петров,2023-11-01,2
+Иванов,Физика,Петров,2023-12-01,4
+"""
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "students.csv"
+    path.write_text(CSV_CONTENT, encoding="utf-8")
+    return str(path)
+
+
+def expected(path, record_filter):
+    """Записи файла, отобранные уже после полного разбора"""
+    return [
+        record
+        for record in CSVReader().iter_records(path)
+        if record_filter.match_date(record["date"])
+        and (not record_filter.subjects or record["subject"] in record_filter.subjects)
+        and (
+            not record_filter.teachers
+            or record["teacher_name"] in record_filter.teachers
+        )
+    ]
+
+
+FILTERS = [
+    RecordFilter(date_from="2023-10-01", date_to="2023-11-01"),
+    RecordFilter(subjects=["Математика"]),
+    RecordFilter(date_from="2023-10-01", teachers=["Петров"]),
+    RecordFilter(subjects=["Химия"]),
+]
+
+
+class TestRecordFilter:
+
+    def test_matcher_checks_raw_fields(self):
+        """Тест проверки сырых полей строки с пробелами"""
+        match = RecordFilter("2023-10-01", "2023-10-31", ["Физика"]).matcher()
+
+        assert match({"date": " 2023-10-05 ", "subject": "Физика "})
+        assert not match({"date": "2023-11-05", "subject": "Физика"})
+        assert not match({"date": "2023-10-05", "subject": "Химия"})
+
+    def test_matcher_keeps_incomplete_rows(self):
+        """Тест: строка с недостающими полями не отбрасывается фильтром"""
+        match = RecordFilter(subjects=["Физика"]).matcher()
+
+        assert match({"date": "2023-10-05", "subject": None})
+
+    def test_matcher_tracks_dates(self):
+        """Тест учета дат всех просмотренных строк"""
+        dates = DateRange()
+        match = RecordFilter(date_from="2023-10-10").matcher(dates)
+
+        for date in ["2023-10-12", "2023-09-01", "2023-10-20"]:
+            match({"date": date})
+
+        assert dates == DateRange("2023-09-01", "2023-10-20")
+
+    def test_overlaps(self):
+        """Тест проверки пересечения диапазона дат файла с условиями"""
+        record_filter = RecordFilter("2023-10-01", "2023-10-31")
+
+        assert record_filter.overlaps(DateRange("2023-09-01", "2023-10-01"))
+        assert not record_filter.overlaps(DateRange("2023-11-01", "2023-12-01"))
+        assert not record_filter.overlaps(DateRange())
+
+    def test_key_does_not_depend_on_order(self):
+        """Тест описания условий для пространства имен кэша"""
+        first = RecordFilter(subjects=["Физика", "Математика"])
+        second = RecordFilter(subjects=["Математика", "Физика"])
+
+        assert first.key == second.key
+        assert not RecordFilter()
+
+    @pytest.mark.parametrize("record_filter", FILTERS)
+    def test_filter_columns_matches_rows(self, csv_file, record_filter):
+        """Тест отбора колоночного хранилища по кодам словарей"""
+        columns = ColumnarRecords.from_records(CSVReader().iter_records(csv_file))
+
+        selected = record_filter.filter_columns(columns)
+
+        assert list(selected) == expected(csv_file, record_filter)
+        # Словари кодируются заново в порядке первого появления
+        assert selected.student_name.values == list(
+            dict.fromkeys(record["student_name"] for record in selected)
+        )
+
+
+class TestReaderFilters:
+
+    @pytest.mark.parametrize("record_filter", FILTERS)
+    @pytest.mark.parametrize("max_errors", [None, 10])
+    def test_iter_records(self, csv_file, record_filter, max_errors):
+        """Тест отбора строк при построчном и пакетном чтении"""
+        reader = CSVReader(max_errors=max_errors, record_filter=record_filter)
+
+        assert list(reader.iter_records(csv_file)) == expected(csv_file, record_filter)
+
+    @pytest.mark.parametrize("record_filter", FILTERS)
+    def test_sidecar(self, csv_file, record_filter):
+        """Тест отбора строк файла-спутника"""
+        reader = CSVReader(use_sidecar=True, record_filter=record_filter)
+
+        first = list(reader.read_columns(csv_file))
+        second = list(reader.read_columns(csv_file))
+
+        assert first == second == expected(csv_file, record_filter)
+        assert len(CSVReader(use_sidecar=True).read_columns(csv_file)) == 5
+
+    def test_sidecar_prunes_file_by_dates(self, csv_file):
+        """Тест пропуска файла по словарю дат спутника"""
+        CSVReader(use_sidecar=True).read_columns(csv_file)
+        reader = CSVReader(use_sidecar=True, record_filter=RecordFilter("2024-01-01"))
+        dates = DateRange()
+
+        with patch.object(RecordFilter, "filter_columns") as mock_filter_columns:
+            assert len(reader.read_columns(csv_file, dates=dates)) == 0
+            mock_filter_columns.assert_not_called()
+        assert dates == DateRange("2023-09-01", "2023-12-01")
+
+    def test_filtered_rows_keep_row_numbers(self, tmp_path):
+        """Тест номеров строк в ошибках после отбора"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n"
+            "А,Физика,П,2023-10-01,abc\nБ,Химия,П,2023-10-01,5\n"
+            "В,Химия,П,2023-10-01,xyz\n",
+            encoding="utf-8",
+        )
+        reader = CSVReader(
+            max_errors=10, record_filter=RecordFilter(subjects=["Химия"])
+        )
+
+        with pytest.raises(ValidationError) as exc_info:
+            list(reader.iter_records(str(path)))
+
+        assert [error.row_num for error in exc_info.value.report.errors] == [4]
+
+
+class TestCachePruning:
+
+    def test_file_outside_dates_is_not_read(self, csv_file, tmp_path):
+        """Тест пропуска файла по диапазону дат из метаданных кэша"""
+        engine = ScanEngine([StudentPerformanceReport()])
+        october = CSVReader(record_filter=RecordFilter("2023-10-01", "2023-10-31"))
+        cache = AggregateCache(str(tmp_path / "cache"), "october")
+
+        main.collect_stats(engine, [csv_file], cache=cache, csv_reader=october)
+        assert cache.get_dates(csv_file) == ("2023-09-01", "2023-12-01")
+
+        next_year = CSVReader(record_filter=RecordFilter("2024-01-01"))
+        other_cache = AggregateCache(str(tmp_path / "cache"), "next-year")
+        with patch.object(CSVReader, "iter_records") as mock_iter_records:
+            states = main.collect_stats(
+                engine, [csv_file], cache=other_cache, csv_reader=next_year
+            )
+            mock_iter_records.assert_not_called()
+
+        assert not engine.has_data(states)
@@ -0,0 +1,200 @@
+import json
+import random
+import statistics
+import pytest
+from data.columnar import ColumnarRecords
+from reports.base_report import BaseReport
+from reports.groupby import Aggregate, GroupBy, numpy
+
+BACKENDS = [
+    "python",
+    pytest.param(
+        "numpy",
+        marks=pytest.mark.skipif(numpy is None, reason="numpy не установлен"),
+    ),
+]
+
+AGGREGATES = (
+    Aggregate("grade", "mean"),
+    Aggregate("grade", "count"),
+    Aggregate("grade", "min"),
+    Aggregate("grade", "max"),
+    Aggregate("grade", "stddev"),
+)
+
+
+def make_records(count, seed=1):
+    """Случайные записи с повторяющимися значениями полей"""
+    rng = random.Random(seed)
+    return [
+        {
+            "student_name": f"Студент {rng.randrange(20)}",
+            "subject": rng.choice(["Математика", "Физика", "Химия"]),
+            "teacher_name": rng.choice(["Петров", "Смирнова"]),
+            "date": "2023-10-01",
+            "grade": rng.choice([2.0, 3.0, 3.3, 4.1, 5.0]),
+        }
+        for _ in range(count)
+    ]
+
+
+class TestGroupBy:
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_columnar_matches_rows_bit_for_bit(self, backend):
+        """Тест побитового совпадения колоночной свертки с построчным подсчетом"""
+        records = make_records(2000)
+        kernel = GroupBy(("subject", "student_name"), AGGREGATES, backend=backend)
+
+        by_rows = kernel.aggregate(records)
+        by_columns = kernel.aggregate(ColumnarRecords.from_records(records))
+
+        assert by_columns == by_rows
+        assert list(by_columns) == list(by_rows)
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_single_key_count_sum_layout(self, backend):
+        """Тест состояния [количество, сумма] для одной функции mean"""
+        records = make_records(500)
+        kernel = GroupBy(("student_name",), (Aggregate("grade", "mean"),), backend)
+
+        state = kernel.aggregate(ColumnarRecords.from_records(records))
+
+        assert state == kernel.aggregate(records)
+        assert all(len(slots) == 2 for slots in state.values())
+
+    def test_values_match_statistics(self):
+        """Тест значений функций по сравнению с модулем statistics"""
+        records = make_records(300)
+        kernel = GroupBy(("teacher_name",), AGGREGATES)
+
+        rows = kernel.finalize(kernel.aggregate(records))
+
+        for _, teacher, mean, count, minimum, maximum, stddev in rows:
+            grades = [r["grade"] for r in records if r["teacher_name"] == teacher]
+            assert mean == round(statistics.fmean(grades), 1)
+            assert count == len(grades)
+            assert minimum == min(grades)
+            assert maximum == max(grades)
+            assert stddev == round(statistics.pstdev(grades), 1)
+
+    def test_merge_partial_states(self):
+        """Тест объединения частичных состояний, включая минимум и максимум"""
+        records = make_records(400)
+        kernel = GroupBy(("subject",), AGGREGATES)
+
+        state = kernel.aggregate(records[:150])
+        kernel.merge(state, kernel.aggregate(records[150:]))
+
+        assert kernel.finalize(state) == kernel.finalize(kernel.aggregate(records))
+
+    def test_dump_and_load_state_with_several_keys(self):
+        """Тест сохранения состояния с составными ключами в виде для JSON"""
+        kernel = GroupBy(("subject", "teacher_name"), AGGREGATES)
+        state = kernel.aggregate(make_records(100))
+
+        data = kernel.dump_state(state)
+
+        assert all(isinstance(key, list) for key, _ in data)
+        assert kernel.load_state(data) == state
+
+    def test_finalize_rows_and_headers(self):
+        """Тест строк отчета с несколькими полями группировки"""
+        kernel = GroupBy(
+            ("subject", "teacher_name"),
+            (Aggregate("grade", "mean", "grade"), Aggregate("grade", "count")),
+        )
+        state = kernel.aggregate(
+            [
+                {"subject": "Физика", "teacher_name": "Петров", "grade": 3.0},
+                {"subject": "Химия", "teacher_name": "Петров", "grade": 5.0},
+                {"subject": "Физика", "teacher_name": "Петров", "grade": 4.0},
+            ]
+        )
+
+        assert kernel.headers == ["", "subject", "teacher_name", "grade", "count_grade"]
+        assert kernel.finalize(state) == [
+            (1, "Химия", "Петров", 5.0, 1),
+            (2, "Физика", "Петров", 3.5, 2),
+        ]
+        assert kernel.finalize(state, bottom=1) == [(2, "Физика", "Петров", 3.5, 2)]
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_sketches_columnar_matches_rows(self, backend):
+        """Тест совпадения скетчей колоночной свертки и построчного подсчета"""
+        records = make_records(3000)
+        kernel = GroupBy(
+            ("subject",),
+            (
+                Aggregate("grade", "median"),
+                Aggregate("grade", "quantile", fraction=0.9),
+                Aggregate("student_name", "distinct"),
+            ),
+            backend=backend,
+            sketch_size=16,
+        )
+
+        by_rows = kernel.aggregate(records)
+
+        assert kernel.aggregate(ColumnarRecords.from_records(records)) == by_rows
+        assert kernel.headers == ["", "subject", "median_grade", "p90_grade"] + [
+            "distinct_student_name"
+        ]
+        for _, subject, median, p90, students in kernel.finalize(by_rows):
+            names = {r["student_name"] for r in records if r["subject"] == subject}
+            assert students == len(names)
+            assert 2.0 <= median <= p90 <= 5.0
+
+    def test_sketch_state_survives_json(self):
+        """Тест сохранения состояния со скетчами в JSON для кэша"""
+        kernel = GroupBy(
+            ("subject", "teacher_name"),
+            (Aggregate("grade", "median"), Aggregate("student_name", "distinct")),
+        )
+        state = kernel.aggregate(make_records(200))
+
+        data = json.loads(json.dumps(kernel.dump_state(state)))
+
+        assert kernel.load_state(data) == state
+
+    def test_merge_does_not_share_sketches(self):
+        """Тест независимости скетчей общего состояния от частичного"""
+        kernel = GroupBy(("subject",), (Aggregate("grade", "median"),))
+        partial = kernel.aggregate(make_records(50))
+        expected = kernel.dump_state(partial)
+
+        state = kernel.merge({}, partial)
+        kernel.merge(state, kernel.aggregate(make_records(50, seed=2)))
+
+        assert kernel.dump_state(partial) == expected
+
+    def test_unknown_function(self):
+        """Тест ошибки при неизвестной агрегатной функции"""
+        with pytest.raises(ValueError, match="Неизвестная агрегатная функция"):
+            GroupBy(("subject",), (Aggregate("grade", "mode"),))
+
+
+class TestDeclarativeReport:
+
+    def test_declared_report(self):
+        """Тест отчета, объявленного полями группировки и функциями"""
+
+        class SubjectRangeReport(BaseReport):
+            name = "subject-range"
+            group_by = ("subject",)
+            aggregates = (Aggregate("grade", "max"), Aggregate("grade", "min"))
+
+        report = SubjectRangeReport()
+        state = report.aggregate(make_records(100))
+
+        assert report.HEADERS == ["", "subject", "max_grade", "min_grade"]
+        assert report.finalize(state) == report.kernel.finalize(state)
+
+    def test_report_without_declaration(self):
+        """Тест ошибки для отчета без группировки и своих методов"""
+
+        class EmptyReport(BaseReport):
+            name = "empty"
+
+        with pytest.raises(NotImplementedError):
+            EmptyReport().aggregate([{"grade": 5.0}])
@@ -1,9 +1,25 @@
 import pytest
 import tempfile
 import os
+import random
 from unittest.mock import patch, MagicMock
 import sys
 import main
+from processing.cache import AggregateCache
+from reports.engine import ScanEngine
+from reports.student_performance_report import StudentPerformanceReport
+from reports.subject_performance_report import SubjectPerformanceReport
+
+
+PARSE_ARGUMENTS = main.parse_arguments
+
+
+def make_args(files, *extra):
+    """Аргументы командной строки со значениями по умолчанию"""
+    argv = ["main.py", "--files", *files, "--report", "student-performance"]
+    argv += ["--no-cache", "--output-format", "grid", *extra]
+    with patch.object(sys, "argv", argv):
+        return PARSE_ARGUMENTS()
 
 
 class TestMain:
@@ -22,7 +38,7 @@ class TestMain:
             args = main.parse_arguments()
 
             assert args.files == ["file1.csv", "file2.csv"]
-            assert args.report == "student-performance"
+            assert args.report == ["student-performance"]
 
     def test_parse_arguments_missing_files(self):
         """Тест отсутствующего параметра --files"""
@@ -48,20 +64,17 @@ class TestMain:
             with pytest.raises(SystemExit):
                 main.parse_arguments()
 
-    @patch("main.StudentPerformanceReport")
     @patch("main.CSVReader")
     @patch("main.parse_arguments")
-    def test_main_successful_execution(
-        self, mock_parse_args, mock_csv_reader, mock_report
-    ):
+    def test_main_successful_execution(self, mock_parse_args, mock_csv_reader):
         """Тест успешного выполнения программы"""
-        mock_args = MagicMock()
-        mock_args.files = ["file1.csv"]
-        mock_args.report = "student-performance"
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = make_args(["file1.csv"])
 
         mock_reader_instance = MagicMock()
-        mock_reader_instance.read_file.return_value = [
+        mock_reader_instance.use_sidecar = False
+        mock_reader_instance.record_filter = None
+        mock_reader_instance.create_validation.return_value = None
+        mock_reader_instance.iter_records.return_value = [
             {
                 "student_name": "Тест",
                 "subject": "Математика",
@@ -72,25 +85,34 @@ class TestMain:
         ]
         mock_csv_reader.return_value = mock_reader_instance
 
-        mock_report_instance = MagicMock()
+        mock_report = MagicMock()
+        mock_report_instance = MagicMock(wraps=StudentPerformanceReport())
+        mock_report_instance.HEADERS = StudentPerformanceReport.HEADERS
         mock_report.return_value = mock_report_instance
 
-        main.main()
+        with patch.dict(main.REPORTS, {"student-performance": mock_report}):
+            main.main()
 
-        mock_reader_instance.read_file.assert_called_once_with("file1.csv")
-        mock_report_instance.generate_report.assert_called_once()
+        mock_reader_instance.iter_records.assert_called_once_with(
+            "file1.csv", None, None
+        )
+        mock_report_instance.render.assert_called_once()
+        args, kwargs = mock_report_instance.render.call_args
+        assert args[0] == {"Тест": [1, 5.0]}
 
     @patch("main.CSVReader")
     @patch("main.parse_arguments")
     def test_main_file_not_found(self, mock_parse_args, mock_csv_reader):
         """Тест обработки ошибки несуществующего файла"""
-        mock_args = MagicMock()
-        mock_args.files = ["nonexistent.csv"]
-        mock_args.report = "student-performance"
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = make_args(["nonexistent.csv"])
 
         mock_reader_instance = MagicMock()
-        mock_reader_instance.read_file.side_effect = FileNotFoundError("Файл не найден")
+        mock_reader_instance.use_sidecar = False
+        mock_reader_instance.record_filter = None
+        mock_reader_instance.create_validation.return_value = None
+        mock_reader_instance.iter_records.side_effect = FileNotFoundError(
+            "Файл не найден"
+        )
         mock_csv_reader.return_value = mock_reader_instance
 
         with pytest.raises(SystemExit) as exc_info:
@@ -102,13 +124,13 @@ class TestMain:
     @patch("main.parse_arguments")
     def test_main_multiple_files(self, mock_parse_args, mock_csv_reader):
         """Тест обработки нескольких файлов"""
-        mock_args = MagicMock()
-        mock_args.files = ["file1.csv", "file2.csv"]
-        mock_args.report = "student-performance"
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = make_args(["file1.csv", "file2.csv"])
 
         mock_reader_instance = MagicMock()
-        mock_reader_instance.read_file.side_effect = [
+        mock_reader_instance.use_sidecar = False
+        mock_reader_instance.record_filter = None
+        mock_reader_instance.create_validation.return_value = None
+        mock_reader_instance.iter_records.side_effect = [
             [
                 {
                     "student_name": "Студент1",
@@ -130,20 +152,22 @@ class TestMain:
         ]
         mock_csv_reader.return_value = mock_reader_instance
 
-        with patch("main.StudentPerformanceReport") as mock_report:
-            mock_report_instance = MagicMock()
-            mock_report.return_value = mock_report_instance
+        mock_report = MagicMock()
+        mock_report_instance = MagicMock(wraps=StudentPerformanceReport())
+        mock_report_instance.HEADERS = StudentPerformanceReport.HEADERS
+        mock_report.return_value = mock_report_instance
 
+        with patch.dict(main.REPORTS, {"student-performance": mock_report}):
             main.main()
 
-            assert mock_reader_instance.read_file.call_count == 2
-            mock_reader_instance.read_file.assert_any_call("file1.csv")
-            mock_reader_instance.read_file.assert_any_call("file2.csv")
-
-            mock_report_instance.generate_report.assert_called_once()
-            args, kwargs = mock_report_instance.generate_report.call_args
+            mock_report_instance.render.assert_called_once()
+            args, kwargs = mock_report_instance.render.call_args
             assert len(args[0]) == 2
 
+            assert mock_reader_instance.iter_records.call_count == 2
+            mock_reader_instance.iter_records.assert_any_call("file1.csv", None, None)
+            mock_reader_instance.iter_records.assert_any_call("file2.csv", None, None)
+
     @patch("main.parse_arguments")
     def test_main_keyboard_interrupt(self, mock_parse_args):
         """Тест обработки прерывания программы пользователем"""
@@ -158,16 +182,471 @@ class TestMain:
     @patch("main.parse_arguments")
     def test_main_empty_records(self, mock_parse_args, mock_csv_reader):
         """Тест обработки файлов без данных"""
-        mock_args = MagicMock()
-        mock_args.files = ["empty.csv"]
-        mock_args.report = "student-performance"
-        mock_parse_args.return_value = mock_args
+        mock_parse_args.return_value = make_args(["empty.csv"])
 
         mock_reader_instance = MagicMock()
-        mock_reader_instance.read_file.return_value = []
+        mock_reader_instance.use_sidecar = False
+        mock_reader_instance.record_filter = None
+        mock_reader_instance.create_validation.return_value = None
+        mock_reader_instance.iter_records.return_value = []
         mock_csv_reader.return_value = mock_reader_instance
 
         with pytest.raises(SystemExit) as exc_info:
             main.main()
 
         assert exc_info.value.code == 1
+
+    @patch("main.CSVReader")
+    @patch("main.parse_arguments")
+    def test_main_error_in_second_file(self, mock_parse_args, mock_csv_reader, capsys):
+        """Тест ошибки во втором файле при потоковой обработке"""
+        mock_parse_args.return_value = make_args(["file1.csv", "broken.csv"])
+
+        def iter_records(file_path, validation=None, dates=None):
+            if file_path == "broken.csv":
+                raise ValueError("Ошибка в строке 3: Некорректная оценка: abc")
+            yield {
+                "student_name": "Студент1",
+                "subject": "Математика",
+                "teacher_name": "Учитель1",
+                "date": "2023-10-01",
+                "grade": 5.0,
+            }
+
+        mock_reader_instance = MagicMock()
+        mock_reader_instance.use_sidecar = False
+        mock_reader_instance.record_filter = None
+        mock_reader_instance.create_validation.return_value = None
+        mock_reader_instance.iter_records.side_effect = iter_records
+        mock_csv_reader.return_value = mock_reader_instance
+
+        with pytest.raises(SystemExit) as exc_info:
+            main.main()
+
+        assert exc_info.value.code == 1
+        captured = capsys.readouterr()
+        assert "broken.csv" in captured.err
+        assert "Ошибка в строке 3" in captured.err
+
+    def test_parse_arguments_workers(self):
+        """Тест параметра --workers"""
+        test_args = ["--files", "f.csv", "--report", "student-performance"]
+
+        with patch.object(sys, "argv", ["main.py"] + test_args):
+            assert main.parse_arguments().workers == 1
+
+        with patch.object(sys, "argv", ["main.py"] + test_args + ["--workers", "4"]):
+            assert main.parse_arguments().workers == 4
+
+        with patch.object(sys, "argv", ["main.py"] + test_args + ["--workers", "0"]):
+            with pytest.raises(SystemExit):
+                main.parse_arguments()
+
+    def test_collect_stats_workers_match_serial(self, tmp_path):
+        """Тест совпадения результатов параллельного и последовательного чтения"""
+        paths = []
+        for i, rows in enumerate(
+            [
+                [
+                    "Иванов,Математика,Петров,2023-10-01,5",
+                    "Сидоров,Физика,Петров,2023-10-02,3.3",
+                ],
+                [
+                    "Иванов,Физика,Петров,2023-10-03,4.1",
+                    "Петров,Химия,Иванова,2023-10-04,2",
+                ],
+            ]
+        ):
+            path = tmp_path / f"students{i}.csv"
+            path.write_text(
+                "student_name,subject,teacher_name,date,grade\n" + "\n".join(rows),
+                encoding="utf-8",
+            )
+            paths.append(str(path))
+
+        engine = ScanEngine([StudentPerformanceReport(), SubjectPerformanceReport()])
+        serial = main.collect_stats(engine, paths, workers=1)
+        parallel = main.collect_stats(engine, paths, workers=2)
+
+        assert parallel == serial
+        assert serial[0]["Иванов"] == [2, 5.0 + 4.1]
+        assert serial[1]["Физика"] == [2, 3.3 + 4.1]
+
+    def test_collect_stats_workers_error(self, tmp_path, capsys):
+        """Тест сообщения об ошибке с именем файла и строкой в параллельном режиме"""
+        good = tmp_path / "good.csv"
+        good.write_text(
+            "student_name,subject,teacher_name,date,grade\nА,Б,В,2023-10-01,5",
+            encoding="utf-8",
+        )
+        bad = tmp_path / "bad.csv"
+        bad.write_text(
+            "student_name,subject,teacher_name,date,grade\nА,Б,В,2023-10-01,5\nА,Б,В,2023-10-01,9",
+            encoding="utf-8",
+        )
+
+        with pytest.raises(SystemExit) as exc_info:
+            main.collect_stats(
+                ScanEngine([StudentPerformanceReport()]),
+                [str(good), str(bad)],
+                workers=2,
+            )
+
+        assert exc_info.value.code == 1
+        captured = capsys.readouterr()
+        assert f"Ошибка при чтении файла {bad}: Ошибка в строке 3" in captured.err
+
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"max_errors": 3}, {"max_errors": 100}, {"skip_invalid": True}],
+    )
+    def test_collect_stats_chunks_match_serial(self, tmp_path, capsys, options):
+        """Тест разбора одного файла по частям: результат и номера строк ошибок"""
+        rows = [
+            f"Студент {i % 13},Предмет {i % 3},Учитель,2023-10-01,{1 + i % 40 / 10}"
+            for i in range(300)
+        ]
+        for i in (40, 170, 171, 260):
+            rows[i] = f"Студент {i},Предмет,Учитель,2023-10-01,abc"
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n" + "\n".join(rows),
+            encoding="utf-8",
+        )
+        engine = ScanEngine([StudentPerformanceReport(), SubjectPerformanceReport()])
+
+        def collect(workers):
+            csv_reader = main.CSVReader(chunk_bytes=500, **options)
+            try:
+                result = main.collect_stats(
+                    engine, [str(path)], workers, None, csv_reader
+                )
+            except SystemExit:
+                result = None
+            return result, capsys.readouterr().err
+
+        serial, serial_err = collect(1)
+        chunked, chunked_err = collect(2)
+
+        # При остановке на max_errors число проверенных строк зависит от
+        # деления на блоки, поэтому сравниваются ошибки
+        assert chunked_err.splitlines()[1:] == serial_err.splitlines()[1:]
+        assert "Ошибка в строке 42" in serial_err
+        assert chunked == serial
+
+    def test_collect_stats_chunks_bit_identical(self, tmp_path):
+        """Тест: суммы по частям файла не зависят от количества процессов"""
+        rng = random.Random(3)
+        rows = [
+            f"Студент {rng.randrange(7)},Предмет {rng.randrange(3)},Учитель,"
+            f"2023-10-01,{rng.uniform(1, 5)!r}"
+            for _ in range(2000)
+        ]
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n" + "\n".join(rows),
+            encoding="utf-8",
+        )
+        engine = ScanEngine([StudentPerformanceReport(), SubjectPerformanceReport()])
+
+        csv_reader = main.CSVReader(chunk_bytes=700)
+
+        serial = main.collect_stats(engine, [str(path)], 1, None, csv_reader)
+        chunked = main.collect_stats(engine, [str(path)], 3, None, csv_reader)
+
+        assert chunked == serial
+
+    def test_submit_files_bounds_pending(self, tmp_path):
+        """Тест: в пуле не больше max_pending задач, диапазоны возвращают состояния"""
+        from concurrent.futures import Future
+        from processing.parallel import submit_files
+
+        rows = [
+            f"Студент {i % 7},Предмет,Учитель,2023-10-01,{1 + i % 5}"
+            for i in range(300)
+        ]
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n" + "\n".join(rows),
+            encoding="utf-8",
+        )
+        engine = ScanEngine([StudentPerformanceReport()])
+        csv_reader = main.CSVReader(chunk_bytes=500)
+        pending = []
+        results = []
+
+        class Executor:
+            def submit(self, fn, *args):
+                assert len(pending) <= 2
+                result = fn(*args)
+                results.append(result)
+                future = Future()
+                future.set_result(result)
+                pending.append(future)
+                original = future.result
+
+                def result_once(*_):
+                    pending.remove(future)
+                    return original()
+
+                future.result = result_once
+                return future
+
+        stats = [
+            wait()
+            for _, wait in submit_files(
+                Executor(), engine, csv_reader, [str(path)] * 2, 2
+            )
+        ]
+
+        assert len(results) > 4
+        assert all(isinstance(result[0], list) for result in results)
+        assert stats[0] == stats[1]
+        assert stats[0][0] == main.collect_stats(
+            engine, [str(path)], 1, None, csv_reader
+        )
+
+    def test_collect_stats_chunks_quoted_newlines(self, tmp_path):
+        """Тест чтения целиком, если граница части попала внутрь кавычек"""
+        rows = [
+            f'"Студент\n{i % 5}",Предмет,Учитель,2023-10-01,{1 + i % 5}'
+            for i in range(100)
+        ]
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n" + "\n".join(rows),
+            encoding="utf-8",
+        )
+        engine = ScanEngine([StudentPerformanceReport()])
+        csv_reader = main.CSVReader(chunk_bytes=300)
+
+        serial = main.collect_stats(engine, [str(path)], 1, None, csv_reader)
+        chunked = main.collect_stats(engine, [str(path)], 2, None, csv_reader)
+
+        assert chunked == serial
+        assert serial[0]["Студент\n0"] == [20, 20.0]
+
+    @pytest.mark.parametrize("csv_engine", ["csv", "mmap"])
+    def test_collect_stats_chunks_boundary_in_quotes(self, tmp_path, csv_engine):
+        """Тест: граница части внутри кавычек не дает ошибки обрезанной строки"""
+        rows = [
+            (f'"Студент\n{i}"' if i % 50 == 0 else f"Студент {i % 9}")
+            + f",Предмет,Учитель,2023-10-01,{1 + i % 40 / 10}"
+            for i in range(3000)
+        ]
+        text = "student_name,subject,teacher_name,date,grade\n" + "\n".join(rows)
+        path = tmp_path / "students.csv"
+        path.write_text(text, encoding="utf-8")
+        engine = ScanEngine([StudentPerformanceReport()])
+        csv_reader = main.CSVReader(chunk_bytes=4100, engine=csv_engine)
+        # Хотя бы одна граница части попадает на перевод строки в кавычках
+        ranges = csv_reader.split_ranges(str(path), 4100)
+        data = path.read_bytes()
+        assert any(data[: part.end].count(b'"') % 2 for part in ranges)
+
+        serial = main.collect_stats(engine, [str(path)], 1, None, csv_reader)
+        chunked = main.collect_stats(engine, [str(path)], 2, None, csv_reader)
+
+        assert chunked == serial
+        assert serial[0]["Студент\n50"] == [1, 2.0]
+
+    def test_collect_stats_uses_cache(self, tmp_path):
+        """Тест повторного запуска: неизмененные файлы не разбираются"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\nА,Б,В,2023-10-01,5",
+            encoding="utf-8",
+        )
+        cache = AggregateCache(str(tmp_path / "cache"), "student-performance")
+        engine = ScanEngine([StudentPerformanceReport()])
+
+        first = main.collect_stats(engine, [str(path)], cache=cache)
+
+        with patch("main.CSVReader") as mock_csv_reader:
+            second = main.collect_stats(engine, [str(path)], cache=cache)
+            mock_csv_reader.assert_not_called()
+
+        assert first == second == [{"А": [1, 5.0]}]
+
+    def test_collect_stats_evicts_once(self, tmp_path):
+        """Тест: кэш вытесняется один раз за запуск, а не после каждой записи"""
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"{i}.csv"
+            path.write_text(
+                "student_name,subject,teacher_name,date,grade\nА,Б,В,2023-10-01,5",
+                encoding="utf-8",
+            )
+            paths.append(str(path))
+        cache = AggregateCache(str(tmp_path / "cache"), "student-performance")
+        engine = ScanEngine([StudentPerformanceReport()])
+
+        with patch.object(cache, "evict", wraps=cache.evict) as evict:
+            main.collect_stats(engine, paths, cache=cache)
+            main.collect_stats(engine, paths, cache=cache)
+
+        assert evict.call_count == 1
+
+    def test_collect_stats_cache_file_changed_while_reading(self, tmp_path):
+        """Тест: агрегат файла, дописанного во время чтения, не берется из кэша"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\nА,Б,В,2023-10-01,5\n",
+            encoding="utf-8",
+        )
+        cache = AggregateCache(str(tmp_path / "cache"), "student-performance")
+        engine = ScanEngine([StudentPerformanceReport()])
+        read_stats = main.read_stats
+
+        def appending(*args):
+            stats = read_stats(*args)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("А,Б,В,2023-10-02,3\n")
+            return stats
+
+        with patch("main.read_stats", appending):
+            first = main.collect_stats(engine, [str(path)], cache=cache)
+        second = main.collect_stats(engine, [str(path)], cache=cache)
+
+        assert first == [{"А": [1, 5.0]}]
+        assert second == [{"А": [2, 8.0]}]
+
+    def test_collect_stats_skip_invalid(self, tmp_path, capsys):
+        """Тест пропуска некорректных строк с выводом предупреждения"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n"
+            "А,Б,В,2023-10-01,5\nА,Б,В,2023-10-01,abc\nА,Б,В,2023-10-01,4",
+            encoding="utf-8",
+        )
+
+        for workers in (1, 2):
+            stats = main.collect_stats(
+                ScanEngine([StudentPerformanceReport()]),
+                [str(path)],
+                workers=workers,
+                csv_reader=main.CSVReader(skip_invalid=True),
+            )
+
+            assert stats == [{"А": [2, 9.0]}]
+            captured = capsys.readouterr()
+            assert f"в файле {path} пропущены строки" in captured.err
+            assert "Ошибка в строке 3: Некорректная оценка: abc" in captured.err
+
+    def test_main_output_file(self, tmp_path):
+        """Тест вывода отчета в файл в выбранном формате"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\nА,Б,В,2023-10-01,5",
+            encoding="utf-8",
+        )
+        output = tmp_path / "report.tsv"
+        test_args = ["--files", str(path), "--report", "student-performance"]
+        test_args += ["--no-cache", "--output-format", "tsv", "--output", str(output)]
+
+        with patch.object(sys, "argv", ["main.py"] + test_args):
+            main.main()
+
+        assert output.read_text(encoding="utf-8") == (
+            "rank\tstudent_name\tgrade\n1\tА\t5.0\n"
+        )
+
+    def test_parse_arguments_top_bottom(self):
+        """Тест параметров --top и --bottom"""
+        test_args = ["--files", "f.csv", "--report", "student-performance"]
+
+        with patch.object(sys, "argv", ["main.py"] + test_args + ["--top", "3"]):
+            args = main.parse_arguments()
+            assert args.top == 3
+            assert args.bottom is None
+
+        for extra in (["--top", "1", "--bottom", "1"], ["--bottom", "0"]):
+            with patch.object(sys, "argv", ["main.py"] + test_args + extra):
+                with pytest.raises(SystemExit):
+                    main.parse_arguments()
+
+    def test_main_several_reports_single_pass(self, tmp_path):
+        """Тест формирования нескольких отчетов за одно чтение файлов"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n"
+            "А,Математика,Петров,2023-10-01,5\nБ,Физика,Петров,2023-10-01,3",
+            encoding="utf-8",
+        )
+        output = tmp_path / "report.csv"
+        test_args = ["--files", str(path), "--no-cache", "--output", str(output)]
+        test_args += ["--report", "student-performance", "subject-performance"]
+        test_args += ["teacher-performance"]
+
+        with patch.object(sys, "argv", ["main.py"] + test_args):
+            with patch.object(
+                main.CSVReader, "iter_records", wraps=main.CSVReader().iter_records
+            ) as mock_iter_records:
+                main.main()
+
+        assert mock_iter_records.call_count == 1
+        assert (tmp_path / "report.student-performance.csv").read_text(
+            encoding="utf-8"
+        ).splitlines() == ["rank,student_name,grade", "1,А,5.0", "2,Б,3.0"]
+        assert (tmp_path / "report.subject-performance.csv").read_text(
+            encoding="utf-8"
+        ).splitlines() == ["rank,subject,grade", "1,Математика,5.0", "2,Физика,3.0"]
+        assert (tmp_path / "report.teacher-performance.csv").read_text(
+            encoding="utf-8"
+        ).splitlines() == ["rank,teacher_name,grade", "1,Петров,4.0"]
+
+    def test_main_sketch_reports(self, tmp_path, capsys):
+        """Тест отчетов с медианой и количеством различных студентов"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n"
+            "А,Математика,Петров,2023-10-01,5\nБ,Математика,Петров,2023-10-01,3\n"
+            "А,Физика,Петров,2023-10-02,4\nА,Математика,Смирнова,2023-10-03,4",
+            encoding="utf-8",
+        )
+        test_args = ["--files", str(path), "--no-cache", "--sketch-size", "16"]
+        test_args += ["--report", "subject-distribution", "teacher-students"]
+
+        with patch.object(sys, "argv", ["main.py"] + test_args):
+            main.main()
+
+        assert capsys.readouterr().out.splitlines() == [
+            "rank,subject,median,p25,p75,p90,grades",
+            "1,Математика,4.0,3.0,5.0,5.0,3",
+            "2,Физика,4.0,4.0,4.0,4.0,1",
+            "",
+            "rank,teacher_name,students,grade",
+            "1,Петров,2,4.0",
+            "2,Смирнова,1,4.0",
+        ]
+
+    def test_main_filters(self, tmp_path, capsys):
+        """Тест отбора оценок по предмету и датам"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n"
+            "А,Математика,Петров,2023-09-01,5\nБ,Математика,Петров,2023-10-01,3\n"
+            "А,Физика,Петров,2023-10-02,4\nА,Математика,Смирнова,2023-10-03,4",
+            encoding="utf-8",
+        )
+        test_args = ["--files", str(path), "--no-cache", "--report"]
+        test_args += ["student-performance", "--subject", "Математика"]
+        test_args += ["--date-from", "2023-10-01"]
+
+        with patch.object(sys, "argv", ["main.py"] + test_args):
+            main.main()
+
+        assert capsys.readouterr().out.splitlines() == [
+            "rank,student_name,grade",
+            "1,А,4.0",
+            "2,Б,3.0",
+        ]
+
+    def test_parse_arguments_invalid_date(self):
+        """Тест ошибки при дате не в формате ГГГГ-ММ-ДД"""
+        test_args = ["--files", "file.csv", "--report", "student-performance"]
+        test_args += ["--date-from", "01.10.2023"]
+
+        with patch.object(sys, "argv", ["main.py"] + test_args):
+            with pytest.raises(SystemExit):
+                main.parse_arguments()
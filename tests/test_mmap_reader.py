@@ -0,0 +1,217 @@
+import csv
+import glob
+import os
+import pytest
+from data.csv_reader import CSVReader
+from data.filters import RecordFilter
+from data.mmap_reader import MmapRowReader
+from data.validation import ValidationError
+from reports.engine import ScanEngine
+from reports.student_performance_report import StudentPerformanceReport
+from reports.teacher_students_report import TeacherStudentsReport
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = sorted(glob.glob(os.path.join(ROOT, "sampled_data", "*.csv")))
+HEADER = "student_name,subject,teacher_name,date,grade"
+ALL_FIELDS = HEADER.split(",")
+
+
+def dict_rows(path):
+    with open(path, encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class TestMmapRowReader:
+
+    def _write(self, tmp_path, content, newline="\n"):
+        path = tmp_path / "data.csv"
+        path.write_bytes(content.replace("\n", newline).encode("utf-8"))
+        return str(path)
+
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test_irregular_lines_match_dict_reader(self, tmp_path, newline):
+        """Тест строк с кавычками, пустых, коротких и длинных строк"""
+        path = self._write(
+            tmp_path,
+            HEADER + "\n"
+            "Иванов,Математика,Петров,2023-10-01,5\n"
+            "\n"
+            '"Сидоров, Петр",Физика,"Иван\nПетров",2023-10-02,4\n'
+            "Орлов,Химия,Петров\n"
+            "Орлов,Химия,Петров,2023-10-03,3,лишнее\n"
+            '"Яковлев",Химия,Петров,2023-10-04,"2"',
+            newline,
+        )
+
+        with MmapRowReader(path, ALL_FIELDS) as reader:
+            rows = list(reader)
+
+        assert rows == dict_rows(path)
+
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test_quotes_inside_unquoted_fields(self, tmp_path, newline):
+        """Тест кавычек внутри полей без кавычек и удвоенных кавычек"""
+        path = self._write(
+            tmp_path,
+            HEADER + "\n"
+            'O"Brien,Math,T,2023-01-01,5\n'
+            'Иванов,Физика,Петров "мл.",2023-10-01,4\n'
+            '"Сидоров ""Петр""\nмл.",Физика,"Иван""\n""Петров",2023-10-02,3\n'
+            '"Орлов"мл,Химия,Петров,2023-10-03,2\n'
+            'Яковлев,Химия,Петров,2023-10-04,"4"',
+            newline,
+        )
+
+        with MmapRowReader(path, ALL_FIELDS) as reader:
+            rows = list(reader)
+
+        assert rows == dict_rows(path)
+        assert rows[0]["student_name"] == 'O"Brien'
+
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test_ranges_match_whole_file(self, tmp_path, newline):
+        """Тест чтения по диапазонам байтов с границами внутри кавычек"""
+        rows = [
+            (f'"Студент\n{i}"' if i % 7 == 0 else f"Студент {i}")
+            + f",Предмет,Учитель,2023-10-01,{1 + i % 5}"
+            for i in range(60)
+        ]
+        path = self._write(tmp_path, HEADER + "\n" + "\n".join(rows), newline)
+        data = open(path, "rb").read()
+        ranges = CSVReader().split_ranges(path, 70)
+        assert any(data[: part.end].count(b'"') % 2 for part in ranges)
+
+        parts = []
+        start = ranges[0].start
+        for byte_range in ranges:
+            with MmapRowReader(path, ALL_FIELDS, start, byte_range.end) as reader:
+                if reader.count_quotes() % 2:
+                    # Граница внутри кавычек: диапазон продолжается
+                    continue
+                assert reader.count_quotes() == data[start : byte_range.end].count(b'"')
+                parts.extend(reader)
+            start = byte_range.end
+
+        assert parts == dict_rows(path)
+
+    def test_only_requested_fields_are_decoded(self, tmp_path):
+        """Тест декодирования только нужных полей"""
+        path = self._write(
+            tmp_path, HEADER + "\nИванов,Математика,Петров,2023-10-01,5\n"
+        )
+
+        with MmapRowReader(path, ["grade", "student_name"]) as reader:
+            assert reader.fieldnames == ALL_FIELDS
+            assert list(reader) == [{"student_name": "Иванов", "grade": "5"}]
+
+    def test_empty_file(self, tmp_path):
+        """Тест пустого файла"""
+        path = self._write(tmp_path, "")
+
+        with MmapRowReader(path, ALL_FIELDS) as reader:
+            assert reader.fieldnames == []
+            assert list(reader) == []
+
+    @pytest.mark.parametrize("path", FIXTURES)
+    def test_fixtures_match_dict_reader(self, path):
+        """Тест совпадения строк с csv.DictReader на файлах примеров"""
+        with MmapRowReader(path, ALL_FIELDS) as reader:
+            assert list(reader) == dict_rows(path)
+
+
+class TestMmapEngine:
+
+    def test_unknown_engine(self):
+        """Тест неизвестного способа разбора"""
+        with pytest.raises(ValueError, match="Неизвестный способ разбора"):
+            CSVReader(engine="pandas")
+
+    @pytest.mark.parametrize("path", FIXTURES)
+    def test_fixtures_match_csv_engine(self, path):
+        """Тест совпадения записей и отчетов с модулем csv"""
+        engine = ScanEngine([StudentPerformanceReport(), TeacherStudentsReport()])
+        mmap_reader = CSVReader(engine="mmap", fields=engine.fields)
+
+        records = mmap_reader.read_file(path)
+
+        assert records == [
+            {
+                "student_name": record["student_name"],
+                "teacher_name": record["teacher_name"],
+                "grade": record["grade"],
+            }
+            for record in CSVReader().read_file(path)
+        ]
+        assert engine.scan(records) == engine.scan(CSVReader().read_file(path))
+
+    def test_stray_quote_matches_csv_engine(self, tmp_path):
+        """Тест: кавычка внутри поля без кавычек разбирается как в модуле csv"""
+        path = tmp_path / "data.csv"
+        path.write_text(
+            HEADER + "\n"
+            'O"Brien,Math,T,2023-01-01,5\n'
+            "Иванов,Math,T,2023-01-02,4\n"
+            '"Петров\nмл.",Math,T,2023-01-03,3\n',
+            encoding="utf-8",
+        )
+        engine = ScanEngine([StudentPerformanceReport()])
+
+        records = CSVReader(engine="mmap").read_file(str(path))
+
+        assert records == CSVReader().read_file(str(path))
+        assert engine.scan(records) == [
+            {'O"Brien': [1, 5.0], "Иванов": [1, 4.0], "Петров\nмл.": [1, 3.0]}
+        ]
+
+    def test_validation_row_numbers(self, tmp_path):
+        """Тест номеров строк ошибок пакетной проверки"""
+        path = tmp_path / "data.csv"
+        path.write_text(
+            HEADER + "\n"
+            "Иванов,Математика,Петров,2023-10-01,5\n"
+            '"Сидоров",Физика,Петров,2023-10-02,abc\n'
+            ",Физика,Петров,2023-10-02,4\n"
+            "Орлов,Химия\n",
+            encoding="utf-8",
+        )
+
+        def errors(csv_reader):
+            validation = csv_reader.create_validation()
+            with pytest.raises(ValidationError):
+                list(csv_reader.iter_records(str(path), validation))
+            return validation.errors
+
+        assert errors(CSVReader(engine="mmap", max_errors=10)) == errors(
+            CSVReader(max_errors=10)
+        )
+
+    def test_unused_fields_are_not_validated(self, tmp_path):
+        """Тест: пустое поле, не нужное отчетам, не считается ошибкой"""
+        path = tmp_path / "data.csv"
+        path.write_text(HEADER + "\nИванов,,Петров,2023-10-01,5\n", encoding="utf-8")
+        csv_reader = CSVReader(engine="mmap", fields=["student_name", "grade"])
+
+        assert csv_reader.read_file(str(path)) == [
+            {"student_name": "Иванов", "grade": 5.0}
+        ]
+        with pytest.raises(ValueError, match="Поле subject не может быть пустым"):
+            CSVReader().read_file(str(path))
+
+    def test_filter_fields_are_decoded(self, tmp_path):
+        """Тест условий отбора по полям, которых нет в записях"""
+        path = tmp_path / "data.csv"
+        path.write_text(
+            HEADER + "\n"
+            "Иванов,Математика,Петров,2023-10-01,5\n"
+            "Сидоров,Физика,Петров,2023-10-02,4\n",
+            encoding="utf-8",
+        )
+        csv_reader = CSVReader(
+            engine="mmap",
+            fields=["student_name", "grade"],
+            record_filter=RecordFilter(subjects=["Физика"]),
+        )
+
+        assert csv_reader.read_file(str(path)) == [
+            {"student_name": "Сидоров", "grade": 4.0}
+        ]
@@ -0,0 +1,126 @@
+import json
+import time
+import pytest
+from data.csv_reader import CSVReader
+from processing.profiler import Profiler, get_profiler, use_profiler
+from reports.student_performance_report import StudentPerformanceReport
+
+
+class TestProfiler:
+
+    def test_nested_stage_time_is_exclusive(self):
+        """Тест учета времени вложенного этапа только в нем самом"""
+        profiler = Profiler()
+
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                time.sleep(0.05)
+
+        assert profiler.stages["inner"].seconds >= 0.05
+        assert profiler.stages["outer"].seconds < 0.05
+        assert profiler.stages["outer"].calls == 1
+
+    def test_timed_iter_excludes_nested_stage(self):
+        """Тест вычитания времени вложенного итератора"""
+        profiler = Profiler()
+
+        def slow():
+            for i in range(3):
+                time.sleep(0.01)
+                yield i
+
+        inner = profiler.timed_iter("io", slow())
+        outer = profiler.timed_iter("parse", inner, exclude="io")
+
+        with profiler.stage("consume"):
+            assert list(outer) == [0, 1, 2]
+
+        assert profiler.stages["io"].seconds >= 0.03
+        assert profiler.stages["io"].rows == 3
+        assert profiler.stages["parse"].rows == 3
+        assert profiler.stages["parse"].seconds < 0.01
+        assert profiler.stages["consume"].seconds < 0.01
+
+    def test_disabled_profiler_records_nothing(self):
+        """Тест отключенного сборщика"""
+        profiler = Profiler(enabled=False)
+
+        with profiler.stage("stage") as stats:
+            stats.rows += 1
+
+        assert profiler.stages == {}
+
+    def test_use_profiler(self):
+        """Тест установки и восстановления текущего сборщика"""
+        profiler = Profiler()
+        previous = get_profiler()
+
+        with use_profiler(profiler):
+            assert get_profiler() is profiler
+
+        assert get_profiler() is previous
+        assert not previous.enabled
+
+    def test_trace_memory(self):
+        """Тест учета пикового выделения памяти"""
+        profiler = Profiler(trace_memory=True)
+
+        with use_profiler(profiler):
+            with profiler.stage("alloc"):
+                data = bytearray(5 * 1024 * 1024)
+                del data
+
+        assert profiler.stages["alloc"].peak_bytes >= 5 * 1024 * 1024
+
+    def test_reader_and_report_stages(self, tmp_path):
+        """Тест показателей этапов чтения файла и формирования отчета"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n"
+            "А,Б,В,2023-10-01,5\nГ,Б,В,2023-10-01,4\nА,Б,В,2023-10-01,3",
+            encoding="utf-8",
+        )
+        profiler = Profiler()
+        report = StudentPerformanceReport()
+
+        with use_profiler(profiler):
+            report.render(report.aggregate(CSVReader().iter_records(str(path))))
+
+        stages = profiler.to_dict()
+        assert stages["file_io"]["bytes_read"] == path.stat().st_size
+        assert stages["process_row"]["rows"] == 3
+        assert stages["aggregate"]["distinct_keys"] == 2
+        assert stages["sort"]["rows"] == 2
+        assert stages["render"]["calls"] == 1
+        assert "csv_tokenize" in profiler.summary()
+
+    @pytest.mark.parametrize("engine", ["csv", "mmap"])
+    def test_read_stage_rows(self, tmp_path, engine):
+        """Тест количества строк в этапах чтения файла и токенизации"""
+        path = tmp_path / "students.csv"
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n"
+            + "А,Б,В,2023-10-01,5\n" * 4,
+            encoding="utf-8",
+        )
+        profiler = Profiler()
+
+        with use_profiler(profiler):
+            records = list(CSVReader(engine=engine).iter_records(str(path)))
+
+        assert len(records) == 4
+        assert profiler.stages["csv_tokenize"].rows == 4
+        if engine == "csv":
+            # Строки файла вместе с заголовком
+            assert profiler.stages["file_io"].rows == 5
+
+    def test_write_json(self, tmp_path):
+        """Тест сохранения показателей в JSON"""
+        profiler = Profiler()
+        with profiler.stage("stage") as stats:
+            stats.rows = 5
+
+        profiler.write_json(str(tmp_path / "profile.json"))
+
+        data = json.loads((tmp_path / "profile.json").read_text(encoding="utf-8"))
+        assert data["stages"]["stage"]["rows"] == 5
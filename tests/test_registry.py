@@ -0,0 +1,105 @@
+import os
+import re
+import subprocess
+import sys
+import pytest
+import main
+from reports.base_report import BaseReport
+from reports.registry import REPORT_CLASSES, ReportRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Предельное суммарное время импорта main (мкс, лучший из нескольких запусков)
+IMPORT_TIME_BUDGET_US = 40_000
+
+# Модули, которые не должны загружаться при импорте main
+LAZY_MODULES = [
+    "numpy",
+    "tabulate",
+    "asyncio",
+    "concurrent.futures",
+    "hashlib",
+    "pickle",
+    "random",
+    "shutil",
+    "socket",
+    "tempfile",
+    "tracemalloc",
+    "data.sampling",
+    "data.student_index",
+    "processing.cache",
+    "processing.checkpoint",
+    "processing.dedupe",
+    "processing.protocol",
+    "processing.server",
+    "processing.shards",
+    "processing.watch",
+    "reports.sketches",
+    "reports.spill",
+    *("reports" + path.partition(":")[0] for path in REPORT_CLASSES.values()),
+]
+
+
+def run_python(*args):
+    """Запускает отдельный интерпретатор в корне проекта"""
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+class TestReportRegistry:
+
+    def test_names_match_classes(self):
+        """Тест: название каждого отчета совпадает с атрибутом name класса"""
+        for name in REPORT_CLASSES:
+            report = main.REPORTS[name]
+            assert issubclass(report, BaseReport)
+            assert report.name == name
+
+    def test_loads_on_first_access(self):
+        """Тест: модуль отчета импортируется только при обращении к отчету"""
+        code = (
+            "import sys, main\n"
+            "module = 'reports.teacher_students_report'\n"
+            "print(module in sys.modules, 'teacher-students' in main.REPORTS)\n"
+            "main.REPORTS['teacher-students']\n"
+            "print(module in sys.modules)\n"
+        )
+
+        assert run_python("-c", code).stdout.split() == ["False", "True", "True"]
+
+    def test_unknown_report(self):
+        """Тест обращения к незарегистрированному отчету"""
+        registry = ReportRegistry(REPORT_CLASSES)
+
+        assert "unknown" not in registry
+        assert list(registry) == list(REPORT_CLASSES)
+        with pytest.raises(KeyError):
+            registry["unknown"]
+
+
+class TestStartup:
+
+    def test_heavy_modules_not_imported(self):
+        """Тест: импорт main не загружает отчеты и тяжелые зависимости"""
+        code = (
+            "import sys, main\n"
+            f"print([name for name in {LAZY_MODULES!r} if name in sys.modules])\n"
+        )
+
+        assert run_python("-c", code).stdout.strip() == "[]"
+
+    def test_import_time_budget(self):
+        """Тест: суммарное время импорта main (-X importtime) не выше бюджета"""
+        timings = []
+        for _ in range(3):
+            stderr = run_python("-X", "importtime", "-c", "import main").stderr
+            match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| main$", stderr, re.M)
+            assert match is not None
+            timings.append(int(match.group(1)))
+
+        assert min(timings) < IMPORT_TIME_BUDGET_US
@@ -0,0 +1,214 @@
+import sys
+from unittest.mock import patch
+import pytest
+import main
+from data.csv_reader import CSVReader
+from data.sampling import RowSampler
+from reports.groupby import Aggregate, GroupBy, estimate_aggregates
+
+HEADER = "student_name,subject,teacher_name,date,grade\n"
+
+
+def numbered(count, start=0):
+    return ((row_num, {"n": str(row_num)}) for row_num in range(start, start + count))
+
+
+def write_csv(path, rows, grades=(3, 4, 5)):
+    lines = [
+        f"Студент {i % 20},Предмет {i % 3},Учитель {i % 5},2023-10-01,"
+        f"{grades[i % len(grades)]}\n"
+        for i in range(rows)
+    ]
+    path.write_text(HEADER + "".join(lines), encoding="utf-8")
+    return str(path)
+
+
+def run_main(capsys, *argv):
+    with patch.object(sys, "argv", ["main.py", *argv]):
+        main.main()
+    return capsys.readouterr()
+
+
+class TestRowSampler:
+
+    def test_bernoulli_reproducible(self):
+        """Тест: одинаковый seed дает одинаковую выборку"""
+        first = RowSampler(rate=0.1, seed=5)
+        second = RowSampler(rate=0.1, seed=5)
+
+        rows = list(first.sample(numbered(10000), "a.csv"))
+
+        assert rows == list(second.sample(numbered(10000), "a.csv"))
+        assert 850 < len(rows) < 1150
+        assert (first.rows_seen, first.rows_sampled) == (10000, len(rows))
+
+    def test_bernoulli_across_files(self):
+        """Тест: выборка не зависит от деления строк на файлы"""
+        whole = RowSampler(rate=0.3, seed=1)
+        split = RowSampler(rate=0.3, seed=1)
+
+        expected = list(whole.sample(numbered(1000), "a.csv"))
+        rows = list(split.sample(numbered(400), "a.csv"))
+        rows += split.sample(numbered(600, 400), "b.csv")
+
+        assert rows == expected
+
+    def test_reservoir_size(self):
+        """Тест выборки фиксированного размера из нескольких файлов"""
+        sampler = RowSampler(size=50, seed=2)
+
+        assert list(sampler.sample(numbered(300), "a.csv")) == []
+        assert list(sampler.sample(numbered(700), "b.csv")) == []
+        files = sampler.drain()
+
+        assert [path for path, _ in files] == ["a.csv", "b.csv"]
+        assert sum(len(rows) for _, rows in files) == 50
+        for _, rows in files:
+            assert rows == sorted(rows, key=lambda item: item[0])
+        assert (sampler.rows_seen, sampler.rows_sampled) == (1000, 50)
+
+    def test_reservoir_uniform(self):
+        """Тест: каждая строка попадает в выборку с равной вероятностью"""
+        hits = [0] * 10
+        for seed in range(3000):
+            sampler = RowSampler(size=3, seed=seed)
+            list(sampler.sample(numbered(4), "a.csv"))
+            list(sampler.sample(numbered(6, 4), "b.csv"))
+            for _, rows in sampler.drain():
+                for row_num, _ in rows:
+                    hits[row_num] += 1
+
+        assert all(800 < count < 1000 for count in hits)
+
+    def test_small_input(self):
+        """Тест: строк меньше размера выборки - в выборку попадают все"""
+        sampler = RowSampler(size=10, seed=0)
+        list(sampler.sample(numbered(4), "a.csv"))
+
+        assert sampler.drain() == [("a.csv", list(numbered(4)))]
+
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"rate": 0.5, "size": 10}, {"rate": 0}, {"rate": 1.5}, {"size": 0}],
+    )
+    def test_invalid(self, options):
+        """Тест недопустимых параметров выборки"""
+        with pytest.raises(ValueError):
+            RowSampler(**options)
+
+
+class TestSampledReading:
+
+    def test_skipped_rows_not_processed(self, tmp_path):
+        """Тест: невыбранные строки не преобразуются"""
+        path = write_csv(tmp_path / "data.csv", 2000)
+        reader = CSVReader(sampler=RowSampler(rate=0.05, seed=3))
+        calls = []
+        process_row = reader._process_row
+
+        def counting(row, row_num):
+            calls.append(row_num)
+            return process_row(row, row_num)
+
+        with patch.object(reader, "_process_row", counting):
+            records = list(reader.iter_records(path))
+
+        assert len(calls) == len(records) == reader.sampler.rows_sampled
+        assert len(records) < 200
+
+    def test_sampled_rows_keep_file_numbers(self, tmp_path):
+        """Тест: ошибки строк выборки сообщаются с номерами строк файла"""
+        path = tmp_path / "data.csv"
+        path.write_text(HEADER + "Иванов,Физика,Петров,2023-10-01,9\n", "utf-8")
+        reader = CSVReader(sampler=RowSampler(size=5, seed=0))
+
+        assert list(reader.iter_records(str(path))) == []
+        [(_, rows)] = reader.sampler.drain()
+        with pytest.raises(ValueError, match="строке 2"):
+            list(reader.parse_sampled(rows))
+
+
+class TestEstimates:
+
+    def test_confidence_interval(self):
+        """Тест границ доверительного интервала среднего"""
+        kernel = GroupBy(
+            ("student_name",),
+            estimate_aggregates((Aggregate("grade", "mean", "grade"),), 0.95),
+        )
+        state = kernel.aggregate(
+            [{"student_name": "Иванов", "grade": grade} for grade in (2, 4, 4, 5, 5)]
+            + [{"student_name": "Петров", "grade": 3}]
+        )
+
+        # s = 1.2247, z = 1.96: 4.0 +- 1.07
+        assert kernel.headers[2:] == [
+            "grade",
+            "grade_ci_low",
+            "grade_ci_high",
+            "sample_size",
+        ]
+        assert kernel.finalize(state) == [
+            (1, "Иванов", 4.0, 2.9, 5.1, 5),
+            (2, "Петров", 3.0, None, None, 1),
+        ]
+
+    def test_without_means(self):
+        """Тест: отчет без средних не меняется"""
+        aggregates = (Aggregate("grade", "median"),)
+
+        assert estimate_aggregates(aggregates, 0.9) == aggregates
+
+    def test_invalid_confidence(self):
+        """Тест недопустимого уровня доверия"""
+        with pytest.raises(ValueError, match="Уровень доверия"):
+            GroupBy(("subject",), (Aggregate("grade", "ci_low", fraction=1),))
+
+
+class TestSampleOption:
+
+    def test_full_sample_matches_means(self, tmp_path, capsys):
+        """Тест: выборка всех строк дает те же средние, что и полный расчет"""
+        path = write_csv(tmp_path / "data.csv", 300)
+        common = ["--files", path, "--report", "subject-performance"]
+
+        expected = run_main(capsys, *common, "--no-cache").out.splitlines()
+        captured = run_main(capsys, *common, "--sample", "1", "--seed", "4")
+
+        lines = captured.out.splitlines()
+        assert lines[0] == "rank,subject,grade,grade_ci_low,grade_ci_high,sample_size"
+        assert [line.rsplit(",", 3)[0] for line in lines[1:]] == expected[1:]
+        assert [int(line.rsplit(",", 1)[1]) for line in lines[1:]] == [100] * 3
+        assert "Выборка: 300 из 300 строк (--seed 4)" in captured.err
+
+    @pytest.mark.parametrize("option", [["--sample", "0.2"], ["--sample-rows", "40"]])
+    def test_seed_reproducible(self, tmp_path, capsys, option):
+        """Тест: отчет по выборке повторяется при том же --seed"""
+        paths = [write_csv(tmp_path / f"data{i}.csv", 200 + i) for i in range(2)]
+        argv = ["--files", *paths, "--report", "student-performance", *option]
+
+        first = run_main(capsys, *argv, "--seed", "11")
+        second = run_main(capsys, *argv, "--seed", "11")
+
+        assert first.out == second.out
+        assert first.err == second.err
+
+    @pytest.mark.parametrize(
+        "extra",
+        [
+            ["--sample", "0"],
+            ["--sample", "0.5", "--sample-rows", "10"],
+            ["--sample-rows", "0"],
+            ["--sample", "0.5", "--workers", "2"],
+            ["--sample", "0.5", "--sidecar"],
+            ["--sample", "0.5", "--confidence", "1"],
+            ["--sample-rows", "10", "--memory-limit", "5"],
+            ["--seed", "1"],
+        ],
+    )
+    def test_invalid_options(self, extra):
+        """Тест недопустимых параметров выборки"""
+        argv = ["main.py", "--files", "data.csv", "--report", "student-performance"]
+        with patch.object(sys, "argv", argv + extra):
+            with pytest.raises(SystemExit):
+                main.parse_arguments()
@@ -0,0 +1,296 @@
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from unittest.mock import patch
+from urllib.request import urlopen
+import pytest
+from processing.protocol import decode_message, encode_message, request
+from processing.server import ReportQuery, ReportServer, start_servers
+import client
+import main
+
+CONTENT = (
+    "student_name,subject,teacher_name,date,grade\n"
+    "Иванов,Математика,Петров,2023-10-01,5\n"
+    "Сидоров,Физика,Орлов,2023-10-02,3\n"
+    "Иванов,Физика,Орлов,2023-10-03,4\n"
+    "Орлов,Математика,Петров,2023-10-04,4.5\n"
+)
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(CONTENT, encoding="utf-8")
+    return str(path)
+
+
+def cli_output(capsys, files, *extra):
+    """Вывод main.py с теми же параметрами"""
+    argv = ["main.py", "--files", *files, "--no-cache", *extra]
+    with patch.object(sys, "argv", argv):
+        main.run_report(main.parse_arguments())
+    return capsys.readouterr().out
+
+
+class TestReportServer:
+
+    def test_answer_matches_cli(self, data_file, capsys):
+        """Тест совпадения ответа сервера с выводом main.py"""
+        server = ReportServer([data_file, data_file], main.REPORTS)
+        query = ReportQuery.from_dict(
+            {
+                "report": ["student-performance", "teacher-students"],
+                "subject": "Физика",
+                "date_from": "2023-10-02",
+                "output_format": "grid",
+            },
+            main.REPORTS,
+        )
+
+        expected = cli_output(
+            capsys,
+            [data_file, data_file],
+            "--report",
+            "student-performance",
+            "teacher-students",
+            "--subject",
+            "Физика",
+            "--date-from",
+            "2023-10-02",
+            "--output-format",
+            "grid",
+        )
+
+        assert server.answer(query) == expected
+        assert server.answer(query) == expected
+
+    def test_changed_file_is_reloaded(self, data_file):
+        """Тест перечитывания изменившегося файла"""
+        server = ReportServer([data_file], main.REPORTS)
+        query = ReportQuery.from_dict({"report": "student-performance"}, main.REPORTS)
+        assert "Яковлев" not in server.answer(query)
+
+        with open(data_file, "a", encoding="utf-8") as f:
+            f.write("Яковлев,Химия,Петров,2023-10-05,5\n")
+
+        assert "Яковлев" in server.answer(query)
+
+    @pytest.mark.parametrize(
+        "data, message",
+        [
+            ({}, "Нужно указать report"),
+            ({"report": "unknown"}, "Неизвестный отчет"),
+            ({"report": "student-performance", "top": 0}, "top"),
+            ({"report": "student-performance", "date_to": "01.10.2023"}, "date_to"),
+            ({"report": "student-performance", "limit": 1}, "Неизвестные"),
+            ({"report": "student-performance", "top": 1, "bottom": 1}, "bottom"),
+        ],
+    )
+    def test_invalid_query(self, data_file, data, message):
+        """Тест ошибок в параметрах запроса"""
+        response = ReportServer([data_file], main.REPORTS).handle(data)
+
+        assert response["ok"] is False
+        assert message in response["error"]
+
+    def test_no_data(self, data_file):
+        """Тест ответа, когда ни одна строка не подошла"""
+        response = ReportServer([data_file], main.REPORTS).handle(
+            {"report": "student-performance", "subject": "История"}
+        )
+
+        assert response == {"ok": False, "error": "Не найдено данных для обработки"}
+
+    def test_unreadable_file(self, data_file):
+        """Тест: ошибка чтения файла возвращается в ответе"""
+        server = ReportServer([data_file], main.REPORTS)
+        with patch.object(
+            server, "answer", side_effect=PermissionError(13, "Отказано")
+        ):
+            response = server.handle({"report": "student-performance"})
+
+        assert response["ok"] is False
+        assert "Отказано" in response["error"]
+
+
+class TestServerConnections:
+
+    @pytest.fixture
+    def running(self, data_file, tmp_path):
+        """Сервер, принимающий соединения в отдельном потоке"""
+        socket_path = str(tmp_path / "reports.sock")
+        loop = asyncio.new_event_loop()
+        servers = loop.run_until_complete(
+            start_servers(
+                ReportServer([data_file], main.REPORTS), socket_path, http_port=0
+            )
+        )
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        port = servers[1].sockets[0].getsockname()[1]
+        yield socket_path, port, loop
+
+        async def shutdown():
+            for server in servers:
+                server.close()
+            tasks = asyncio.all_tasks() - {asyncio.current_task()}
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        os.unlink(socket_path)
+
+    def test_socket_request(self, running):
+        """Тест запроса через Unix сокет"""
+        response = request({"report": "student-performance", "top": 1}, running[0])
+
+        assert response == {
+            "ok": True,
+            "output": "rank,student_name,grade\n1,Иванов,4.5\n",
+        }
+
+    def test_http_request(self, running):
+        """Тест запроса по HTTP"""
+        url = (
+            f"http://127.0.0.1:{running[1]}/report"
+            "?report=student-performance&report=teacher-performance&top=1"
+        )
+        with urlopen(url, timeout=10) as response:
+            body = response.read().decode("utf-8")
+
+        assert body == (
+            "rank,student_name,grade\n1,Иванов,4.5\n\n"
+            "rank,teacher_name,grade\n1,Петров,4.8\n"
+        )
+
+    def test_client(self, running, capsys):
+        """Тест клиента командной строки"""
+        argv = ["client.py", "--socket", running[0], "--report", "student-performance"]
+        with patch.object(sys, "argv", argv + ["--bottom", "1"]):
+            client.main()
+
+        assert capsys.readouterr().out == "rank,student_name,grade\n3,Сидоров,3.0\n"
+
+    def test_client_error(self, running, capsys):
+        """Тест вывода ошибки сервера клиентом"""
+        argv = ["client.py", "--socket", running[0], "--report", "unknown"]
+        with patch.object(sys, "argv", argv):
+            with pytest.raises(SystemExit) as exc_info:
+                client.main()
+
+        assert exc_info.value.code == 1
+        assert "Неизвестный отчет: unknown" in capsys.readouterr().err
+
+    def test_reload_does_not_block_loop(self, running):
+        """Тест: разбор файла при запросе не блокирует цикл событий"""
+        started, release = threading.Event(), threading.Event()
+        load = ReportServer.load
+
+        def slow_load(server, file_path):
+            started.set()
+            release.wait(10)
+            return load(server, file_path)
+
+        responses = []
+        with patch.object(ReportServer, "load", slow_load):
+            thread = threading.Thread(
+                target=lambda: responses.append(
+                    request({"report": "student-performance"}, running[0])
+                )
+            )
+            thread.start()
+            try:
+                assert started.wait(10)
+                ping = asyncio.run_coroutine_threadsafe(asyncio.sleep(0), running[2])
+                ping.result(timeout=5)
+            finally:
+                release.set()
+                thread.join()
+
+        assert responses[0]["ok"]
+
+    def test_socket_in_use(self, running, data_file):
+        """Тест: сокет работающего сервера не удаляется при втором запуске"""
+        with pytest.raises(ValueError, match="уже используется"):
+            asyncio.run(
+                start_servers(ReportServer([data_file], main.REPORTS), running[0])
+            )
+
+        response = request({"report": "student-performance", "top": 1}, running[0])
+        assert response["ok"]
+
+    def test_socket_error_keeps_connection(self, running):
+        """Тест: после ошибки чтения файла соединение продолжает работать"""
+        with patch.object(
+            ReportServer, "answer", side_effect=[PermissionError(13, "Отказано"), "ок"]
+        ):
+            responses = []
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+                client_socket.connect(running[0])
+                stream = client_socket.makefile("rwb")
+                for _ in range(2):
+                    stream.write(encode_message({"report": "student-performance"}))
+                    stream.flush()
+                    responses.append(decode_message(stream.readline()))
+
+        assert responses[0]["ok"] is False
+        assert responses[1] == {"ok": True, "output": "ок"}
+
+
+class TestSocketPath:
+
+    def test_stale_socket_is_replaced(self, data_file, tmp_path):
+        """Тест: сокет завершившегося сервера заменяется новым"""
+        socket_path = str(tmp_path / "reports.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(socket_path)
+
+        async def start():
+            servers = await start_servers(
+                ReportServer([data_file], main.REPORTS), socket_path
+            )
+            for server in servers:
+                server.close()
+                await server.wait_closed()
+
+        asyncio.run(start())
+
+    def test_not_a_socket(self, data_file, tmp_path):
+        """Тест: файл, который не является сокетом, не удаляется"""
+        path = tmp_path / "reports.sock"
+        path.write_text("данные", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="не является сокетом"):
+            asyncio.run(
+                start_servers(ReportServer([data_file], main.REPORTS), str(path))
+            )
+
+        assert path.read_text(encoding="utf-8") == "данные"
+
+    def test_sigterm_removes_socket(self, data_file, tmp_path):
+        """Тест: после SIGTERM сервер завершается и удаляет сокет"""
+        socket_path = str(tmp_path / "reports.sock")
+        argv = [sys.executable, main.__file__, "--files", data_file]
+        argv += ["--serve", "--socket", socket_path]
+        process = subprocess.Popen(argv, stderr=subprocess.PIPE, text=True)
+        try:
+            assert "Сервер отчетов запущен" in process.stderr.readline()
+            assert os.path.exists(socket_path)
+
+            process.send_signal(signal.SIGTERM)
+
+            assert process.wait(timeout=10) == 0
+        finally:
+            process.kill()
+            process.stderr.close()
+
+        assert not os.path.exists(socket_path)
@@ -0,0 +1,131 @@
+import random
+import sys
+from unittest.mock import patch
+import pytest
+import main
+from processing.shards import HEADER, MAGIC, Shard, write_shard
+from reports.engine import ScanEngine
+
+REPORT_NAMES = list(main.REPORTS)
+HEADER_LINE = "student_name,subject,teacher_name,date,grade"
+
+
+def write_csv_files(tmp_path, count=4, rows=300, seed=3):
+    """CSV файлы с дробными оценками, суммы которых зависят от порядка"""
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        lines = [HEADER_LINE]
+        for _ in range(rows):
+            lines.append(
+                f"Студент {rng.randrange(80)},Предмет {rng.randrange(5)},"
+                f"Учитель {rng.randrange(12)},2023-10-{rng.randrange(1, 29):02d},"
+                f"{rng.uniform(2, 5):.3f}"
+            )
+        path = tmp_path / f"data{index}.csv"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def run_main(capsys, *argv):
+    with patch.object(sys, "argv", ["main.py", *argv]):
+        main.main()
+    return capsys.readouterr().out
+
+
+class TestShard:
+
+    def test_states_round_trip(self, tmp_path):
+        """Тест: частичные состояния читаются такими же, какими записаны"""
+        engine = ScanEngine(main.create_reports(REPORT_NAMES))
+        paths = write_csv_files(tmp_path, count=2)
+        partials = list(main.iter_partial_stats(engine, paths))
+        shard_path = str(tmp_path / "nodes.state")
+
+        write_shard(shard_path, engine, {"skip_invalid": False}, paths, partials)
+        shard = Shard(shard_path)
+
+        assert shard.reports == REPORT_NAMES
+        assert shard.options == {"skip_invalid": False}
+        loaded = list(shard.iter_states(engine))
+        assert [path for path, _ in loaded] == paths
+        for (_, states), (_, expected) in zip(loaded, partials):
+            assert engine.dump_states(states) == engine.dump_states(expected)
+
+    def test_not_a_shard(self, tmp_path):
+        """Тест файла, не являющегося файлом состояний"""
+        path = tmp_path / "data.state"
+        path.write_bytes(b"student_name,subject\n")
+
+        with pytest.raises(ValueError, match="не является файлом состояний"):
+            Shard(str(path))
+
+    def test_unsupported_version(self, tmp_path):
+        """Тест файла состояний другой версии"""
+        path = tmp_path / "data.state"
+        path.write_bytes(HEADER.pack(MAGIC, 99, 2) + b"{}")
+
+        with pytest.raises(ValueError, match="Неподдерживаемая версия"):
+            Shard(str(path))
+
+    def test_truncated(self, tmp_path):
+        """Тест обрезанного файла состояний"""
+        engine = ScanEngine(main.create_reports(["student-performance"]))
+        paths = write_csv_files(tmp_path, count=1)
+        shard_path = tmp_path / "data.state"
+        write_shard(
+            str(shard_path), engine, {}, paths, main.iter_partial_stats(engine, paths)
+        )
+        shard_path.write_bytes(shard_path.read_bytes()[:-10])
+
+        with pytest.raises(ValueError, match="обрезан"):
+            list(Shard(str(shard_path)).iter_states(engine))
+
+
+class TestPartialMerge:
+
+    @pytest.mark.parametrize(
+        "options",
+        [[], ["--sketch-size", "16", "--subject", "Предмет 1", "Предмет 3"]],
+    )
+    def test_merge_matches_single_run(self, tmp_path, capsys, options):
+        """Тест совпадения отчетов после слияния с одним запуском по всем файлам"""
+        paths = write_csv_files(tmp_path)
+        common = ["--report", *REPORT_NAMES, "--no-cache", *options]
+        first, second = str(tmp_path / "first.state"), str(tmp_path / "second.state")
+
+        expected = run_main(capsys, "--files", *paths, *common)
+        run_main(capsys, "--files", *paths[:1], *common, "--partial", first)
+        run_main(capsys, "--files", *paths[1:], *common, "--partial", second)
+
+        assert run_main(capsys, "--merge", first, second) == expected
+
+    def test_mismatched_parameters(self, tmp_path, capsys):
+        """Тест слияния файлов состояний с разными параметрами"""
+        paths = write_csv_files(tmp_path, count=1)
+        first, second = str(tmp_path / "first.state"), str(tmp_path / "second.state")
+        common = ["--files", *paths, "--report", "student-performance", "--no-cache"]
+        run_main(capsys, *common, "--partial", first)
+        run_main(capsys, *common, "--skip-invalid", "--partial", second)
+
+        with pytest.raises(SystemExit):
+            run_main(capsys, "--merge", first, second)
+
+        assert "с разными отчетами или параметрами" in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["--merge", "a.state", "--files", "data.csv"],
+            ["--merge", "a.state", "--report", "student-performance"],
+            ["--files", "data.csv", "--report", "student-performance"]
+            + ["--watch", "--partial", "a.state"],
+            ["--report", "student-performance"],
+        ],
+    )
+    def test_invalid_arguments(self, argv):
+        """Тест недопустимых сочетаний --partial и --merge"""
+        with patch.object(sys, "argv", ["main.py", *argv]):
+            with pytest.raises(SystemExit):
+                main.parse_arguments()
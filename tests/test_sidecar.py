@@ -0,0 +1,97 @@
+import os
+from unittest.mock import patch
+from data.csv_reader import CSVReader
+from data.sidecar import load_sidecar, sidecar_path, write_sidecar
+from reports.student_performance_report import StudentPerformanceReport
+
+
+class TestSidecar:
+
+    def _write(self, path, content):
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n" + content,
+            encoding="utf-8",
+        )
+        return str(path)
+
+    def test_write_and_load(self, tmp_path):
+        """Тест записи и отображения файла-спутника в память"""
+        file_path = self._write(
+            tmp_path / "a.csv",
+            "Иванов Иван,Математика,Петров,2023-10-01,5\n"
+            "Сидоров Сидор,Физика,Петров,2023-10-02,3.7\n"
+            "Иванов Иван,Физика,Петров,2023-10-03,4.5",
+        )
+        columns = CSVReader().read_columns(file_path)
+
+        assert write_sidecar(file_path, columns, os.stat(file_path))
+        loaded = load_sidecar(file_path)
+
+        assert loaded is not None
+        assert isinstance(loaded.grade, memoryview)
+        assert list(loaded) == list(columns)
+        assert loaded.student_name.values == ["Иванов Иван", "Сидоров Сидор"]
+
+    def test_missing_sidecar(self, tmp_path):
+        """Тест отсутствия файла-спутника"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+
+        assert load_sidecar(file_path) is None
+
+    def test_stale_sidecar_is_ignored(self, tmp_path):
+        """Тест отказа от устаревшего файла-спутника"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        write_sidecar(
+            file_path, CSVReader().read_columns(file_path), os.stat(file_path)
+        )
+
+        self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5\nГ,Б,В,2023-10-01,4")
+
+        assert load_sidecar(file_path) is None
+
+    def test_file_changed_while_reading(self, tmp_path):
+        """Тест: спутник файла, дописанного во время чтения, не используется"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5\n")
+        csv_reader = CSVReader(use_sidecar=True)
+        read_records = csv_reader._read_records
+
+        def appending(*args):
+            yield from read_records(*args)
+            with open(file_path, "a", encoding="utf-8") as f:
+                f.write("Г,Б,В,2023-10-02,4\n")
+
+        with patch.object(csv_reader, "_read_records", appending):
+            assert len(csv_reader.read_columns(file_path)) == 1
+
+        assert load_sidecar(file_path) is None
+        assert len(csv_reader.read_columns(file_path)) == 2
+
+    def test_corrupted_sidecar_is_ignored(self, tmp_path):
+        """Тест отказа от поврежденного файла-спутника"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        write_sidecar(
+            file_path, CSVReader().read_columns(file_path), os.stat(file_path)
+        )
+
+        with open(sidecar_path(file_path), "r+b") as f:
+            f.truncate(os.path.getsize(sidecar_path(file_path)) - 3)
+
+        assert load_sidecar(file_path) is None
+
+    def test_reader_uses_sidecar(self, tmp_path):
+        """Тест записи спутника при первом чтении и его использования при повторном"""
+        file_path = self._write(
+            tmp_path / "a.csv", "А,Б,В,2023-10-01,5\nГ,Б,В,2023-10-02,3.3"
+        )
+        csv_reader = CSVReader(use_sidecar=True)
+        report = StudentPerformanceReport()
+
+        first = csv_reader.read_columns(file_path)
+        assert os.path.exists(sidecar_path(file_path))
+        second = csv_reader.read_columns(file_path)
+
+        assert second.buffer is not None
+        assert report.aggregate(second) == report.aggregate(first)
+        assert report.aggregate(second) == report.aggregate(
+            CSVReader().iter_records(file_path)
+        )
@@ -0,0 +1,114 @@
+import bisect
+import json
+import random
+import pytest
+from reports.sketches import DistinctCounter, QuantileSketch
+
+
+def rank_error(sketch, values, q):
+    """Отклонение нормированного ранга ответа скетча от запрошенной доли"""
+    ordered = sorted(values)
+    return abs(bisect.bisect_left(ordered, sketch.quantile(q)) / len(values) - q)
+
+
+class TestQuantileSketch:
+
+    def test_exact_for_small_input(self):
+        """Тест точных квантилей, пока значения помещаются в первый уровень"""
+        sketch = QuantileSketch()
+        sketch.update([5.0, 1.0, 3.0, 2.0, 4.0])
+
+        assert sketch.quantile(0.5) == 3.0
+        assert sketch.quantile(1.0) == 5.0
+        assert sketch.quantile(0.2) == 1.0
+
+    def test_rank_error_and_bounded_memory(self):
+        """Тест ошибки ранга и ограниченного числа хранимых значений"""
+        rng = random.Random(3)
+        values = [rng.random() for _ in range(50000)]
+        sketch = QuantileSketch(200)
+        sketch.update(values)
+
+        assert sketch.count == len(values)
+        assert sum(map(len, sketch.levels)) <= 3 * 200
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+            assert rank_error(sketch, values, q) < 0.017
+
+    def test_merge_across_parts(self):
+        """Тест объединения скетчей частей данных"""
+        rng = random.Random(4)
+        values = [rng.gauss(3.5, 1.0) for _ in range(20000)]
+        parts = [QuantileSketch(100) for _ in range(5)]
+        for index, value in enumerate(values):
+            parts[index % 5].add(value)
+
+        merged = QuantileSketch(100)
+        for part in parts:
+            merged.merge(part)
+
+        assert merged.count == len(values)
+        assert rank_error(merged, values, 0.5) < 0.03
+
+    def test_state_round_trip(self):
+        """Тест сохранения скетча в JSON и восстановления"""
+        sketch = QuantileSketch(16)
+        sketch.update(float(value) for value in range(100))
+
+        restored = QuantileSketch.from_state(json.loads(json.dumps(sketch.to_state())))
+
+        assert restored == sketch
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+    def test_merge_different_sizes(self):
+        """Тест ошибки при объединении скетчей разного размера"""
+        with pytest.raises(ValueError):
+            QuantileSketch(100).merge(QuantileSketch(200))
+
+
+class TestDistinctCounter:
+
+    def test_small_counts_are_exact(self):
+        """Тест точного подсчета малого количества значений"""
+        counter = DistinctCounter()
+        for value in ["А", "Б", "А", "В", "Б"]:
+            counter.add(value)
+
+        assert counter.count() == 3
+
+    @pytest.mark.parametrize("precision", [10, 12])
+    def test_error_bound(self, precision):
+        """Тест ошибки оценки в пределах трех стандартных ошибок"""
+        counter = DistinctCounter(precision)
+        for index in range(30000):
+            counter.add(f"Студент {index}")
+
+        error = abs(counter.count() - 30000) / 30000
+        assert error < 3 * 1.04 / (2**precision) ** 0.5
+
+    def test_merge_equals_union(self):
+        """Тест совпадения объединения счетчиков со счетчиком объединения"""
+        first, second, union = (
+            DistinctCounter(8),
+            DistinctCounter(8),
+            DistinctCounter(8),
+        )
+        for index in range(2000):
+            value = f"s{index}"
+            (first if index % 3 else second).add(value)
+            union.add(value)
+
+        assert first.merge(second) == union
+
+    def test_state_round_trip(self):
+        """Тест сохранения счетчика в JSON и восстановления"""
+        counter = DistinctCounter(6)
+        counter.add("А")
+
+        state = json.loads(json.dumps(counter.to_state()))
+
+        assert DistinctCounter.from_state(state) == counter
+
+    def test_invalid_precision(self):
+        """Тест ошибки при недопустимой точности"""
+        with pytest.raises(ValueError):
+            DistinctCounter(20)
@@ -0,0 +1,138 @@
+import os
+import random
+import sys
+from unittest.mock import patch
+import pytest
+import main
+import reports.spill
+from reports.engine import ScanEngine
+from reports.spill import SpilledGroups, SpillingScan
+
+REPORT_NAMES = list(main.REPORTS)
+
+
+def make_files(count=3, rows=400, students=150, seed=7):
+    """Записи нескольких файлов с дробными оценками и повторами групп"""
+    rng = random.Random(seed)
+    return [
+        [
+            {
+                "student_name": f"Студент {rng.randrange(students)}",
+                "subject": f"Предмет {rng.randrange(6)}",
+                "teacher_name": f"Учитель {rng.randrange(40)}",
+                "date": "2023-10-01",
+                "grade": round(rng.uniform(2, 5), 2),
+            }
+            for _ in range(rows)
+        ]
+        for _ in range(count)
+    ]
+
+
+def in_memory_rows(engine, files, top=None, bottom=None):
+    """Строки отчетов при расчете в памяти, как в main.collect_stats"""
+    states = engine.create_states()
+    for records in files:
+        engine.merge(states, engine.scan(records))
+    return [
+        report.finalize(state, top, bottom)
+        for report, state in zip(engine.reports, states)
+    ]
+
+
+class TestSpillingScan:
+
+    @pytest.fixture(autouse=True)
+    def small_batches(self, monkeypatch):
+        """Проверка памяти после каждых 16 строк, чтобы выгрузка шла внутри файла"""
+        monkeypatch.setattr(reports.spill, "BATCH_SIZE", 16)
+
+    @pytest.mark.parametrize("max_groups", [1, 7, 100, 10_000])
+    @pytest.mark.parametrize("ranking", [{}, {"top": 5}, {"bottom": 8}])
+    def test_matches_in_memory(self, tmp_path, max_groups, ranking):
+        """Тест совпадения строк отчетов с расчетом в памяти"""
+        engine = ScanEngine(main.create_reports(REPORT_NAMES))
+        files = make_files()
+
+        with SpillingScan(engine.reports, max_groups, str(tmp_path)) as scan:
+            for records in files:
+                scan.add_file(records)
+            states = scan.finish()
+            rows = [
+                list(report.finalize(state, **ranking))
+                for report, state in zip(engine.reports, states)
+            ]
+
+        assert rows == in_memory_rows(engine, files, **ranking)
+        assert os.listdir(tmp_path) == []
+
+    def test_only_large_reports_spill(self, tmp_path):
+        """Тест: отчет с немногими группами остается в памяти"""
+        engine = ScanEngine(
+            main.create_reports(["student-performance", "subject-performance"])
+        )
+
+        with SpillingScan(engine.reports, 50, str(tmp_path)) as scan:
+            for records in make_files():
+                scan.add_file(records)
+            student_state, subject_state = scan.finish()
+
+            assert isinstance(student_state, SpilledGroups)
+            assert len(student_state) == 150
+            assert isinstance(subject_state, dict)
+            assert len(subject_state) == 6
+
+    def test_no_spill_under_limit(self, tmp_path):
+        """Тест: без превышения предела временные файлы не создаются"""
+        engine = ScanEngine(main.create_reports(["student-performance"]))
+
+        with SpillingScan(engine.reports, 1000, str(tmp_path)) as scan:
+            for records in make_files():
+                scan.add_file(records)
+            assert isinstance(scan.finish()[0], dict)
+            assert not scan.spilled
+            assert os.listdir(scan.directory) == []
+
+    def test_invalid_limit(self):
+        """Тест недопустимого предела групп"""
+        with pytest.raises(ValueError, match="не меньше 1"):
+            SpillingScan([], 0)
+
+
+class TestMemoryLimitOption:
+
+    def test_output_matches_in_memory(self, tmp_path, capsys):
+        """Тест совпадения вывода main.py с --memory-limit и без него"""
+        paths = []
+        for index, records in enumerate(make_files()):
+            path = tmp_path / f"data{index}.csv"
+            lines = ["student_name,subject,teacher_name,date,grade"]
+            lines += [",".join(str(value) for value in r.values()) for r in records]
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            paths.append(str(path))
+        argv = ["main.py", "--files", *paths, "--report", *REPORT_NAMES]
+
+        with patch.object(sys, "argv", argv + ["--no-cache"]):
+            main.main()
+        expected = capsys.readouterr().out
+        with patch.object(sys, "argv", argv + ["--memory-limit", "10"]):
+            main.main()
+
+        assert capsys.readouterr().out == expected
+
+    @pytest.mark.parametrize(
+        "extra",
+        [
+            ["--memory-limit", "0"],
+            ["--memory-limit", "10", "--workers", "2"],
+            ["--memory-limit", "10", "--watch"],
+        ],
+    )
+    def test_invalid_options(self, extra, capsys):
+        """Тест недопустимых параметров с --memory-limit"""
+        argv = ["main.py", "--files", "data.csv", "--report", "student-performance"]
+        with patch.object(sys, "argv", argv + extra):
+            with pytest.raises(SystemExit):
+                main.parse_arguments()
+
+        assert "--memory-limit" in capsys.readouterr().err
@@ -0,0 +1,142 @@
+import os
+import sys
+from unittest.mock import patch
+import pytest
+from data.csv_reader import CSVReader
+from data.student_index import build_stats, index_path, lookup_index, write_index
+import main
+
+
+class TestStudentIndex:
+
+    def _write(self, path, content):
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n" + content,
+            encoding="utf-8",
+        )
+        return str(path)
+
+    def test_write_and_lookup(self, tmp_path):
+        """Тест записи индекса и поиска студентов"""
+        file_path = self._write(
+            tmp_path / "a.csv",
+            "Яковлев,Математика,Петров,2023-10-01,5\n"
+            "Андреев,Физика,Петров,2023-10-02,3.7\n"
+            "Яковлев,Физика,Петров,2023-10-03,4.5",
+        )
+        stats = build_stats(CSVReader().iter_records(file_path))
+
+        assert write_index(file_path, stats, os.stat(file_path))
+
+        assert lookup_index(file_path, ["Яковлев", "Андреев", "Борисов"]) == {
+            "Яковлев": [2, 9.5],
+            "Андреев": [1, 3.7],
+            "Борисов": None,
+        }
+
+    def test_lookup_many_students(self, tmp_path):
+        """Тест двоичного поиска среди многих студентов"""
+        file_path = self._write(tmp_path / "a.csv", "")
+        stats = {f"Студент {i}": [i + 1, float(i)] for i in range(1000)}
+        write_index(file_path, stats, os.stat(file_path))
+
+        names = list(stats) + ["Студент", "Студент 9999"]
+        found = lookup_index(file_path, names)
+
+        assert found == {**stats, "Студент": None, "Студент 9999": None}
+
+    def test_missing_index(self, tmp_path):
+        """Тест отсутствия индекса"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+
+        assert lookup_index(file_path, ["А"]) is None
+
+    def test_stale_index_is_ignored(self, tmp_path):
+        """Тест отказа от индекса изменившегося файла"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        write_index(file_path, {"А": [1, 5.0]}, os.stat(file_path))
+
+        self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5\nА,Б,В,2023-10-01,4")
+
+        assert lookup_index(file_path, ["А"]) is None
+
+    def test_file_changed_while_reading(self, tmp_path):
+        """Тест: индекс файла, дописанного во время чтения, не используется"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        stat = os.stat(file_path)
+
+        self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5\nА,Б,В,2023-10-01,4")
+        write_index(file_path, {"А": [1, 5.0]}, stat)
+
+        assert lookup_index(file_path, ["А"]) is None
+
+    def test_corrupted_index_is_ignored(self, tmp_path):
+        """Тест отказа от поврежденного индекса"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5")
+        write_index(file_path, {"А": [1, 5.0]}, os.stat(file_path))
+
+        with open(index_path(file_path), "r+b") as f:
+            f.truncate(os.path.getsize(index_path(file_path)) - 1)
+
+        assert lookup_index(file_path, ["А"]) is None
+
+
+class TestStudentQuery:
+
+    def _write(self, path, content):
+        path.write_text(
+            "student_name,subject,teacher_name,date,grade\n" + content,
+            encoding="utf-8",
+        )
+        return str(path)
+
+    def test_lookup_builds_index_once(self, tmp_path):
+        """Тест построения индекса при первом запросе и поиска без чтения CSV"""
+        first = self._write(
+            tmp_path / "a.csv", "А,Б,В,2023-10-01,5\nБ,Б,В,2023-10-01,3"
+        )
+        second = self._write(tmp_path / "b.csv", "А,Б,В,2023-10-02,4.1")
+
+        totals = main.lookup_students([first, second], ["А", "В"])
+
+        assert totals == {"А": [2, 9.1], "В": None}
+        with patch.object(CSVReader, "iter_records") as mock_iter_records:
+            assert main.lookup_students([first, second], ["А", "В"]) == totals
+            mock_iter_records.assert_not_called()
+
+    def test_index_not_written_with_skipped_rows(self, tmp_path):
+        """Тест: индекс не строится по файлу с пропущенными строками"""
+        file_path = self._write(tmp_path / "a.csv", "А,Б,В,2023-10-01,5\nА,Б,В,x,abc")
+
+        totals = main.lookup_students([file_path], ["А"], CSVReader(skip_invalid=True))
+
+        assert totals == {"А": [1, 5.0]}
+        assert not os.path.exists(index_path(file_path))
+
+    def test_main_student_matches_report(self, tmp_path, capsys):
+        """Тест совпадения средней оценки по индексу со средней в отчете"""
+        file_path = self._write(
+            tmp_path / "a.csv",
+            "А,Б,В,2023-10-01,5\nБ,Б,В,2023-10-01,3\nА,Б,В,2023-10-01,3.3",
+        )
+        test_args = ["main.py", "--files", file_path, "--no-cache"]
+
+        with patch.object(sys, "argv", test_args + ["--student", "А", "Г"]):
+            main.main()
+        captured = capsys.readouterr()
+
+        assert captured.out.splitlines() == ["student_name,grades,grade", "А,2,4.2"]
+        assert "студент Г не найден" in captured.err
+
+        with patch.object(sys, "argv", test_args + ["--report", "student-performance"]):
+            main.main()
+        assert "1,А,4.2" in capsys.readouterr().out.splitlines()
+
+    def test_student_with_report_is_error(self):
+        """Тест ошибки при одновременном использовании --student и --report"""
+        test_args = ["--files", "a.csv", "--student", "А", "--report"]
+        test_args += ["student-performance"]
+
+        with patch.object(sys, "argv", ["main.py"] + test_args):
+            with pytest.raises(SystemExit):
+                main.parse_arguments()
@@ -2,6 +2,8 @@ import pytest
 from io import StringIO
 import sys
 from reports.student_performance_report import StudentPerformanceReport
+from data.columnar import ColumnarRecords
+from reports.writers import create_writer
 
 
 class TestStudentPerformanceReport:
@@ -188,3 +190,88 @@ class TestStudentPerformanceReport:
         assert "Студент А" in output
         assert "Студент Б" in output
         assert output.count("4.0") == 2
+
+    def test_aggregate_keeps_count_and_sum(self):
+        """Тест накопления количества и суммы оценок без хранения записей"""
+        records = (
+            {"student_name": name, "grade": grade}
+            for name, grade in [("А", 5.0), ("Б", 3.0), ("А", 4.0)]
+        )
+
+        stats = self.report.aggregate(records)
+
+        assert stats == {"А": [2, 9.0], "Б": [1, 3.0]}
+
+    def test_aggregate_continues_existing_stats(self):
+        """Тест продолжения подсчета по уже накопленным значениям"""
+        stats = {"А": [1, 5.0]}
+
+        self.report.aggregate([{"student_name": "А", "grade": 3.0}], stats)
+
+        assert stats == {"А": [2, 8.0]}
+
+    def test_merge_partial_stats(self):
+        """Тест объединения частичных агрегатов разных файлов"""
+        stats = {"А": [1, 5.0]}
+
+        self.report.merge(stats, {"А": [2, 7.0], "Б": [1, 3.0]})
+
+        assert stats == {"А": [3, 12.0], "Б": [1, 3.0]}
+
+    def test_aggregate_columnar_records(self):
+        """Тест агрегации колоночного хранилища без создания записей"""
+        records = [
+            {
+                "student_name": name,
+                "subject": "М",
+                "teacher_name": "П",
+                "date": "d",
+                "grade": grade,
+            }
+            for name, grade in [("А", 5.0), ("Б", 3.3), ("А", 4.1), ("В", 2.0)]
+        ]
+
+        stats = self.report.aggregate(ColumnarRecords.from_records(records))
+
+        assert stats == self.report.aggregate(records)
+        assert list(stats) == ["А", "Б", "В"]
+
+    def test_render_with_writer(self):
+        """Тест вывода отчета через объект вывода в формате CSV"""
+        output = StringIO()
+
+        self.report.render(
+            {"А": [2, 7.0], "Б": [1, 5.0], "В": [1, 3.5]},
+            create_writer("csv", self.report.HEADERS, output),
+        )
+
+        assert output.getvalue().splitlines() == [
+            "rank,student_name,grade",
+            "1,Б,5.0",
+            "2,А,3.5",
+            "3,В,3.5",
+        ]
+
+    def test_rank_top_and_bottom_match_full_report(self):
+        """Тест совпадения top/bottom со строками полного отчета, включая равные оценки"""
+        stats = {
+            f"Студент {i}": [1, grade]
+            for i, grade in enumerate([4.0, 5.0, 3.0, 4.0, 5.0, 2.0, 4.0, 3.0])
+        }
+        full = self.report.finalize(stats)
+
+        for n in range(1, len(stats) + 2):
+            assert self.report.finalize(stats, top=n) == full[:n]
+            assert self.report.finalize(stats, bottom=n) == full[-n:]
+
+    def test_render_top(self):
+        """Тест вывода только лучших студентов"""
+        output = StringIO()
+
+        self.report.render(
+            {"А": [1, 3.0], "Б": [1, 5.0], "В": [1, 4.0]},
+            create_writer("csv", self.report.HEADERS, output),
+            top=2,
+        )
+
+        assert output.getvalue().splitlines()[1:] == ["1,Б,5.0", "2,В,4.0"]
@@ -0,0 +1,54 @@
+import pickle
+import pytest
+from data.validation import RowError, ValidationError, ValidationReport
+
+
+class TestValidationReport:
+
+    def test_collects_errors(self):
+        """Тест накопления ошибок строк"""
+        report = ValidationReport()
+        report.rows_checked = 10
+        report.add(3, "Некорректная оценка: abc")
+        report.add(7, "Поле subject не может быть пустым")
+
+        assert report.errors == [
+            RowError(3, "Некорректная оценка: abc"),
+            RowError(7, "Поле subject не может быть пустым"),
+        ]
+        summary = report.summary()
+        assert "Найдено некорректных строк: 2 (проверено строк: 10)" in summary
+        assert "Ошибка в строке 3: Некорректная оценка: abc" in summary
+
+    def test_max_errors(self):
+        """Тест прерывания при достижении максимального числа ошибок"""
+        report = ValidationReport(max_errors=2)
+        report.add(2, "ошибка")
+
+        with pytest.raises(ValidationError, match="Ошибка в строке 5"):
+            report.add(5, "ошибка")
+
+    def test_finish(self):
+        """Тест завершения проверки с ошибками и без пропуска строк"""
+        ValidationReport().finish()
+        ValidationReport(skip_invalid=True).finish()
+
+        report = ValidationReport(skip_invalid=True)
+        report.add(2, "ошибка")
+        report.finish()
+
+        report = ValidationReport()
+        report.add(2, "ошибка")
+        with pytest.raises(ValidationError):
+            report.finish()
+
+    def test_error_is_picklable(self):
+        """Тест передачи ошибки из процесса-обработчика"""
+        report = ValidationReport()
+        report.add(4, "ошибка")
+
+        error = pickle.loads(pickle.dumps(ValidationError(report)))
+
+        assert isinstance(error, ValueError)
+        assert str(error) == report.summary()
+        assert error.report.errors == [RowError(4, "ошибка")]
@@ -0,0 +1,250 @@
+import os
+import sys
+import tracemalloc
+from unittest.mock import patch
+import pytest
+from data.csv_reader import CSVReader
+from processing.watch import Watcher
+from reports.engine import ScanEngine
+from reports.student_performance_report import StudentPerformanceReport
+from reports.teacher_students_report import TeacherStudentsReport
+import main
+
+HEADER = "student_name,subject,teacher_name,date,grade\n"
+
+
+def make_engine():
+    return ScanEngine([StudentPerformanceReport(), TeacherStudentsReport()])
+
+
+def full_states(paths):
+    """Состояния отчетов при полном чтении файлов"""
+    engine = make_engine()
+    return engine.dump_states(main.collect_stats(engine, paths, csv_reader=CSVReader()))
+
+
+class TestWatcher:
+
+    def _append(self, path, content):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_appended_rows_match_full_read(self, tmp_path):
+        """Тест совпадения дочитанных строк с полным чтением"""
+        first = str(tmp_path / "a.csv")
+        second = str(tmp_path / "b.csv")
+        self._append(first, HEADER + "Иванов,Математика,Петров,2023-10-01,5\n")
+        self._append(second, HEADER + "Сидоров,Физика,Орлов,2023-10-01,3\n")
+        engine = make_engine()
+        watcher = Watcher(engine, [first, second])
+
+        assert watcher.poll(initial=True)
+        assert not watcher.poll()
+
+        self._append(first, "Сидоров,Физика,Петров,2023-10-02,4\n")
+        self._append(second, "Иванов,Физика,Орлов,2023-10-02,4.5\n")
+        offset = watcher.files[0].offset
+
+        assert watcher.poll()
+        assert watcher.files[0].offset > offset
+        assert engine.dump_states(watcher.states()) == full_states([first, second])
+
+    def test_partial_line_waits_for_newline(self, tmp_path):
+        """Тест ожидания конца недописанной строки"""
+        path = str(tmp_path / "a.csv")
+        self._append(path, HEADER + "Иванов,Математика,Петров,2023-10-01,5\n")
+        engine = make_engine()
+        watcher = Watcher(engine, [path])
+        watcher.poll(initial=True)
+
+        self._append(path, "Сидоров,Физика,Пет")
+        assert not watcher.poll()
+
+        self._append(path, "ров,2023-10-02,4\n")
+        assert watcher.poll()
+        assert engine.dump_states(watcher.states()) == full_states([path])
+
+    def test_partial_line_read_only_initially(self, tmp_path):
+        """Тест: строка без перевода строки читается только при первом чтении"""
+        path = str(tmp_path / "a.csv")
+        self._append(path, HEADER + "Иванов,Математика,Петров,2023-10-01,5")
+        engine = make_engine()
+        watcher = Watcher(engine, [path])
+
+        assert watcher.poll(initial=True)
+        assert engine.dump_states(watcher.states()) == full_states([path])
+
+        self._append(path, "\nСидоров,Физика,Петров,2023-10-02,4")
+        assert watcher.poll()
+        assert watcher.files[0].rows_read == 1
+        # Писатель мог остановиться посреди строки: она ждет перевода строки
+        assert not watcher.poll()
+        assert not watcher.poll()
+
+        self._append(path, "\n")
+        assert watcher.poll()
+        assert watcher.files[0].rows_read == 2
+        assert engine.dump_states(watcher.states()) == full_states([path])
+
+    def test_initial_read_is_streamed(self, tmp_path):
+        """Тест: первое чтение не загружает файл в память целиком"""
+        path = str(tmp_path / "a.csv")
+        self._append(
+            path,
+            HEADER
+            + "".join(
+                f"Студент {i % 20},Физика,Петров,2023-10-01,{1 + i % 5}\n"
+                for i in range(20000)
+            ),
+        )
+        engine = make_engine()
+        watcher = Watcher(engine, [path])
+
+        tracemalloc.start()
+        try:
+            watcher.poll(initial=True)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert watcher.files[0].rows_read == 20000
+        assert peak < os.path.getsize(path) / 4
+
+    def test_truncation_rebuilds_file(self, tmp_path):
+        """Тест перечитывания файла после усечения"""
+        path = str(tmp_path / "a.csv")
+        self._append(
+            path,
+            HEADER
+            + "Иванов,Математика,Петров,2023-10-01,5\n"
+            + "Сидоров,Физика,Петров,2023-10-02,4\n",
+        )
+        engine = make_engine()
+        watcher = Watcher(engine, [path])
+        watcher.poll(initial=True)
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HEADER + "Орлов,Химия,Петров,2023-10-03,3\n")
+
+        assert watcher.poll()
+        assert engine.dump_states(watcher.states()) == full_states([path])
+
+    def test_rotation_rebuilds_file(self, tmp_path):
+        """Тест перечитывания файла, замененного при ротации"""
+        path = str(tmp_path / "a.csv")
+        rotated = str(tmp_path / "new.csv")
+        self._append(path, HEADER + "Иванов,Математика,Петров,2023-10-01,5\n")
+        engine = make_engine()
+        watcher = Watcher(engine, [path])
+        watcher.poll(initial=True)
+
+        self._append(
+            rotated,
+            HEADER
+            + "Сидоров,Физика,Петров,2023-10-02,4\n"
+            + "Сидоров,Химия,Орлов,2023-10-03,5\n",
+        )
+        os.replace(rotated, path)
+
+        assert watcher.poll()
+        assert engine.dump_states(watcher.states()) == full_states([path])
+
+    def test_invalid_appended_row_keeps_states(self, tmp_path):
+        """Тест: ошибка в дописанной строке не меняет состояния файла"""
+        path = str(tmp_path / "a.csv")
+        self._append(path, HEADER + "Иванов,Математика,Петров,2023-10-01,5\n")
+        engine = make_engine()
+        watcher = Watcher(engine, [path])
+        watcher.poll(initial=True)
+        expected = engine.dump_states(watcher.states())
+
+        self._append(
+            path, "Сидоров,Физика,Петров,2023-10-02,4\nОрлов,Физика,Петров,,4\n"
+        )
+        with pytest.raises(ValueError, match="Ошибка в строке 4"):
+            watcher.poll()
+
+        assert engine.dump_states(watcher.states()) == expected
+        assert not watcher.poll()
+
+        self._append(path, "Орлов,Физика,Петров,2023-10-03,4\n")
+        with pytest.raises(ValueError):
+            watcher.poll()
+        assert watcher.files[0].rows_read == 1
+
+
+class TestWatchMain:
+
+    def _args(self, files, *extra):
+        argv = ["main.py", "--files", *files, "--report", "student-performance"]
+        argv += ["--output-format", "csv", "--watch", "--watch-interval", "0.001"]
+        with patch.object(sys, "argv", argv + list(extra)):
+            return main.parse_arguments()
+
+    def test_watch_emits_updates(self, tmp_path, capsys):
+        """Тест вывода обновленного отчета после дописывания строк"""
+        path = str(tmp_path / "a.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HEADER + "Иванов,Математика,Петров,2023-10-01,5\n")
+        args = self._args([path])
+
+        def append(_):
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("Сидоров,Физика,Петров,2023-10-02,4\n")
+
+        with patch("main.time.sleep", side_effect=append):
+            main.run_watch(args, max_polls=1)
+
+        blocks = capsys.readouterr().out.strip().split("\n\n")
+        assert len(blocks) == 2
+        assert "Сидоров" not in blocks[0]
+        assert "Сидоров" in blocks[1]
+
+    def test_changes_only(self, tmp_path, capsys):
+        """Тест вывода только изменившихся строк"""
+        path = str(tmp_path / "a.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(
+                HEADER
+                + "Иванов,Математика,Петров,2023-10-01,5\n"
+                + "Орлов,Математика,Петров,2023-10-01,3\n"
+            )
+        args = self._args([path], "--changes-only")
+
+        def append(_):
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("Сидоров,Физика,Петров,2023-10-02,4\n")
+
+        with patch("main.time.sleep", side_effect=append):
+            main.run_watch(args, max_polls=1)
+
+        blocks = capsys.readouterr().out.strip().split("\n\n")
+        assert len(blocks) == 2
+        assert "Орлов" in blocks[0]
+        assert blocks[1].splitlines()[1:] == ["2,Сидоров,4.0"]
+
+    def test_changes_only_requires_watch(self, capsys):
+        """Тест ошибки --changes-only без --watch"""
+        argv = ["main.py", "--files", "a.csv", "--report", "student-performance"]
+        with patch.object(sys, "argv", argv + ["--changes-only"]):
+            with pytest.raises(SystemExit):
+                main.parse_arguments()
+
+    def test_invalid_appended_row_keeps_polling(self, tmp_path, capsys):
+        """Тест: ошибка в дописанной строке выводится, отслеживание продолжается"""
+        path = str(tmp_path / "a.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HEADER + "Иванов,Математика,Петров,2023-10-01,5\n")
+        args = self._args([path])
+        appended = iter(["Сидоров,Физика,Петров,2023-10-02,abc\n", ""])
+
+        def append(_):
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(next(appended))
+
+        with patch("main.time.sleep", side_effect=append):
+            main.run_watch(args, max_polls=2)
+
+        captured = capsys.readouterr()
+        assert captured.err.count("Некорректная оценка: abc") == 1
+        assert "Сидоров" not in captured.out
@@ -0,0 +1,63 @@
+import io
+import json
+import pytest
+from reports.writers import create_writer
+
+HEADERS = ["", "student_name", "grade"]
+ROWS = [(1, "Иванов Иван", 4.5), (2, "Сидоров, Сидор", 3.0)]
+
+
+class TestWriters:
+
+    def _render(self, output_format):
+        output = io.StringIO()
+        writer = create_writer(output_format, HEADERS, output)
+        for row in ROWS:
+            writer.write_row(row)
+        writer.close()
+        return output.getvalue()
+
+    def test_csv(self):
+        """Тест вывода в формате CSV"""
+        assert self._render("csv") == (
+            'rank,student_name,grade\n1,Иванов Иван,4.5\n2,"Сидоров, Сидор",3.0\n'
+        )
+
+    def test_tsv(self):
+        """Тест вывода в формате TSV"""
+        assert self._render("tsv").splitlines() == [
+            "rank\tstudent_name\tgrade",
+            "1\tИванов Иван\t4.5",
+            "2\tСидоров, Сидор\t3.0",
+        ]
+
+    def test_jsonl(self):
+        """Тест вывода в формате JSON Lines"""
+        lines = self._render("jsonl").splitlines()
+
+        assert [json.loads(line) for line in lines] == [
+            {"rank": 1, "student_name": "Иванов Иван", "grade": 4.5},
+            {"rank": 2, "student_name": "Сидоров, Сидор", "grade": 3.0},
+        ]
+
+    def test_grid(self):
+        """Тест вывода таблицы с рамками"""
+        output = self._render("grid")
+
+        assert output.startswith("+----+")
+        assert "| student_name" in output
+        assert "4.5" in output
+
+    def test_rows_are_written_incrementally(self):
+        """Тест вывода строки до закрытия объекта вывода"""
+        output = io.StringIO()
+        writer = create_writer("jsonl", HEADERS, output)
+
+        writer.write_row(ROWS[0])
+
+        assert "Иванов Иван" in output.getvalue()
+
+    def test_unknown_format(self):
+        """Тест неизвестного формата"""
+        with pytest.raises(ValueError, match="Неизвестный формат вывода"):
+            create_writer("xml", HEADERS, io.StringIO())